@@ -3,7 +3,8 @@
 import bpy
 from bpy.props import PointerProperty
 
-from . import operators, props, ui
+from . import cli, operators, props, ui
+from .operators.bake_device import detect_render_devices
 from .preferences import AddonPreferences, get_preferences
 from .props import SceneProps, WMProps
 from .utils import Registry
@@ -20,6 +21,7 @@ __all__ = [
 def register() -> None:
     """Register addon."""
     Registry.register()
+    detect_render_devices()
 
     prefs = get_preferences()
 
@@ -37,9 +39,12 @@ def register() -> None:
         type=WMProps
     )
 
+    cli.register()
+
 
 def unregister() -> None:
     """Unregister addon."""
+    cli.unregister()
     Registry.unregister()
 
     del bpy.types.Scene.pawsbkr  # type: ignore[attr-defined]
@@ -0,0 +1,399 @@
+"""Command line interface.
+
+Commands are available via `blender --command <command>` and run in background mode.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Any
+
+import bpy
+from bpy import types as blt
+
+from ._helpers import log, log_err
+from .farm import FarmSettings, pin_worker_cores, run_bake_farm
+from .operators.bake_cache import BakeCache
+from .operators.bake_device import set_render_threads
+from .operators.bake_manifest import record_bake_hashes, skip_unchanged_tasks
+from .operators.bake_memory import (
+    check_memory_budget,
+    get_memory_budget,
+    set_memory_budget_workers,
+)
+from .operators.bake_plan import BakeTask, partition_tasks, plan_texture_set_bake
+from .operators.texture_set_bake_blocking import bake_texture_set_blocking
+from .operators.texture_set_material_create import create_materials
+from .operators.texture_set_pack import pack_texture_set_channels
+from .props import TextureSetProps, get_bake_settings, get_props_scene
+from .utils import AddonException
+
+CLI_COMMAND_BAKE = "pawsbkr_bake"
+CLI_COMMAND_CACHE = "pawsbkr_cache"
+
+_MB = 1024**2
+_GB = 1024**3
+_DAY = 24 * 60 * 60
+
+_cli_handles: list[Any] = []
+
+
+def _parse_bake_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog=f"blender --command {CLI_COMMAND_BAKE}",
+        description="Bake Texture Sets of a .blend file without UI.",
+    )
+    parser.add_argument("blend_file", help="Path to the .blend file")
+    parser.add_argument(
+        "-s",
+        "--texture-set",
+        dest="texture_sets",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help=(
+            "Name of the Texture Set to bake, can be repeated."
+            " Defaults to all enabled Texture Sets"
+        ),
+    )
+    parser.add_argument(
+        "--scene",
+        default="",
+        help="Name of the Scene storing Texture Sets. Defaults to the active one",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Save the .blend file after baking, e.g. to keep created materials",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of Blender processes baking in parallel",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help=(
+            "Number of render threads per process."
+            " Defaults to CPU cores split evenly between workers"
+        ),
+    )
+    parser.add_argument(
+        "--worker",
+        type=_parse_worker,
+        default=None,
+        help=argparse.SUPPRESS,
+    )
+    return parser.parse_args(argv)
+
+
+def _parse_worker(value: str) -> tuple[int, int]:
+    """Parse `index/count` worker argument."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(f"Invalid worker: {value!r}") from ex
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Invalid worker: {value!r}")
+    return index, count
+
+
+def _select_texture_sets(
+    texture_sets: list[TextureSetProps], names: list[str]
+) -> list[TextureSetProps]:
+    if not names:
+        return [ts for ts in texture_sets if ts.is_enabled]
+
+    by_name = {ts.display_name: ts for ts in texture_sets}
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise ValueError(f"Texture Sets not found: {missing}")
+
+    return [by_name[name] for name in names]
+
+
+def _task_cost(context: blt.Context, task: BakeTask) -> float:
+    settings = get_bake_settings(context, task.settings_id)
+    return float((int(settings.size) * int(settings.sampling)) ** 2)
+
+
+def _plan_changed_tasks(
+    context: blt.Context, texture_set: TextureSetProps
+) -> list[BakeTask]:
+    tasks = plan_texture_set_bake(
+        context=context,
+        texture_set=texture_set,
+        textures=texture_set.get_enabled_textures(),
+    )
+    return skip_unchanged_tasks(context, texture_set, tasks)
+
+
+def _check_memory_budget(context: blt.Context, tasks: list[BakeTask]) -> bool:
+    """Check that all tasks fit into the memory budget before baking any of them."""
+    try:
+        check_memory_budget(context, tasks)
+    except AddonException as ex:
+        log_err(str(ex))
+        return False
+    return True
+
+
+def _bake_worker_share(
+    context: blt.Context,
+    texture_sets: list[TextureSetProps],
+    worker: tuple[int, int],
+) -> bool:
+    """Bake the worker's share of the Texture Sets tasks."""
+    index, count = worker
+    set_memory_budget_workers(count)
+
+    tasks: list[tuple[int, BakeTask]] = [
+        (set_idx, task)
+        for set_idx, texture_set in enumerate(texture_sets)
+        for task in _plan_changed_tasks(context, texture_set)
+    ]
+    partition = partition_tasks(
+        [task for _, task in tasks],
+        count,
+        cost=lambda task: _task_cost(context, task),
+    )[index]
+    log(f"Worker {index}/{count}: {len(partition)} of {len(tasks)} jobs")
+
+    is_ok = True
+    for set_idx, texture_set in enumerate(texture_sets):
+        own_tasks = [tasks[i][1] for i in partition if tasks[i][0] == set_idx]
+        if not own_tasks:
+            continue
+        summary = bake_texture_set_blocking(
+            context=context,
+            texture_set=texture_set,
+            tasks=own_tasks,
+            create_materials=False,
+            pack_channels=False,
+            record_hashes=False,
+        )
+        log(summary.format())
+        is_ok = is_ok and summary.is_ok
+
+    return is_ok
+
+
+def _bake_farm(
+    context: blt.Context, texture_sets: list[TextureSetProps], args: argparse.Namespace
+) -> bool:
+    """Bake using worker processes, then pack channels and create materials."""
+    # NOTE: Workers plan the same tasks, the manifest doesn't change until they finish
+    tasks = [
+        task
+        for texture_set in texture_sets
+        for task in _plan_changed_tasks(context, texture_set)
+    ]
+
+    set_memory_budget_workers(args.workers)
+    if not _check_memory_budget(context, tasks):
+        return False
+
+    settings = FarmSettings(
+        blend_file=bpy.data.filepath,
+        texture_sets=args.texture_sets,
+        scene=context.scene.name,
+        workers=args.workers,
+        threads=args.threads,
+    )
+    try:
+        is_ok = run_bake_farm(settings, command=CLI_COMMAND_BAKE) == 0
+    except AddonException as ex:
+        log_err(str(ex))
+        return False
+
+    if not is_ok:
+        return False
+
+    record_bake_hashes(tasks)
+
+    for texture_set in texture_sets:
+        if not texture_set.pack_channels:
+            continue
+        try:
+            pack_texture_set_channels(context=context, texture_set=texture_set)
+        except AddonException as ex:
+            log_err(f"Failed to pack channels: {ex}")
+            is_ok = False
+
+    for texture_set in texture_sets:
+        if not texture_set.create_materials:
+            continue
+        try:
+            create_materials(context=context, texture_set=texture_set)
+        # pylint: disable-next=broad-exception-caught
+        except Exception as ex:
+            log_err(f"Failed to create materials: {ex}", with_tb=True)
+            is_ok = False
+
+    return is_ok
+
+
+def _bake_all(context: blt.Context, texture_sets: list[TextureSetProps]) -> bool:
+    if get_memory_budget() and not _check_memory_budget(
+        context,
+        [
+            task
+            for texture_set in texture_sets
+            for task in _plan_changed_tasks(context, texture_set)
+        ],
+    ):
+        return False
+
+    is_ok = True
+    for texture_set in texture_sets:
+        summary = bake_texture_set_blocking(context=context, texture_set=texture_set)
+        log(summary.format())
+        is_ok = is_ok and summary.is_ok
+    return is_ok
+
+
+def _bake_process(
+    context: blt.Context,
+    texture_sets: list[TextureSetProps],
+    args: argparse.Namespace,
+) -> bool:
+    """Bake the share of a farm worker, on a farm, or in this process."""
+    if args.worker is not None:
+        pin_worker_cores(args.worker[0], args.threads)
+        return _bake_worker_share(context, texture_sets, args.worker)
+    if args.workers > 1:
+        return _bake_farm(context, texture_sets, args)
+    return _bake_all(context, texture_sets)
+
+
+def cli_bake(argv: list[str]) -> int:
+    """Bake Texture Sets and return exit code."""
+    args = _parse_bake_args(argv)
+
+    bpy.ops.wm.open_mainfile(filepath=args.blend_file)
+
+    scene = bpy.data.scenes[args.scene] if args.scene else bpy.context.scene
+    try:
+        texture_sets = _select_texture_sets(
+            list(get_props_scene(scene).texture_sets), args.texture_sets
+        )
+    except ValueError as ex:
+        log_err(str(ex))
+        return 1
+    if not texture_sets:
+        log_err("No Texture Sets to bake")
+        return 1
+
+    set_render_threads(args.threads)
+
+    # pylint: disable-next=no-value-for-parameter
+    with bpy.context.temp_override(scene=scene):  # type: ignore[call-arg]
+        try:
+            is_ok = _bake_process(bpy.context, texture_sets, args)
+        except AddonException as ex:
+            log_err(str(ex))
+            return 1
+
+    # NOTE: Coordinator creates materials and saves the file
+    if args.save and args.worker is None:
+        bpy.ops.wm.save_mainfile()
+
+    return 0 if is_ok else 1
+
+
+def _parse_cache_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog=f"blender --command {CLI_COMMAND_CACHE}",
+        description="Inspect and prune the cache of baked images.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="",
+        help="Cache directory. Defaults to the one set in the add-on preferences",
+    )
+    actions = parser.add_subparsers(dest="action", required=True)
+    actions.add_parser("info", help="Print number and size of cached images")
+    prune = actions.add_parser("prune", help="Remove least recently used images")
+    prune.add_argument(
+        "--max-size",
+        type=float,
+        default=None,
+        metavar="GB",
+        help="Size to fit in. Defaults to the limit set in the add-on preferences",
+    )
+    prune.add_argument(
+        "--max-age",
+        type=float,
+        default=0.0,
+        metavar="DAYS",
+        help="Also remove images unused for more days than this",
+    )
+    actions.add_parser("clear", help="Remove all cached images")
+    return parser.parse_args(argv)
+
+
+def cli_cache(argv: list[str]) -> int:
+    """Manage the bake cache and return exit code."""
+    args = _parse_cache_args(argv)
+
+    cache = BakeCache.from_preferences()
+    if args.cache_dir:
+        cache = BakeCache(
+            directory=Path(args.cache_dir),
+            size_limit=cache.size_limit if cache is not None else 0,
+        )
+    if cache is None:
+        log_err("Cache directory is not set")
+        return 1
+
+    match args.action:
+        case "info":
+            entries = cache.get_entries()
+            total_size = sum(entry.size for entry in entries)
+            log(f"Cache directory: {str(cache.directory)!r}")
+            log(
+                f"Images: {len(entries)}, size: {total_size / _MB:.1f} MB,"
+                f" limit: {cache.size_limit / _MB:.1f} MB"
+            )
+        case "prune":
+            if args.max_size is None:
+                size_limit = cache.size_limit
+            else:
+                size_limit = int(args.max_size * _GB)
+            if not size_limit and not args.max_age:
+                log_err("Nothing to prune by, set --max-size or --max-age")
+                return 1
+            removed = cache.prune(size_limit, max_age=args.max_age * _DAY)
+            log(
+                f"Removed images: {len(removed)},"
+                f" {sum(entry.size for entry in removed) / _MB:.1f} MB"
+            )
+        case "clear":
+            removed = cache.clear()
+            log(f"Removed images: {len(removed)}")
+
+    return 0
+
+
+def register() -> None:
+    """Register CLI commands."""
+    # pylint: disable-next=c-extension-no-member
+    handle = bpy.utils.register_cli_command(  # type: ignore[attr-defined]
+        CLI_COMMAND_BAKE, cli_bake
+    )
+    _cli_handles.append(handle)
+    # pylint: disable-next=c-extension-no-member
+    handle = bpy.utils.register_cli_command(  # type: ignore[attr-defined]
+        CLI_COMMAND_CACHE, cli_cache
+    )
+    _cli_handles.append(handle)
+
+
+def unregister() -> None:
+    """Unregister CLI commands."""
+    for handle in _cli_handles:
+        # pylint: disable-next=c-extension-no-member
+        bpy.utils.unregister_cli_command(handle)  # type: ignore[attr-defined]
+    _cli_handles.clear()
@@ -209,3 +209,4 @@ class Colorspace(CaseSensitiveStrEnum):
 
     SRGB = DEFAULT = "sRGB"
     NON_COLOR = "Non-Color"
+    LINEAR = "Linear Rec.709"
@@ -0,0 +1,143 @@
+"""Bake farm.
+
+Splits baking of Texture Sets between several background Blender processes.
+Each worker runs `pawsbkr_bake` CLI command with `--worker` argument and bakes
+its own share of the bake tasks.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+from collections.abc import Sequence
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import IO
+
+import bpy
+
+from ._helpers import log, log_err
+from .utils import AddonException
+
+
+@dataclass(kw_only=True)
+class FarmSettings:
+    """Settings of a bake farm run."""
+
+    blend_file: str
+    texture_sets: Sequence[str] = ()
+    """Names of the Texture Sets to bake, empty for all enabled."""
+    scene: str = ""
+    workers: int = 2
+    threads: int = 0
+    """Render threads per worker, 0 to split CPU cores evenly."""
+
+
+def get_worker_threads(workers: int) -> int:
+    """Return number of render threads for each of the workers."""
+    return max((os.cpu_count() or 1) // max(workers, 1), 1)
+
+
+def get_worker_cores(index: int, threads: int, cores: Sequence[int]) -> list[int]:
+    """Return the worker's own subset of the CPU cores, `threads` of them.
+
+    Cores are split in order of worker index, empty if there aren't enough.
+    """
+    first = index * threads
+    if threads < 1 or first + threads > len(cores):
+        return []
+    return sorted(cores)[first : first + threads]
+
+
+def pin_worker_cores(index: int, threads: int) -> None:
+    """Restrict the worker process to its own CPU cores, see `get_worker_cores()`.
+
+    Keeps render threads of the workers from competing for the same cores.
+    Not supported on every platform, workers run unpinned then.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return
+
+    cores = get_worker_cores(index, threads, list(os.sched_getaffinity(0)))
+    if not cores:
+        log(f"Not enough CPU cores to pin worker {index} to {threads} of them")
+        return
+    os.sched_setaffinity(0, cores)
+    log(f"Worker {index} pinned to CPU cores {cores}")
+
+
+def build_worker_command(
+    settings: FarmSettings, *, index: int, command: str
+) -> list[str]:
+    """Return command line of a worker process."""
+    threads = settings.threads or get_worker_threads(settings.workers)
+
+    cmd = [
+        bpy.app.binary_path,
+        "--command",
+        command,
+        settings.blend_file,
+        "--threads",
+        str(threads),
+        "--worker",
+        f"{index}/{settings.workers}",
+    ]
+    for name in settings.texture_sets:
+        cmd += ["--texture-set", name]
+    if settings.scene:
+        cmd += ["--scene", settings.scene]
+
+    return cmd
+
+
+def _pipe_output(stream: IO[str], prefix: str) -> None:
+    for line in stream:
+        sys.stdout.write(f"{prefix}{line}")
+    sys.stdout.flush()
+
+
+def run_bake_farm(settings: FarmSettings, *, command: str) -> int:
+    """Run worker processes and wait for them to finish.
+
+    :param command: Name of the CLI command to run in workers
+    :return: 0 if all workers succeeded, 1 otherwise
+    """
+    if not bpy.app.binary_path:
+        raise AddonException("Blender executable path is unknown, can't run workers")
+    if settings.workers < 1:
+        raise AddonException(f"Invalid number of workers: {settings.workers}")
+
+    processes: list[subprocess.Popen[str]] = []
+    readers: list[threading.Thread] = []
+    is_ok = True
+    # NOTE: Exiting the stack waits for the started workers, even on errors
+    with ExitStack() as stack:
+        for index in range(settings.workers):
+            cmd = build_worker_command(settings, index=index, command=command)
+            log(f"Starting worker {index}: {' '.join(cmd)}")
+            # NOTE: Workers run the same Blender binary with trusted arguments
+            process = stack.enter_context(
+                subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                )
+            )
+            reader = threading.Thread(
+                target=_pipe_output,
+                args=(process.stdout, f"[worker {index}] "),
+                daemon=True,
+            )
+            reader.start()
+            processes.append(process)
+            readers.append(reader)
+
+        for index, (process, reader) in enumerate(zip(processes, readers, strict=True)):
+            returncode = process.wait()
+            reader.join()
+            if returncode != 0:
+                log_err(f"Worker {index} failed with exit code {returncode}")
+                is_ok = False
+
+    return 0 if is_ok else 1
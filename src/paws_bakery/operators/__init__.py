@@ -17,6 +17,11 @@ from .texture_set_mesh import (
     TextureSetMeshClear,
     TextureSetMeshRemove,
 )
+from .texture_set_pack import (
+    TextureSetPack,
+    TextureSetPackAdd,
+    TextureSetPackRemove,
+)
 from .texture_set_texture import (
     TextureSetTextureAdd,
     TextureSetTextureCleanupMaterial,
@@ -39,6 +44,9 @@ __all__ = [
     "TextureSetMeshAdd",
     "TextureSetMeshClear",
     "TextureSetMeshRemove",
+    "TextureSetPack",
+    "TextureSetPackAdd",
+    "TextureSetPackRemove",
     "TextureSetRemove",
     "TextureSetTextureAdd",
     "TextureSetTextureCleanupMaterial",
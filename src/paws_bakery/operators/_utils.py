@@ -3,14 +3,18 @@
 import colorsys
 from collections.abc import Sequence
 from itertools import chain
-from typing import cast
+from typing import Any, TypeVar, cast
 
 import bpy
+import numpy as np
+import numpy.typing as npt
 from bpy import types as blt
 
 from ..enums import BlenderImageType, BlenderSpaceType
 from ..props import get_props
 
+_ScalarT = TypeVar("_ScalarT", bound=np.generic)
+
 
 def generate_color_set(number_of_colors: int) -> list[tuple[float, float, float]]:
     """Return a list of visually distinct RGB colors."""
@@ -32,6 +36,35 @@ def get_objects_materials(objects: Sequence[blt.Object]) -> set[blt.Material]:
     return materials
 
 
+def get_material_id_colors(
+    objects: Sequence[blt.Object], *, per_object: bool
+) -> dict[str, tuple[float, float, float]]:
+    """Return Material ID colors by material name, in order of material slots.
+
+    With `per_object` materials of every object are colored separately, as if the
+    objects were baked one by one. Shared material keeps color of the first object.
+    """
+    groups = [[obj] for obj in objects] if per_object else [objects]
+    colors: dict[str, tuple[float, float, float]] = {}
+    for group in groups:
+        names = dict.fromkeys(
+            slot.material.name
+            for obj in group
+            for slot in obj.material_slots
+            if slot.material is not None
+        )
+        for name, color in zip(names, generate_color_set(len(names)), strict=True):
+            colors.setdefault(name, color)
+
+    return colors
+
+
+def has_shared_materials(objects: Sequence[blt.Object]) -> bool:
+    """Return whether any material is assigned to several of the objects."""
+    materials = [get_objects_materials([obj]) for obj in objects]
+    return len(set().union(*materials)) < sum(len(mats) for mats in materials)
+
+
 def get_selected_materials(ctx: blt.Context | None = None) -> set[blt.Material]:
     """Return the set of unique materials assigned to selected objects."""
     if ctx is None:
@@ -44,6 +77,8 @@ def get_selected_materials(ctx: blt.Context | None = None) -> set[blt.Material]:
 
 def show_image_in_editor(context: blt.Context, image: blt.Image) -> None:
     """Show Image in Image Editor area."""
+    if bpy.app.background or context.window is None:
+        return
     if not get_props(context).utils_settings.show_image_in_editor:
         return
 
@@ -65,3 +100,71 @@ def show_image_in_editor(context: blt.Context, image: blt.Image) -> None:
             img_space.image = image
             img_space.use_image_pin = False
             break
+
+
+def resize_image_buffer(
+    img: blt.Image, width: int, height: int, *, is_float: bool, alpha: float = 1.0
+) -> None:
+    """Replace image buffer with a blank black one of the given size.
+
+    Blender fills the buffer when it's accessed, nothing is copied from Python.
+    The image keeps its file path and format, so it can be saved over the file.
+
+    :param alpha: Alpha of the fill, 0 to mark the baked pixels with alpha
+    """
+    filepath_raw = img.filepath_raw
+    file_format = img.file_format
+    # NOTE: Any assignment regenerates the buffer, even of the same values
+    img.generated_type = "BLANK"
+    img.generated_color = (0.0, 0.0, 0.0, alpha)
+    # NOTE: Generated source drops the file path, restore it for saving
+    img.source = "GENERATED"
+    img.use_generated_float = is_float
+    img.generated_width = width
+    img.generated_height = height
+    img.filepath_raw = filepath_raw
+    img.file_format = file_format
+
+
+def get_collection_array(
+    collection: Any, attr: str, dtype: type[_ScalarT], size: int = 1
+) -> npt.NDArray[_ScalarT]:
+    """Return flat array of the attribute of all items of the collection.
+
+    :param size: Number of values of the attribute of an item, e.g. 3 for `co`
+    """
+    values = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(attr, values)
+    return values
+
+
+def set_collection_array(
+    collection: Any, attr: str, values: npt.NDArray[np.generic]
+) -> None:
+    """Set the attribute of all items of the collection from the flat array."""
+    collection.foreach_set(attr, values)
+
+
+def foreach_get_pixels(img: blt.Image, pixels: npt.NDArray[np.float32]) -> None:
+    """Copy all pixels of the image into the float32 array of the same size."""
+    # NOTE: Stubs declare Image.pixels as a float instead of an array
+    cast(Any, img.pixels).foreach_get(pixels)
+
+
+def foreach_set_pixels(img: blt.Image, pixels: npt.NDArray[np.float32]) -> None:
+    """Replace all pixels of the image with the float32 array of the same size."""
+    cast(Any, img.pixels).foreach_set(pixels)
+
+
+def clear_image_pixels(img: blt.Image, *, transparent: bool = False) -> None:
+    """Fill image with opaque black, like a new blank image.
+
+    See `resize_image_buffer()`, the image becomes generated.
+
+    :param transparent: Fill with transparent black instead, so that alpha marks
+        the baked pixels
+    """
+    width, height = img.size
+    resize_image_buffer(
+        img, width, height, is_float=img.is_float, alpha=0.0 if transparent else 1.0
+    )
@@ -0,0 +1,297 @@
+"""Bake high to low normal maps by casting rays against a BVH tree.
+
+Cycles syncs the scene and shades every hit only to read the normal of the high
+poly surface. Here the high poly meshes are put into one
+`mathutils.bvhtree.BVHTree` instead, and rays are cast from the low poly pixels
+the same way Cycles does without a cage: from the surface extruded by Cage
+Extrusion, inwards, up to Ray Distance. Pixel positions and tangent space are
+computed with NumPy in chunks, see `bake_raster.iter_triangle_pixels()`.
+
+Only interpolated mesh normals of the high poly are read, normal maps and bump
+of its materials are ignored.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, cast
+
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+from mathutils.bvhtree import BVHTree
+
+from ..props import BakeSettings
+from ._utils import get_collection_array
+from .bake_common import BakeObjects
+from .bake_raster import (
+    get_corner_positions,
+    get_mesh_triangles,
+    is_evaluated_as_render,
+    iter_triangle_pixels,
+    write_image_pixels,
+)
+
+_NO_HIT = -1
+_RAY_BATCH = 1 << 16
+"""Rays cast at once, limits memory of the Python lists passed to the tree."""
+
+
+@dataclass(kw_only=True)
+class _HighPoly:
+    """High poly meshes in world space, triangle by triangle."""
+
+    tree: BVHTree
+    positions: npt.NDArray[np.float64]
+    """Corner positions, float array of (triangles, 3, 3) shape."""
+    normals: npt.NDArray[np.floating[Any]]
+    """Corner normals, float array of (triangles, 3, 3) shape."""
+
+
+@dataclass(kw_only=True)
+class _LowPoly:
+    """Low poly mesh data of the triangle corners."""
+
+    uvs: npt.NDArray[np.float32]
+    corners: npt.NDArray[np.int32]
+    positions: npt.NDArray[np.float32]
+    """Object space positions of the mesh loops."""
+    normals: npt.NDArray[np.float32]
+    """Object space normals of the mesh loops."""
+    tangents: npt.NDArray[np.float32]
+    bitangent_signs: npt.NDArray[np.float32]
+    matrix: npt.NDArray[np.float64]
+    """World matrix of the object."""
+
+
+def can_bake_normals_bvh(objects: BakeObjects, settings: BakeSettings) -> bool:
+    """Return whether the normals can be baked without Cycles, see `use_bvh_normals`."""
+    if not settings.use_bvh_normals or len(objects.selected) < 2:
+        return False
+    # NOTE: Cage rays run from the cage to the low poly, leave them to Cycles
+    if settings.use_cage:
+        return False
+
+    for b_obj in objects.selected:
+        if b_obj.type != "MESH" or not is_evaluated_as_render(b_obj):
+            return False
+    # NOTE: `Mesh.calc_tangents()` supports triangles and quads only
+    mesh = cast(blt.Mesh, objects.active.data)
+    return all(poly.loop_total <= 4 for poly in mesh.polygons)
+
+
+def _get_corner_normals(mesh: blt.Mesh) -> npt.NDArray[np.float32]:
+    normals = get_collection_array(mesh.corner_normals, "vector", np.float32, 3)
+    return normals.reshape((-1, 3))
+
+
+def _normalize(vectors: npt.NDArray[np.floating[Any]]) -> npt.NDArray[np.float64]:
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    normalized: npt.NDArray[np.float64] = vectors / np.where(lengths > 0, lengths, 1.0)
+    return normalized
+
+
+def _get_world_triangles(
+    eval_obj: blt.Object, mesh: blt.Mesh
+) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.float64]]:
+    """Return world positions and normals of the triangle corners."""
+    mesh.calc_loop_triangles()  # type: ignore[no-untyped-call]
+    corners = get_collection_array(mesh.loop_triangles, "loops", np.int32, 3)
+    corners = corners.reshape((-1, 3))
+
+    matrix = np.array(eval_obj.matrix_world, dtype=np.float64)
+    normal_matrix = np.linalg.inv(matrix[:3, :3])
+    return (
+        get_corner_positions(eval_obj, mesh)[corners],
+        _normalize(_get_corner_normals(mesh) @ normal_matrix)[corners],
+    )
+
+
+def _get_high_poly(
+    high_objects: Sequence[blt.Object], depsgraph: blt.Depsgraph
+) -> _HighPoly:
+    positions = []
+    normals = []
+    for b_obj in high_objects:
+        eval_obj = cast(blt.Object, b_obj.evaluated_get(depsgraph))
+        mesh = eval_obj.to_mesh()
+        try:
+            obj_positions, obj_normals = _get_world_triangles(eval_obj, mesh)
+        finally:
+            eval_obj.to_mesh_clear()  # type: ignore[no-untyped-call]
+        positions.append(obj_positions)
+        normals.append(obj_normals)
+
+    tri_positions = np.concatenate(positions).astype(np.float64)
+    tree = BVHTree.FromPolygons(
+        tri_positions.reshape(-1, 3).tolist(),
+        np.arange(len(tri_positions) * 3).reshape(-1, 3).tolist(),
+    )
+    return _HighPoly(
+        tree=tree, positions=tri_positions, normals=np.concatenate(normals)
+    )
+
+
+def _get_low_poly(eval_obj: blt.Object, mesh: blt.Mesh, uv_layer: str) -> _LowPoly:
+    uvs, corners, _ = get_mesh_triangles(mesh, uv_layer)
+    layer = mesh.uv_layers[uv_layer] if uv_layer else mesh.uv_layers.active
+    # NOTE: Mesh without UV layer is reported by `get_mesh_triangles()`
+    assert layer is not None
+    mesh.calc_tangents(uvmap=layer.name)
+
+    tangents = get_collection_array(mesh.loops, "tangent", np.float32, 3)
+    signs = get_collection_array(mesh.loops, "bitangent_sign", np.float32)
+    positions = get_collection_array(mesh.vertices, "co", np.float32, 3)
+    vertex_indices = get_collection_array(mesh.loops, "vertex_index", np.int32)
+
+    return _LowPoly(
+        uvs=uvs,
+        corners=corners,
+        positions=positions.reshape((-1, 3))[vertex_indices],
+        normals=_get_corner_normals(mesh),
+        tangents=tangents.reshape((-1, 3)),
+        bitangent_signs=signs,
+        matrix=np.array(eval_obj.matrix_world, dtype=np.float64),
+    )
+
+
+def _interpolate(
+    values: npt.NDArray[np.floating[Any]], weights: npt.NDArray[np.floating[Any]]
+) -> npt.NDArray[np.float64]:
+    interpolated: npt.NDArray[np.float64] = np.einsum("pc,pcv->pv", weights, values)
+    return interpolated
+
+
+def _cast_rays(
+    high: _HighPoly,
+    origins: npt.NDArray[np.float64],
+    directions: npt.NDArray[np.float64],
+    distance: float,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """Return hit triangles of the rays, `_NO_HIT` if missed, and hit distances."""
+    tris = np.full(len(origins), _NO_HIT, dtype=np.int64)
+    distances = np.zeros(len(origins), dtype=np.float64)
+    ray_cast = high.tree.ray_cast
+    # NOTE: Rays are cast in this process, the tree and Blender data can't be
+    # passed to worker processes. Bake farm workers split whole bakes instead
+    for start in range(0, len(origins), _RAY_BATCH):
+        batch = slice(start, start + _RAY_BATCH)
+        hits = [
+            ray_cast(origin, direction, distance)
+            for origin, direction in zip(
+                origins[batch].tolist(), directions[batch].tolist(), strict=True
+            )
+        ]
+        tris[batch] = [_NO_HIT if tri is None else tri for _, _, tri, _ in hits]
+        distances[batch] = [dist or 0.0 for _, _, _, dist in hits]
+    return tris, distances
+
+
+def _get_hit_normals(
+    high: _HighPoly, tris: npt.NDArray[np.int64], locations: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """Return smooth normals of the high poly at the hit locations."""
+    corners = high.positions[tris]
+    edge_1 = corners[:, 1] - corners[:, 0]
+    edge_2 = corners[:, 2] - corners[:, 0]
+    offset = locations - corners[:, 0]
+
+    d_11 = np.einsum("pv,pv->p", edge_1, edge_1)
+    d_12 = np.einsum("pv,pv->p", edge_1, edge_2)
+    d_22 = np.einsum("pv,pv->p", edge_2, edge_2)
+    d_o1 = np.einsum("pv,pv->p", offset, edge_1)
+    d_o2 = np.einsum("pv,pv->p", offset, edge_2)
+    det = d_11 * d_22 - d_12 * d_12
+    det = np.where(det != 0, det, 1.0)
+    weight_1 = (d_22 * d_o1 - d_12 * d_o2) / det
+    weight_2 = (d_11 * d_o2 - d_12 * d_o1) / det
+    weights = np.stack((1.0 - weight_1 - weight_2, weight_1, weight_2), axis=-1)
+
+    return _normalize(_interpolate(high.normals[tris], weights))
+
+
+def _to_tangent_space(
+    low: _LowPoly,
+    corners: npt.NDArray[np.int32],
+    weights: npt.NDArray[np.float32],
+    normals: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """Return world normals in the tangent space of the low poly pixels."""
+    tangent = _interpolate(low.tangents[corners], weights)
+    normal = _interpolate(low.normals[corners], weights)
+    sign = np.where(
+        np.einsum("pc,pc->p", weights, low.bitangent_signs[corners]) < 0, -1.0, 1.0
+    )
+    bitangent = sign[:, None] * np.cross(normal, tangent)
+
+    # NOTE: As Blender, transposed world matrix brings normals to object space
+    normals = normals @ low.matrix[:3, :3]
+    # NOTE: Rows of the inverse of the (tangent, bitangent, normal) basis
+    det = np.einsum("pv,pv->p", tangent, np.cross(bitangent, normal))
+    inverse = np.stack(
+        (
+            np.cross(bitangent, normal),
+            np.cross(normal, tangent),
+            np.cross(tangent, bitangent),
+        ),
+        axis=1,
+    )
+    result = np.einsum("prv,pv->pr", inverse, normals)
+    result[det == 0] = (0.0, 0.0, 1.0)
+    return _normalize(result * np.sign(det)[:, None])
+
+
+def bake_normals_bvh(
+    image: blt.Image,
+    *,
+    context: blt.Context,
+    objects: BakeObjects,
+    settings: BakeSettings,
+    uv_layer: str = "",
+) -> None:
+    """Write the normals of the high poly objects into the image.
+
+    See `can_bake_normals_bvh()`. Only pixels whose rays hit the high poly are
+    written, margin is dilated after baking.
+
+    :param uv_layer: UV layer to bake to instead of the active one
+    """
+    width, height = image.size
+    pixels = np.zeros((height, width, 4), dtype=np.float32)
+    flat = pixels.reshape((-1, 4))
+
+    depsgraph = context.evaluated_depsgraph_get()
+    high = _get_high_poly(
+        [b_obj for b_obj in objects.selected if b_obj != objects.active], depsgraph
+    )
+    distance = settings.max_ray_distance or float(np.finfo(np.float32).max)
+
+    eval_obj = cast(blt.Object, objects.active.evaluated_get(depsgraph))
+    mesh = eval_obj.to_mesh()
+    try:
+        low = _get_low_poly(eval_obj, mesh, uv_layer)
+    finally:
+        eval_obj.to_mesh_clear()  # type: ignore[no-untyped-call]
+
+    normal_matrix = np.linalg.inv(low.matrix[:3, :3])
+    for indices, tris, weights in iter_triangle_pixels(low.uvs, width, height):
+        corners = low.corners[tris]
+        # NOTE: Extruded in object space along the interpolated normals
+        normals = low.normals[corners]
+        origins = _interpolate(
+            low.positions[corners] + normals * settings.cage_extrusion, weights
+        )
+        origins = origins @ low.matrix[:3, :3].T + low.matrix[:3, 3]
+        directions = -_normalize(_interpolate(normals, weights) @ normal_matrix)
+
+        hit_tris, distances = _cast_rays(high, origins, directions, distance)
+        is_hit = hit_tris != _NO_HIT
+        locations = origins[is_hit] + directions[is_hit] * distances[is_hit, None]
+        hit_normals = _get_hit_normals(high, hit_tris[is_hit], locations)
+        tangent_normals = _to_tangent_space(
+            low, corners[is_hit], weights[is_hit], hit_normals
+        )
+
+        flat[indices[is_hit], :3] = tangent_normals * 0.5 + 0.5
+        flat[indices[is_hit], 3] = 1.0
+
+    write_image_pixels(image, pixels)
@@ -0,0 +1,168 @@
+"""Content-addressable cache of baked images.
+
+Images are stored by the hash of their bake inputs, see `BakeTask.input_hash`,
+and can be reused by any .blend file sharing the cache directory.
+"""
+
+import os
+import shutil
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+
+import bpy
+
+from .._helpers import log, log_err
+from ..preferences import get_preferences
+from ..props_enums import ImageFileFormat
+
+_GB = 1024**3
+_CACHE_SUFFIXES = frozenset(file_format.extension for file_format in ImageFileFormat)
+
+
+def _copy_file(src: Path, dst: Path) -> None:
+    """Copy the file atomically, other processes never see a partially written file.
+
+    :raises OSError: If the file can't be copied
+    """
+    tmp_path = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        shutil.copyfile(src, tmp_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, dst)
+
+
+@dataclass(kw_only=True, frozen=True)
+class CacheEntry:
+    """Cached image file."""
+
+    key: str
+    path: Path
+    size: int
+    last_used: float
+    """Modification time, updated on each cache hit."""
+
+
+@dataclass(kw_only=True)
+class BakeCache:
+    """Cache of baked images with least recently used eviction."""
+
+    directory: Path
+    size_limit: int = 0
+    """Maximum size in bytes, 0 for unlimited."""
+
+    @classmethod
+    def from_preferences(cls) -> "BakeCache | None":
+        """Return cache configured in the add-on preferences, if enabled."""
+        prefs = get_preferences()
+        if not prefs.cache_directory:
+            return None
+
+        return cls(
+            directory=Path(bpy.path.abspath(prefs.cache_directory)),
+            size_limit=int(prefs.cache_size_limit * _GB),
+        )
+
+    def get_path(self, key: str, suffix: str) -> Path:
+        """Return path of the cached image.
+
+        :param suffix: File suffix of the image, the key already depends on the
+            file format
+        """
+        return self.directory.joinpath(key[:2], key + suffix.lower())
+
+    def fetch(self, key: str, image_path: str) -> bool:
+        """Copy the cached image to the image path, return whether it was found."""
+        cached_path = self.get_path(key, Path(image_path).suffix)
+        if not cached_path.is_file():
+            return False
+
+        dst_path = Path(bpy.path.abspath(image_path))
+        try:
+            _copy_file(cached_path, dst_path)
+        except OSError as ex:
+            log_err(f"Failed to read cached image {str(cached_path)!r}: {ex}")
+            return False
+        # NOTE: Marks the image as recently used, unless another process removed it
+        with suppress(OSError):
+            os.utime(cached_path)
+
+        log(f"Cache hit: {dst_path.name!r}")
+        return True
+
+    def store(self, key: str, image_path: str) -> None:
+        """Store the image in the cache and evict old entries if needed."""
+        cached_path = self.get_path(key, Path(image_path).suffix)
+        try:
+            _copy_file(Path(bpy.path.abspath(image_path)), cached_path)
+        except OSError as ex:
+            log_err(f"Failed to cache image {image_path!r}: {ex}")
+            return
+
+        if self.size_limit:
+            self.prune(self.size_limit)
+
+    def get_entries(self) -> list[CacheEntry]:
+        """Return cached images, least recently used first."""
+        if not self.directory.is_dir():
+            return []
+
+        entries: list[CacheEntry] = []
+        for path in self.directory.glob("*/*"):
+            if path.suffix not in _CACHE_SUFFIXES:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # NOTE: Removed by another process in the meantime
+                continue
+            entries.append(
+                CacheEntry(
+                    key=path.stem,
+                    path=path,
+                    size=stat.st_size,
+                    last_used=stat.st_mtime,
+                )
+            )
+
+        entries.sort(key=lambda entry: entry.last_used)
+        return entries
+
+    def prune(self, size_limit: int, max_age: float = 0.0) -> list[CacheEntry]:
+        """Remove least recently used images until the cache fits the size limit.
+
+        :param size_limit: Size in bytes to fit in, 0 for unlimited
+        :param max_age: Also remove images unused for more seconds than this,
+            0 to keep them
+        :return: Removed entries
+        """
+        entries = self.get_entries()
+        total_size = sum(entry.size for entry in entries)
+        now = time.time()
+
+        removed: list[CacheEntry] = []
+        for entry in entries:
+            is_oversized = 0 < size_limit < total_size
+            is_expired = 0 < max_age < now - entry.last_used
+            if (is_oversized or is_expired) and self.__remove(entry):
+                total_size -= entry.size
+                removed.append(entry)
+
+        return removed
+
+    def clear(self) -> list[CacheEntry]:
+        """Remove all cached images."""
+        return [entry for entry in self.get_entries() if self.__remove(entry)]
+
+    @staticmethod
+    def __remove(entry: CacheEntry) -> bool:
+        try:
+            entry.path.unlink()
+        except OSError as ex:
+            log_err(f"Failed to remove cached image {str(entry.path)!r}: {ex}")
+            return False
+        return True
@@ -6,6 +6,8 @@ from bpy import types as blt
 
 from ..preferences import get_preferences
 from ..props import get_bake_settings
+from ..props_enums import ImageFileFormat
+from ..utils import AddonException
 
 
 def generate_image_name_and_path(
@@ -14,16 +16,25 @@ def generate_image_name_and_path(
     settings_id: str,
     texture_set_name: str,
     object_prefix: str = "",
+    udim_tile: str = "",
+    size: str = "",
 ) -> tuple[str, str]:
-    """Return generated image name and path."""
+    """Return generated image name and path.
+
+    :param udim_tile: UDIM tile number of the image, or the `<UDIM>` token for
+        the tiled image of all tiles
+    :param size: Size of the image if not the texture size, see
+        `BakeSettings.extra_sizes`
+    """
     image_name_parts = [texture_set_name]
     if object_prefix:
         image_name_parts.insert(0, object_prefix)
 
-    name = (
-        get_bake_settings(context, settings_id).get_name("_".join(image_name_parts))
-        + ".png"
-    )
+    settings = get_bake_settings(context, settings_id)
+    name = settings.get_name("_".join(image_name_parts), size)
+    if udim_tile:
+        name = f"{name}.{udim_tile}"
+    name += ImageFileFormat[settings.file_format].extension
     filepath = "/".join(
         [
             get_preferences().output_directory,
@@ -35,6 +46,40 @@ def generate_image_name_and_path(
     return name, filepath
 
 
+def generate_extra_image_paths(
+    *,
+    context: blt.Context,
+    settings_id: str,
+    texture_set_name: str,
+    object_prefix: str = "",
+    udim_tile: str = "",
+) -> dict[int, str]:
+    """Return paths of the image downscaled to the extra sizes, by size.
+
+    :raises AddonException: If Name Template doesn't give the sizes own names
+    """
+    settings = get_bake_settings(context, settings_id)
+    paths = {
+        size: generate_image_name_and_path(
+            context=context,
+            settings_id=settings_id,
+            texture_set_name=texture_set_name,
+            object_prefix=object_prefix,
+            udim_tile=udim_tile,
+            size=str(size),
+        )[1]
+        for size in (int(settings.size), *settings.get_extra_sizes())
+    }
+    if len(set(paths.values())) < len(paths):
+        raise AddonException(
+            f"Name Template {settings.name_template!r} must contain {{size}}"
+            " to save extra sizes",
+            {"extra_sizes": settings.get_extra_sizes()},
+        )
+    del paths[int(settings.size)]
+    return paths
+
+
 @dataclass(kw_only=True)
 class BakeObjects:
     """Container for objects to bake.
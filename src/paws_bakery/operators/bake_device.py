@@ -0,0 +1,87 @@
+"""Cycles device and CPU threads of the bakes, see `RenderDevice`."""
+
+from typing import Any, cast
+
+import bpy
+from bpy import types as blt
+
+from .._helpers import log, log_warn
+from ..preferences import get_preferences
+from ..props_enums import RenderDevice
+
+_CYCLES_ADDON = "cycles"
+
+
+class _RenderDevices:
+    has_gpu: bool | None = None
+    """Whether Cycles has a GPU device enabled, None until detected."""
+    render_threads: int = 0
+    """Threads set by `set_render_threads()`, override the preferences."""
+
+
+def detect_render_devices() -> None:
+    """Detect whether Cycles has a GPU device enabled.
+
+    Called once on register, as refreshing Cycles devices may take a while.
+    """
+    addon = bpy.context.preferences.addons.get(_CYCLES_ADDON)
+    if addon is None:
+        # NOTE: Cycles may register after the addon, detect on the first bake
+        return
+
+    # NOTE: Preferences of the Cycles addon are defined in Python, not in stubs
+    cycles_prefs = cast(Any, addon.preferences)
+    cycles_prefs.refresh_devices()
+    _RenderDevices.has_gpu = bool(
+        cycles_prefs.compute_device_type != "NONE" and cycles_prefs.has_active_device()
+    )
+    log(f"GPU render device {'found' if _RenderDevices.has_gpu else 'not found'}")
+
+
+def has_gpu() -> bool:
+    """Return whether Cycles has a GPU device enabled."""
+    if _RenderDevices.has_gpu is None:
+        detect_render_devices()
+    return bool(_RenderDevices.has_gpu)
+
+
+def set_render_threads(threads: int) -> None:
+    """Set number of render threads used for baking.
+
+    :param threads: Number of threads, 0 to use the preferences
+    """
+    _RenderDevices.render_threads = max(threads, 0)
+
+
+def get_render_device(device: RenderDevice) -> str:
+    """Return Cycles device the bakes run on, `CPU` or `GPU`."""
+    if device is RenderDevice.CPU:
+        return "CPU"
+    if has_gpu():
+        return "GPU"
+    if device is RenderDevice.GPU:
+        log_warn("No GPU device enabled in Cycles preferences, baking on CPU")
+    return "CPU"
+
+
+def apply_render_device(scene: blt.Scene) -> None:
+    """Set device, threads and tile size of the scene from the preferences."""
+    prefs = get_preferences()
+    device = get_render_device(RenderDevice[prefs.render_device])
+    scene.cycles.device = device
+
+    threads = _RenderDevices.render_threads or prefs.render_threads
+    if threads:
+        scene.render.threads_mode = "FIXED"
+        scene.render.threads = threads
+    else:
+        scene.render.threads_mode = "AUTO"
+
+    # NOTE: GPUs render best with Blender's default, large tiles
+    if device == "CPU" and prefs.render_tile_size:
+        scene.cycles.use_auto_tile = True
+        scene.cycles.tile_size = prefs.render_tile_size
+    else:
+        cycles_props = scene.cycles.bl_rna.properties
+        scene.cycles.use_auto_tile = cycles_props["use_auto_tile"].default
+        scene.cycles.tile_size = cycles_props["tile_size"].default
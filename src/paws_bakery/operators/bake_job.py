@@ -1,22 +1,67 @@
 """Manage images and run BakeManager."""
 
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass, field
 from enum import Enum, auto
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 import bpy
+import numpy as np
+import numpy.typing as npt
 from bpy import types as blt
 
 from .._helpers import log
 from ..enums import BlenderJobType
 from ..props import BakeSettings, get_props
-from ..props_enums import BakeTextureType
-from ..utils import AddonException
-from ._utils import show_image_in_editor
+from ..props_enums import BakeTextureType, DownscaleFilter, ImageFileFormat
+from ..utils import AddonException, TimerManager
+from ._utils import clear_image_pixels, resize_image_buffer, show_image_in_editor
+from .bake_bvh import bake_normals_bvh, can_bake_normals_bvh
+from .bake_cache import BakeCache
 from .bake_common import BakeObjects
 from .bake_manager import BakeManager
+from .bake_memory import get_bake_tile_count
+from .bake_raster import can_rasterize, rasterize_image
+from .bake_tiles import (
+    TILE_UV_LAYER_NAME,
+    TiledBake,
+    get_tile_count,
+    get_tile_padding,
+    get_tiled_bake_meshes,
+    plan_tiles,
+)
+from .bake_udim import set_udim_uvs
+from .image_derive import derive_image
+from .image_dilate import (
+    dilate,
+    dilate_image,
+    get_dilation_background,
+    get_dilation_margin,
+)
+from .image_downscale import (
+    downscale,
+    downscale_image,
+    downscale_rows,
+    downscale_to_size,
+    get_image_pixels,
+)
+from .image_post_process import (
+    PostProcessQueue,
+    can_encode_image,
+    get_image_channels,
+    reload_image,
+    write_png,
+)
+from .image_save import (
+    get_image_colorspace,
+    get_output_options,
+    save_image,
+    save_pixels,
+)
+from .image_stream import get_block_rows, is_large_image, map_image_pixels
 
 
 class BakeJobState(Enum):
@@ -36,6 +81,38 @@ class BakeHandlerState(Enum):
     COMPLETE = auto()
 
 
+def _write_extra_sizes(
+    pixels: npt.NDArray[np.float32],
+    abs_paths: Mapping[int, str],
+    downscale_filter: DownscaleFilter,
+    *,
+    channels: int,
+    bit_depth: int,
+    compress_level: int,
+    premultiplied: bool,
+) -> None:
+    """Write PNG files of the pixels downscaled to the sizes, on any thread."""
+    for size, abs_path in abs_paths.items():
+        extra = downscale_to_size(pixels, size, downscale_filter, clip=bit_depth == 8)
+
+        def get_rows(
+            start: int, stop: int, extra: npt.NDArray[np.float32] = extra
+        ) -> npt.NDArray[np.float32]:
+            return extra[start:stop, :, :channels]
+
+        write_png(
+            Path(abs_path),
+            get_rows,
+            width=size,
+            height=size,
+            channels=channels,
+            block_rows=size,
+            bit_depth=bit_depth,
+            compress_level=compress_level,
+            premultiplied=premultiplied,
+        )
+
+
 @dataclass(kw_only=True)
 class BakeJob:
     """Manage images and run BakeManager."""
@@ -49,11 +126,36 @@ class BakeJob:
     image_name: str
     image_path: str
 
+    blocking: bool = False
+    """Bake synchronously. `on_execute()` returns only when the job is done."""
+    use_persistent_data: bool = False
+    """Keep render data for the next job baking the same objects."""
+    cache_key: str = ""
+    """Key of the image in the bake cache. Only jobs baking a whole image use it."""
+    post_process: PostProcessQueue | None = None
+    """Queue to downscale and save the image on, saved right away if not set."""
+    udim_tile: int = 0
+    """UDIM tile number the image is saved as, 0 if it isn't a tile."""
+    source_paths: Mapping[BakeTextureType, str] = field(default_factory=dict)
+    """Saved images a derived texture is computed from, by their type."""
+    extra_paths: Mapping[int, str] = field(default_factory=dict)
+    """Paths of the image downscaled to the extra sizes, by size, see
+    `BakeSettings.extra_sizes`."""
+
+    time_started: float = field(init=False, default=0.0)
+    """`time.perf_counter()` value when the job was started."""
+    time_completed: float = field(init=False, default=0.0)
+    """`time.perf_counter()` value when Blender reported the bake end."""
+
     __image: blt.Image = field(init=False)
     __manager: BakeManager = field(init=False)
     __handlers_state: BakeHandlerState = field(
         init=False, default=BakeHandlerState.CREATED
     )
+    __is_without_cycles: bool = field(init=False, default=False)
+    """Job finished without a Cycles bake, from the cache or rasterized."""
+    __tile_count: int = field(init=False, default=1)
+    __tiled_bake: TiledBake | None = field(init=False, default=None)
 
     def __post_init__(self) -> None:
         """Create handler methods after initialization."""
@@ -73,7 +175,10 @@ class BakeJob:
         )
 
     def on_execute(self) -> BakeJobState:
-        """Call handler from Operator's execute()."""
+        """Call handler from Operator's execute().
+
+        Returns `BakeJobState.FINISHED` right away if the job is blocking.
+        """
         if bpy.app.is_job_running(BlenderJobType.OBJECT_BAKE):
             raise AddonException("Blender OBJECT_BAKE job already running.")
         if BakeManager.is_running():
@@ -81,31 +186,42 @@ class BakeJob:
                 f"Another instance of {BakeManager.__name__!r} already running."
             )
 
+        self.time_started = time.perf_counter()
+        if self.udim_tile:
+            set_udim_uvs(self.objects.active, self.udim_tile)
+        if self.__finish_without_cycles():
+            return BakeJobState.FINISHED
+
+        self.__tile_count = self.__get_tile_count()
         self.__image = self.__image_prepare()
         show_image_in_editor(self.context, self.__image)
 
-        self.__manager = BakeManager(
-            context=self.context,
-            objects=self.objects,
-            settings=self.settings,
-            image=self.__image,
-            clear_image=self.clear_image,
-            keep_scene=True,
-        )
-
         for handler, cb in self.__handlers:
             handler.append(cb)
 
         try:
-            self.__manager.on_execute()
-        except AddonException:
+            self.__start_baking()
+        except Exception:
             self.__cleanup()
             raise
 
-        return BakeJobState.RUNNING
+        if not self.blocking:
+            return BakeJobState.RUNNING
+
+        self.__cleanup()
+        if not self.__image.is_dirty:
+            raise AddonException(
+                "Baking went wrong: Bake finished but images appear to be unchanged"
+            )
+        self.__image_finalize()
+
+        return BakeJobState.FINISHED
 
     def on_modal(self) -> BakeJobState:
         """Call handler from Operator's modal()."""
+        if self.__is_without_cycles:
+            return BakeJobState.FINISHED
+
         self.__manager.on_modal()
         if BakeManager.is_running():
             return BakeJobState.RUNNING
@@ -119,6 +235,15 @@ class BakeJob:
             return BakeJobState.CANCELED
 
         if self.__handlers_state == BakeHandlerState.COMPLETE:
+            if self.__tiled_bake is not None:
+                try:
+                    is_tile_started = self.__continue_tiled_bake(self.__tiled_bake)
+                except Exception:
+                    self.__cleanup()
+                    raise
+                if is_tile_started:
+                    return BakeJobState.RUNNING
+
             if self.__image.is_dirty:
                 self.__image_finalize()
                 self.__cleanup()
@@ -129,27 +254,199 @@ class BakeJob:
             "Baking went wrong: Bake job not running but images appear to be unchanged"
         )
 
+    def __get_tile_count(self) -> int:
+        can_tile = self.clear_image and self.scale_image
+        requested = get_tile_count(self.settings)
+        if requested > 1 and not can_tile:
+            # NOTE: Tiles are assembled from scratch, they can't add objects to an
+            # image baked by other jobs
+            log("Image is baked by several jobs, baking it without tiles")
+
+        tile_count = get_bake_tile_count(
+            context=self.context,
+            objects=self.objects,
+            settings=self.settings,
+            can_tile=can_tile,
+            image_name=self.image_name,
+        )
+        if tile_count > requested:
+            log(f"Baking in {tile_count}x{tile_count} tiles to fit the memory budget")
+        return tile_count
+
+    def __get_tiled_bake(self) -> TiledBake | None:
+        if self.__tile_count == 1:
+            return None
+
+        tiled_bake = TiledBake(
+            image=self.__image,
+            meshes=get_tiled_bake_meshes(
+                self.objects.selected, self.objects.active, self.settings
+            ),
+            settings=self.settings,
+            tiles=plan_tiles(
+                int(self.settings.size),
+                self.__tile_count,
+                get_tile_padding(self.settings),
+            ),
+        )
+        tiled_bake.begin()
+        return tiled_bake
+
+    def __start_baking(self) -> None:
+        self.__tiled_bake = self.__get_tiled_bake()
+        self.__start_bake()
+        if self.blocking:
+            self.__bake_remaining_tiles()
+
+    def __start_bake(self) -> None:
+        """Start the bake of the image or of the next tile."""
+        image = self.__image
+        uv_layer = ""
+        if self.__tiled_bake is not None:
+            self.__tiled_bake.prepare_tile()
+            image = self.__tiled_bake.tile_image
+            uv_layer = TILE_UV_LAYER_NAME
+
+        self.__handlers_state = BakeHandlerState.CREATED
+        self.__manager = BakeManager(
+            context=self.context,
+            objects=self.objects,
+            settings=self.settings,
+            image=image,
+            clear_image=self.clear_image,
+            keep_scene=True,
+            blocking=self.blocking,
+            # NOTE: Tile UVs change between bakes
+            use_persistent_data=self.use_persistent_data and uv_layer == "",
+            uv_layer=uv_layer,
+        )
+        self.__manager.on_execute()
+
+    def __continue_tiled_bake(self, tiled_bake: TiledBake) -> bool:
+        """Store the baked tile and start the next one, return whether it started.
+
+        The image is assembled after the last tile.
+        """
+        if tiled_bake.store_tile():
+            self.__start_bake()
+            return True
+        tiled_bake.finish()
+        return False
+
+    def __bake_remaining_tiles(self) -> None:
+        tiled_bake = self.__tiled_bake
+        if tiled_bake is None:
+            return
+        # NOTE: Each tile is stored once, the last one finishes the bake
+        for _ in tiled_bake.tiles:
+            if not self.__continue_tiled_bake(tiled_bake):
+                break
+
     def cancel(self) -> None:
         """Cancel running bake job and cleanup."""
-        self.__manager.cancel()
+        if not self.__is_without_cycles:
+            self.__manager.cancel()
         self.__cleanup()
 
     def __cb_object_bake_factory(
         self, state: BakeHandlerState
     ) -> Callable[[blt.Object, Any], None]:
         def cb(b_obj: blt.Object, _: Any) -> None:
-            if b_obj is self.objects.active:
-                self.__handlers_state = state
+            if b_obj is not self.objects.active:
+                return
+
+            self.__handlers_state = state
+            if state is not BakeHandlerState.PRE:
+                self.time_completed = time.perf_counter()
+                # NOTE: Don't wait for the next timer tick to start the next job
+                TimerManager.wake_up()
 
         return cb
 
+    def __get_cache(self) -> BakeCache | None:
+        if not self.cache_key or not self.clear_image or not self.scale_image:
+            return None
+        return BakeCache.from_preferences()
+
+    def __image_from_cache(self) -> bool:
+        cache = self.__get_cache()
+        if cache is None or not cache.fetch(self.cache_key, self.image_path):
+            return False
+
+        img = bpy.data.images.get(self.image_name)
+        if img is None:
+            img = bpy.data.images.load(self.image_path, check_existing=False)
+        else:
+            img.filepath = self.image_path
+            img.reload()  # type: ignore[no-untyped-call]
+        img.colorspace_settings.name = get_image_colorspace(self.settings)
+        self.__save_extra_sizes(img)
+
+        self.__image = img
+        self.__is_without_cycles = True
+
+        if self.__unlink_image():
+            bpy.data.images.remove(img)
+        else:
+            show_image_in_editor(self.context, img)
+
+        return True
+
+    def __finish_without_cycles(self) -> bool:
+        """Take the image from the cache, compute or ray cast it, if possible."""
+        write_objects = partial(
+            self.__write_without_cycles,
+            context=self.context,
+            objects=self.objects,
+            settings=self.settings,
+        )
+        if self.__image_from_cache():
+            self.time_completed = time.perf_counter()
+        elif BakeTextureType[self.settings.type].is_derived:
+            log("Deriving image from baked textures without Cycles")
+            if self.post_process is not None:
+                # NOTE: Sources may still be saved on worker threads
+                self.post_process.join()
+            self.__write_without_cycles(
+                derive_image, settings=self.settings, source_paths=self.source_paths
+            )
+        elif can_rasterize(self.objects, self.settings):
+            log("Rasterizing image without Cycles")
+            write_objects(rasterize_image)
+        elif can_bake_normals_bvh(self.objects, self.settings):
+            log("Casting normals against BVH tree without Cycles")
+            write_objects(bake_normals_bvh)
+        else:
+            return False
+
+        TimerManager.wake_up()
+        return True
+
+    def __write_without_cycles(
+        self, write_image: Callable[..., None], **kwargs: Any
+    ) -> None:
+        self.__image = self.__image_prepare()
+        show_image_in_editor(self.context, self.__image)
+
+        write_image(self.__image, **kwargs)
+        self.time_completed = time.perf_counter()
+        self.__is_without_cycles = True
+        self.__image_finalize()
+
     def __image_prepare(self) -> blt.Image:
         img = bpy.data.images.get(self.image_name)
 
-        if img is None and Path(bpy.path.abspath(self.image_path)).exists():
+        # NOTE: Cleared image doesn't need the pixels from the file
+        if (
+            img is None
+            and not self.clear_image
+            and Path(bpy.path.abspath(self.image_path)).exists()
+        ):
             img = bpy.data.images.load(self.image_path, check_existing=False)
 
-        real_size = int(self.settings.size) * int(self.settings.sampling)
+        real_size = int(self.settings.size) * self.__get_downscale_factor()
+        is_float = self.settings.is_float
+        is_new = img is None
         if img is None:
             log("Creating new image")
             img = bpy.data.images.new(
@@ -157,9 +454,10 @@ class BakeJob:
                 width=real_size,
                 height=real_size,
                 alpha=False,
-                float_buffer=BakeTextureType[self.settings.type].is_float,
+                float_buffer=is_float,
             )
             img.filepath = self.image_path
+            img.file_format = ImageFileFormat[self.settings.file_format].name
         else:
             log("Using existing image")
             existing_path = bpy.path.abspath(img.filepath)
@@ -178,24 +476,14 @@ class BakeJob:
                 )
 
             if self.clear_image:
-                log("Creating clear image")
-                blank_img = bpy.data.images.new(
-                    name=self.image_name,
-                    width=real_size,
-                    height=real_size,
-                    alpha=False,
-                    float_buffer=BakeTextureType[self.settings.type].is_float,
-                )
-                blank_img.filepath = self.image_path
-                blank_img.save(quality=0)
-                bpy.data.images.remove(blank_img)
-
-                img.reload()  # type: ignore[no-untyped-call]
+                log("Clearing image")
+                # NOTE: Also drops the buffer of a file image without reading it
+                resize_image_buffer(img, real_size, real_size, is_float=is_float)
             elif (
                 img.size[0] != real_size
                 or img.size[1] != real_size
                 # or img.alpha_mode is not None
-                or img.is_float != BakeTextureType[self.settings.type].is_float
+                or img.is_float != is_float
             ):
                 raise AddonException(
                     "Image already exist but its parameters doesn't match.",
@@ -207,23 +495,193 @@ class BakeJob:
                     },
                 )
 
-        img.colorspace_settings.name = BakeTextureType[self.settings.type].colorspace
+        colorspace = get_image_colorspace(self.settings)
+        # NOTE: Assignment regenerates generated image, e.g. kept by dilated bakes
+        if img.colorspace_settings.name != colorspace:
+            img.colorspace_settings.name = colorspace
+        if self.settings.use_dilation and (is_new or self.clear_image):
+            # NOTE: Alpha marks the baked pixels
+            clear_image_pixels(img, transparent=True)
 
         return img
 
+    def __get_downscale_factor(self) -> int:
+        """Return scale of the baked image, tiles are downscaled when baked."""
+        return 1 if self.__tile_count > 1 else int(self.settings.sampling)
+
     def __image_finalize(self) -> None:
-        for img in (self.__image,):
-            if self.scale_image and int(self.settings.sampling) > 1:
-                img.scale(int(self.settings.size), int(self.settings.size))
+        img = self.__image
+        if self.settings.use_dilation and not self.scale_image:
+            # NOTE: Saved file would lose the coverage in alpha, the next tasks of
+            # the image continue in memory
+            return
+
+        # NOTE: Only the last task of the image is finalized asynchronously, the
+        # next tasks writing to the image load it from the file
+        if self.post_process is not None and self.scale_image and can_encode_image(img):
+            self.__image_finalize_async(img)
+            return
+
+        if self.scale_image and self.__get_downscale_factor() > 1:
+            downscale_image(
+                img,
+                int(self.settings.size),
+                DownscaleFilter[self.settings.downscale_filter],
+            )
+        if self.settings.use_dilation:
+            dilate_image(img, self.settings)
+
+        save_image(img, self.image_path, get_output_options(self.settings))
+        self.__save_extra_sizes(img)
+
+        cache = self.__get_cache()
+        if cache is not None:
+            cache.store(self.cache_key, self.image_path)
+
+        if self.__unlink_image():
+            bpy.data.images.remove(img)
+            return
+
+        # NOTE: Final image is reloaded to show the saved file and to link it in
+        # the blend file, the next tasks of the image continue with its pixels
+        if self.scale_image:
+            reload_image(img, self.image_path)
+        show_image_in_editor(self.context, img)
+
+    def __get_extra_filter(self) -> DownscaleFilter:
+        downscale_filter = DownscaleFilter[self.settings.downscale_filter]
+        # NOTE: Extra sizes are downscaled with NumPy, Box is Blender's closest
+        if downscale_filter is DownscaleFilter.BLENDER:
+            return DownscaleFilter.BOX
+        return downscale_filter
+
+    def __save_extra_sizes(self, img: blt.Image) -> None:
+        """Save the finalized image downscaled to the extra sizes."""
+        if not self.extra_paths:
+            return
+
+        pixels = get_image_pixels(img)[..., : get_image_channels(img)]
+        options = get_output_options(self.settings)
+        for size, image_path in self.extra_paths.items():
+            log(f"Saving extra size {size}: {image_path!r}")
+            save_pixels(
+                downscale_to_size(
+                    pixels, size, self.__get_extra_filter(), clip=not img.is_float
+                ),
+                image_path,
+                options,
+                is_float=img.is_float,
+                colorspace=img.colorspace_settings.name,
+            )
+
+    def __unlink_image(self) -> bool:
+        # NOTE: Tiles are used through the tiled image of all of them
+        return bool(
+            self.udim_tile or get_props(self.context).utils_settings.unlink_baked_image
+        )
 
-            img.save(quality=0)
+    def __image_finalize_async(self, img: blt.Image) -> None:
+        assert self.post_process is not None
+
+        size = int(self.settings.size)
+        downscale_filter = DownscaleFilter[self.settings.downscale_filter]
+        factor = self.__get_downscale_factor()
+        if factor > 1 and downscale_filter is DownscaleFilter.BLENDER:
+            img.scale(size, size)
+            factor = 1
+
+        # NOTE: Pixels of large images are paged to a scratch file, workers read
+        # them in blocks of rows
+        pixels = map_image_pixels(img) if is_large_image(img) else get_image_pixels(img)
+        block_rows = get_block_rows(img.size[0], img.channels, factor)
+        channels = get_image_channels(img)
+        output_options = get_output_options(self.settings)
+        bit_depth = int(output_options.color_depth)
+        compress_level = output_options.png_compress_level
+        # NOTE: Float images keep premultiplied alpha, Blender saves straight one
+        premultiplied = img.is_float
+        cache = self.__get_cache()
+        cache_key = self.cache_key
+        image_path = self.image_path
+        # NOTE: Blender data can't be accessed from workers, resolve path here
+        abs_image_path = bpy.path.abspath(image_path)
+        abs_extra_paths = {
+            extra_size: bpy.path.abspath(extra_path)
+            for extra_size, extra_path in self.extra_paths.items()
+        }
+        extra_filter = self.__get_extra_filter()
+        image_name = self.image_name
+        context = self.context
+        dilation = (
+            (get_dilation_margin(self.settings), get_dilation_background(self.settings))
+            if self.settings.use_dilation
+            else None
+        )
 
-            if get_props(self.context).utils_settings.unlink_baked_image:
-                bpy.data.images.remove(img)
-            else:
-                show_image_in_editor(self.context, img)
+        def process() -> None:
+            source, source_factor = pixels, factor
+            if dilation is not None:
+                # NOTE: Dilation needs the whole downscaled image
+                if factor > 1:
+                    source = downscale(pixels, factor, downscale_filter)
+                dilate(source, *dilation)
+                source_factor = 1
+
+            def get_rows(start: int, stop: int) -> npt.NDArray[np.float32]:
+                rows = (
+                    downscale_rows(
+                        source,
+                        source_factor,
+                        downscale_filter,
+                        start,
+                        stop,
+                        clip=bit_depth == 8,
+                    )
+                    if source_factor > 1
+                    else source[start:stop]
+                )
+                return rows[..., :channels]
+
+            write_png(
+                Path(abs_image_path),
+                get_rows,
+                width=size,
+                height=size,
+                channels=channels,
+                block_rows=block_rows,
+                bit_depth=bit_depth,
+                compress_level=compress_level,
+                premultiplied=premultiplied,
+            )
+            # NOTE: Extra sizes are downscaled from the baked pixels, e.g. with AA
+            _write_extra_sizes(
+                source,
+                abs_extra_paths,
+                extra_filter,
+                channels=channels,
+                bit_depth=bit_depth,
+                compress_level=compress_level,
+                premultiplied=premultiplied,
+            )
+            if cache is not None:
+                cache.store(cache_key, abs_image_path)
+
+        def on_done() -> None:
+            saved_img = bpy.data.images.get(image_name)
+            if saved_img is None:
+                return
+            reload_image(saved_img, image_path)
+            show_image_in_editor(context, saved_img)
+
+        if self.__unlink_image():
+            bpy.data.images.remove(img)
+            self.post_process.submit(image_path, process)
+        else:
+            self.post_process.submit(image_path, process, on_done=on_done)
 
     def __cleanup(self) -> None:
+        if self.__tiled_bake is not None:
+            self.__tiled_bake.abort()
         for handler, cb in self.__handlers:
             if cb in handler:
                 handler.remove(cb)
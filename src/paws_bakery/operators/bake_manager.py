@@ -1,6 +1,6 @@
 """Manages scene, materials setup and Blender's bake operator."""
 
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass, field
 
 import bpy
@@ -14,9 +14,12 @@ from ..props import (  # type: ignore[attr-defined]
     BakeTextureType,
     get_props_wm,
 )
+from ..props_enums import MarginType
 from ..utils import AddonException
-from ._utils import generate_color_set, get_objects_materials
+from ._utils import get_material_id_colors, get_objects_materials
 from .bake_common import BakeObjects
+from .bake_device import apply_render_device
+from .bake_render import RenderOptions, apply_render_options, get_render_options
 from .material_setup import (
     BakeMaterialManager,
     MaterialNodeNames,
@@ -31,25 +34,34 @@ _RENDER_ENGINE = "CYCLES"
 
 
 def call_bake_op(
-    settings: BakeSettings, *, use_clear: bool = False, uv_layer: str = ""
+    settings: BakeSettings,
+    *,
+    use_clear: bool = False,
+    uv_layer: str = "",
+    blocking: bool = False,
 ) -> set[BORT]:
-    """Call bpy.ops.object.bake using provided BakeSettings."""
+    """Call bpy.ops.object.bake using provided BakeSettings.
+
+    :param blocking: Run the bake synchronously instead of starting a job.
+    """
     return bpy.ops.object.bake(  # type: ignore[no-any-return]
-        "INVOKE_DEFAULT",  # type: ignore[arg-type]
+        "EXEC_DEFAULT" if blocking else "INVOKE_DEFAULT",  # type: ignore[arg-type]
         target="IMAGE_TEXTURES",
         save_mode="INTERNAL",
         type=BakeTextureType[settings.type].cycles_type,
         width=int(settings.size) * int(settings.sampling),
         height=int(settings.size) * int(settings.sampling),
-        margin=settings.margin * int(settings.sampling),
-        margin_type=settings.margin_type,
+        # NOTE: Dilated margin is filled after baking, see `image_dilate`
+        margin=0 if settings.use_dilation else settings.margin * int(settings.sampling),
+        margin_type=MarginType[settings.margin_type].cycles_type or "EXTEND",
         # use_split_materials=True,
         # normal_space=cfg.normal_space,
         use_selected_to_active=settings.use_selected_to_active,
         use_cage=settings.use_cage,
         cage_extrusion=settings.cage_extrusion,
         max_ray_distance=settings.max_ray_distance,
-        use_clear=use_clear,
+        # NOTE: Blender clears images without alpha to opaque
+        use_clear=use_clear and not settings.use_dilation,
         uv_layer=uv_layer,
     )
 
@@ -63,14 +75,14 @@ def _materials_setup(
     materials: Sequence[blt.Material],
     settings: BakeSettings,
     image: blt.Image,
+    colors: Mapping[str, tuple[float, float, float]],
 ) -> None:
     for mat in materials:
-        colors = generate_color_set(len(materials))
         BakeMaterialManager(
             mat=mat,
             bake_settings=settings,
             image_name=image.name,
-            mat_id_color=colors[list(materials).index(mat)],
+            mat_id_color=colors[mat.name],
         )
 
         tree = mat.node_tree
@@ -91,6 +103,12 @@ class BakeManager:
     image: blt.Image
     clear_image: bool
     keep_scene: bool
+    blocking: bool = False
+    """Bake synchronously, e.g. in background mode without a modal operator."""
+    use_persistent_data: bool = False
+    """Keep render data after the bake, e.g. for the next bake of the same objects."""
+    uv_layer: str = ""
+    """UV layer to bake to instead of the active one."""
 
     __running: bool = field(init=False, default=False)
     __og_scene: blt.Scene = field(init=False)
@@ -127,33 +145,68 @@ class BakeManager:
             self.cleanup()
             raise
 
-        if bake_result != {BORT.RUNNING_MODAL}:
+        expected_result = {BORT.FINISHED} if self.blocking else {BORT.RUNNING_MODAL}
+        if bake_result != expected_result:
             self.cleanup()
             raise AddonException(
                 "Failed to start baking. Wrong return type from object.bake operator.",
                 bake_result,
             )
 
+        if self.blocking:
+            self.cleanup()
+
     def _unsafe_execute(self) -> set[BORT]:
         self.__set_running(True)
 
-        self.context.window.cursor_set("WAIT")
+        self._set_cursor("WAIT")
 
         get_props_wm(self.context).settings_scene = self.context.scene
-        self.context.window.scene = _BakingScene.prepare(bake_settings=self.settings)
+        scene = _BakingScene.prepare(
+            render_options=get_render_options(
+                self.settings, self.context.scene.cycles.samples
+            ),
+            use_persistent_data=self.use_persistent_data,
+        )
+
+        if self.context.window is None:
+            # NOTE: No window in background mode, override the context instead
+            # pylint: disable-next=no-value-for-parameter
+            with self.context.temp_override(
+                scene=scene, view_layer=scene.view_layers[0]
+            ):
+                return self._unsafe_bake()
 
-        # NOTE: Updating depsgraph to avoid random exception about
-        # "writing ID in wrong context"
-        self.context.view_layer.depsgraph.update()  # type: ignore[no-untyped-call]
+        self.context.window.scene = scene
+        return self._unsafe_bake()
+
+    def _unsafe_bake(self) -> set[BORT]:
+        if _BakingScene.is_depsgraph_outdated:
+            # NOTE: Updating depsgraph to avoid random exception about
+            # "writing ID in wrong context"
+            self.context.view_layer.depsgraph.update()  # type: ignore[no-untyped-call]
+            _BakingScene.is_depsgraph_outdated = False
 
         self._set_up_objects()
 
         self.__materials = tuple(get_objects_materials(self.objects.selected))
         _materials_cleanup(self.__materials)
-        _materials_setup(self.__materials, self.settings, self.image)
+        _materials_setup(
+            self.__materials,
+            self.settings,
+            self.image,
+            get_material_id_colors(
+                self.objects.selected,
+                per_object=not self.settings.use_selected_to_active,
+            ),
+        )
 
-        # TODO: implement uv_layer selection
-        bake_result = call_bake_op(self.settings, use_clear=self.clear_image)
+        bake_result = call_bake_op(
+            self.settings,
+            use_clear=self.clear_image,
+            uv_layer=self.uv_layer,
+            blocking=self.blocking,
+        )
         return bake_result
 
     def on_modal(self) -> None:
@@ -172,33 +225,62 @@ class BakeManager:
 
         _materials_cleanup(self.__materials)
 
-        _BakingScene.cleanup(keep_scene=self.keep_scene)
+        if not _BakingScene.is_batch_running():
+            _BakingScene.cleanup(keep_scene=self.keep_scene)
 
         self.__set_running(False)
 
+    @staticmethod
+    def begin_batch() -> None:
+        """Keep baking scene and its objects between bakes until `end_batch()`.
+
+        Consecutive bakes only link and unlink objects that differ from the
+        previous bake.
+        """
+        _BakingScene.begin_batch()
+
+    @staticmethod
+    def end_batch(keep_scene: bool = True) -> None:
+        """Finish the batch started by `begin_batch()` and clean up baking scene."""
+        _BakingScene.end_batch(keep_scene=keep_scene)
+
     def cancel(self) -> None:
         """Cancel bake and cleanup."""
         self.cleanup()
 
     def _save_user_settings(self) -> None:
-        self.__og_scene = self.context.window.scene
+        self.__og_scene = self.context.scene
 
     def _restore_user_settings(self) -> None:
-        self.context.window.scene = self.__og_scene
+        if self.context.window is not None:
+            self.context.window.scene = self.__og_scene
         get_props_wm(self.context).settings_scene = None
-        self.context.window.cursor_set("DEFAULT")
+        self._set_cursor("DEFAULT")
+
+    def _set_cursor(self, cursor: str) -> None:
+        if self.context.window is not None:
+            self.context.window.cursor_set(cursor)
 
     def _set_up_objects(self) -> None:
+        bake_coll = _BakingScene.get_bake_collection()
+        bake_names = {b_obj.name for b_obj in self.objects.selected}
+
+        # NOTE: Collection may keep objects of the previous bake of the batch
+        for b_obj in bake_coll.objects[:]:
+            if b_obj.name not in bake_names:
+                bake_coll.objects.unlink(b_obj)
+
         for b_obj in self.context.selected_objects:
-            b_obj.select_set(False)
+            if b_obj.name not in bake_names:
+                b_obj.select_set(False)
 
         for b_obj in self.objects.selected:
-            bake_coll = _BakingScene.get_bake_collection()
-            bake_coll.objects.link(b_obj)
+            if b_obj.name not in bake_coll.objects:
+                bake_coll.objects.link(b_obj)
 
-            b_obj.hide_set(False)
-            b_obj.hide_render = False
-            b_obj.hide_viewport = False
+                b_obj.hide_set(False)
+                b_obj.hide_render = False
+                b_obj.hide_viewport = False
             b_obj.select_set(True)
 
         self.context.view_layer.objects.active = self.objects.active
@@ -206,6 +288,8 @@ class BakeManager:
 
 class _BakingScene:
     __initialized: bool = False
+    __batch_running: bool = False
+    is_depsgraph_outdated: bool = True
 
     @classmethod
     def remove(cls) -> None:
@@ -230,15 +314,33 @@ class _BakingScene:
         bpy.data.collections.remove(bake_coll)
 
     @classmethod
-    def create(cls, *, settings: BakeSettings) -> blt.Scene:
+    def begin_batch(cls) -> None:
+        """Start keeping the scene and its collection between bakes."""
+        cls.__batch_running = True
+
+    @classmethod
+    def end_batch(cls, keep_scene: bool = True) -> None:
+        """Stop the batch and clean up."""
+        cls.__batch_running = False
+
+        scene = bpy.data.scenes.get(TMP_SCENE_NAME)
+        if scene is not None:
+            # NOTE: Frees render data kept by the last bake
+            scene.render.use_persistent_data = False
+
+        cls.cleanup(keep_scene=keep_scene)
+
+    @classmethod
+    def is_batch_running(cls) -> bool:
+        """Return whether the scene is kept between bakes."""
+        return cls.__batch_running
+
+    @classmethod
+    def create(cls) -> blt.Scene:
         """Create and setup new baking scene."""
         log("Creating new scene")
         sc = bpy.data.scenes.new(TMP_SCENE_NAME)
 
-        sc.cycles.device = "GPU"
-        sc.cycles.samples = settings.samples
-        sc.cycles.use_denoising = settings.use_denoising
-
         sc.render.use_lock_interface = True
         # NOTE: There is a weird hardlock when we setting engine to CYCLES
         sc.render.engine = _RENDER_ENGINE
@@ -254,19 +356,29 @@ class _BakingScene:
     def prepare(
         cls,
         *,
-        bake_settings: BakeSettings,
+        render_options: RenderOptions,
+        use_persistent_data: bool = False,
     ) -> blt.Scene:
         """Prepare and fill up scene.
 
         Creates scene, collection and fills it with selected objects.
+        During a batch the scene and the collection of the previous bake are reused,
+        render settings are applied for every bake.
         """
-        cls.cleanup(cls.__initialized)
+        if not cls.__batch_running:
+            cls.cleanup(cls.__initialized)
         scene = bpy.data.scenes.get(TMP_SCENE_NAME)
         if not scene:
-            scene = cls.create(settings=bake_settings)
+            scene = cls.create()
+        apply_render_device(scene)
+        apply_render_options(scene, render_options)
+
+        scene.render.use_persistent_data = use_persistent_data
 
-        bake_coll = bpy.data.collections.new(BAKE_COLLECTION_NAME)
-        scene.collection.children.link(bake_coll)
+        if cls.get_bake_collection() is None:
+            bake_coll = bpy.data.collections.new(BAKE_COLLECTION_NAME)
+            scene.collection.children.link(bake_coll)
+            cls.is_depsgraph_outdated = True
 
         return scene
 
@@ -0,0 +1,379 @@
+"""Manifest of baked images for incremental baking.
+
+Each output directory gets a manifest file with hashes of the bake inputs of its
+images and the size and modification time of the saved files. An image is skipped
+if its inputs hash matches the manifest entry and its files weren't changed since.
+"""
+
+import json
+import os
+import tomllib
+from collections.abc import Iterable, Sequence
+from functools import cache
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, cast
+
+import bpy
+import numpy as np
+from bpy import types as blt
+
+from .._helpers import ADDON_DIR, log, log_err
+from ..props import BakeSettings, TextureSetProps, get_bake_settings
+from ._utils import foreach_get_pixels
+from .bake_cache import BakeCache
+from .bake_plan import BakeTask, mark_shared_objects
+from .bake_udim import UDIM_UV_LAYER_NAME
+
+MANIFEST_NAME = "pawsbkr_manifest.json"
+_MANIFEST_VERSION = 3
+
+_HASH_DIGEST_SIZE = 16
+
+_NODE_SKIP_PROPS = frozenset(
+    {
+        "rna_type",
+        "name",
+        "bl_idname",
+        "bl_label",
+        "bl_description",
+        "bl_icon",
+        "bl_static_type",
+        "bl_width_default",
+        "bl_width_min",
+        "bl_width_max",
+        "bl_height_default",
+        "bl_height_min",
+        "bl_height_max",
+        "location",
+        "location_absolute",
+        "width",
+        "height",
+        "dimensions",
+        "select",
+        "hide",
+        "label",
+        "color",
+        "color_tag",
+        "use_custom_color",
+        "show_options",
+        "show_preview",
+        "show_texture",
+        "warning_propagation",
+    }
+)
+_SIMPLE_PROP_TYPES = frozenset({"BOOLEAN", "INT", "FLOAT", "STRING", "ENUM"})
+
+
+@cache
+def _get_addon_version() -> str:
+    try:
+        data = tomllib.loads(
+            ADDON_DIR.joinpath("blender_manifest.toml").read_text("utf-8")
+        )
+    except (OSError, tomllib.TOMLDecodeError):
+        return ""
+    return str(data.get("version", ""))
+
+
+def _new_hash() -> blake2b:
+    return blake2b(digest_size=_HASH_DIGEST_SIZE)
+
+
+def _update_with_array(
+    hsh: blake2b, collection: Any, attr: str, size: int, dtype: Any
+) -> None:
+    arr = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(attr, arr)
+    hsh.update(arr.tobytes())
+
+
+def _hash_mesh(mesh: blt.Mesh) -> bytes:
+    hsh = _new_hash()
+    _update_with_array(hsh, mesh.vertices, "co", 3, np.float32)
+    _update_with_array(hsh, mesh.loops, "vertex_index", 1, np.int32)
+    _update_with_array(hsh, mesh.polygons, "loop_start", 1, np.int32)
+    _update_with_array(hsh, mesh.polygons, "material_index", 1, np.int32)
+    _update_with_array(hsh, mesh.corner_normals, "vector", 3, np.float32)
+    for uv_layer in mesh.uv_layers:
+        # NOTE: Written by UDIM bakes from the active layer
+        if uv_layer.name == UDIM_UV_LAYER_NAME:
+            continue
+        hsh.update(f"{uv_layer.name}:{uv_layer.active}".encode())
+        _update_with_array(hsh, uv_layer.uv, "vector", 2, np.float32)
+    return hsh.digest()
+
+
+def _rna_values(struct: Any, skip: Iterable[str] = ()) -> list[tuple[str, str]]:
+    values: list[tuple[str, str]] = []
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in skip or prop.type not in _SIMPLE_PROP_TYPES:
+            continue
+        value = getattr(struct, prop.identifier)
+        if prop.type == "ENUM" and prop.is_enum_flag:
+            value = sorted(value)
+        elif getattr(prop, "is_array", False):
+            value = tuple(value)
+        values.append((prop.identifier, repr(value)))
+    return values
+
+
+def _hash_image(hsh: blake2b, image: blt.Image) -> None:
+    """Update hash with the image content, not depending on its name or path."""
+    hsh.update(image.source.encode())
+    hsh.update(image.colorspace_settings.name.encode())
+    path = Path(bpy.path.abspath(image.filepath))
+    if image.packed_file is not None:
+        hsh.update(image.packed_file.data)  # type: ignore[arg-type]
+    elif not image.is_dirty and path.is_file():
+        stat = path.stat()
+        hsh.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    else:
+        # NOTE: Generated or painted image, there's no file to stamp
+        width, height = image.size
+        pixels = np.empty(width * height * image.channels, dtype=np.float32)
+        foreach_get_pixels(image, pixels)
+        hsh.update(pixels.tobytes())
+
+
+def _hash_node_tree(
+    hsh: blake2b, tree: blt.NodeTree, seen: set[int] | None = None
+) -> None:
+    seen = set() if seen is None else seen
+    if tree.as_pointer() in seen:
+        return
+    seen.add(tree.as_pointer())
+
+    # NOTE: Nodes and sockets are referenced by type and index instead of names,
+    # so renamed nodes and copies of a material in other files get the same hash
+    node_keys: dict[int, str] = {}
+    socket_indices: dict[int, int] = {}
+    for node_idx, node in enumerate(tree.nodes):
+        node_keys[node.as_pointer()] = f"{node.bl_idname}#{node_idx}"
+        for sockets in (node.inputs, node.outputs):
+            for socket_idx, socket in enumerate(sockets):
+                socket_indices[socket.as_pointer()] = socket_idx
+
+        hsh.update(node.bl_idname.encode())
+        hsh.update(repr(_rna_values(node, _NODE_SKIP_PROPS)).encode())
+        for socket_idx, socket in enumerate(node.inputs):
+            value = getattr(socket, "default_value", None)
+            if value is not None and not isinstance(value, (bool, int, float, str)):
+                value = tuple(value)
+            hsh.update(f"{socket_idx}={value!r}".encode())
+
+        image = getattr(node, "image", None)
+        if image is not None:
+            _hash_image(hsh, image)
+        group_tree = getattr(node, "node_tree", None)
+        if group_tree is not None:
+            _hash_node_tree(hsh, group_tree, seen)
+
+    for link in tree.links:
+        hsh.update(
+            (
+                f"{node_keys[link.from_node.as_pointer()]}"
+                f".{socket_indices[link.from_socket.as_pointer()]}"
+                f">{node_keys[link.to_node.as_pointer()]}"
+                f".{socket_indices[link.to_socket.as_pointer()]}"
+                f":{link.is_muted}"
+            ).encode()
+        )
+
+
+def _hash_object(b_obj: blt.Object, depsgraph: blt.Depsgraph) -> bytes:
+    """Return hash of the object content, not depending on names."""
+    hsh = _new_hash()
+    hsh.update(np.array(b_obj.matrix_world, dtype=np.float32).tobytes())
+    hsh.update(np.array(b_obj.color, dtype=np.float32).tobytes())
+
+    obj_eval = cast(blt.Object, b_obj.evaluated_get(depsgraph))
+    mesh = obj_eval.to_mesh()
+    try:
+        hsh.update(_hash_mesh(mesh))
+    finally:
+        obj_eval.to_mesh_clear()  # type: ignore[no-untyped-call]
+
+    for slot in b_obj.material_slots:
+        mat = slot.material
+        if mat is None:
+            hsh.update(b"<no material>")
+        elif mat.node_tree is not None:
+            _hash_node_tree(hsh, mat.node_tree)
+
+    return hsh.digest()
+
+
+def _hash_settings(settings: BakeSettings) -> bytes:
+    hsh = _new_hash()
+    # NOTE: Extra sizes don't change the image, their missing files are checked
+    hsh.update(
+        repr(
+            _rna_values(settings, {"rna_type", "name", "name_template", "extra_sizes"})
+        ).encode()
+    )
+    return hsh.digest()
+
+
+def _hash_scene(scene: blt.Scene) -> bytes:
+    """Return hash of the scene inputs not in bake settings, e.g. scene samples."""
+    hsh = _new_hash()
+    hsh.update(bpy.app.version_string.encode())
+    hsh.update(repr(_rna_values(scene.cycles, {"name"})).encode())
+    for struct in (
+        scene.display_settings,
+        scene.view_settings,
+        scene.sequencer_colorspace_settings,
+    ):
+        hsh.update(repr(_rna_values(struct)).encode())
+    return hsh.digest()
+
+
+def hash_bake_tasks(context: blt.Context, tasks: Sequence[BakeTask]) -> None:
+    """Set inputs hash of the tasks.
+
+    All tasks writing to the same image get the same hash, combined from the
+    inputs of all of them. The hash depends only on the content, not on names of
+    the objects, materials, nodes and images or on paths, so it's also the key of
+    the image in the bake cache.
+    """
+    depsgraph = context.evaluated_depsgraph_get()
+    scene_hash = _hash_scene(context.scene)
+    object_hashes: dict[str, bytes] = {}
+    image_hashes: dict[str, blake2b] = {}
+
+    for task in tasks:
+        hsh = image_hashes.get(task.image_path)
+        if hsh is None:
+            hsh = _new_hash()
+            hsh.update(_get_addon_version().encode())
+            hsh.update(scene_hash)
+            hsh.update(_hash_settings(get_bake_settings(context, task.settings_id)))
+            for source in task.sources.values():
+                hsh.update(
+                    _hash_settings(get_bake_settings(context, source.texture.prop_id))
+                )
+            hsh.update(str(task.udim_tile).encode())
+            image_hashes[task.image_path] = hsh
+
+        hsh.update(str(task.objects.selected.index(task.objects.active)).encode())
+        for b_obj in task.objects.selected:
+            if b_obj.name not in object_hashes:
+                object_hashes[b_obj.name] = _hash_object(b_obj, depsgraph)
+            hsh.update(object_hashes[b_obj.name])
+
+    for task in tasks:
+        task.input_hash = image_hashes[task.image_path].hexdigest()
+
+
+def _manifest_path(image_path: str) -> Path:
+    return Path(bpy.path.abspath(image_path)).parent.joinpath(MANIFEST_NAME)
+
+
+def _load_manifest(path: Path) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as ex:
+        log_err(f"Can't read bake manifest {str(path)!r}: {ex}")
+        return {}
+
+    if not isinstance(data, dict) or data.get("version") != _MANIFEST_VERSION:
+        return {}
+    images = data.get("images", {})
+    return images if isinstance(images, dict) else {}
+
+
+def _save_manifest(path: Path, images: dict[str, Any]) -> None:
+    data = {"version": _MANIFEST_VERSION, "images": images}
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _get_file_stamps(task: BakeTask) -> list[str] | None:
+    """Return size and modification time of the image files, None if any is missing."""
+    paths = [task.image_path, *task.extra_paths.values()]
+    stamps: list[str] = []
+    for path in paths:
+        try:
+            stat = Path(bpy.path.abspath(path)).stat()
+        except OSError:
+            return None
+        stamps.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+    return stamps
+
+
+def filter_unchanged_tasks(tasks: Sequence[BakeTask]) -> list[BakeTask]:
+    """Return tasks of images whose inputs or files changed since they were baked.
+
+    Expects hashes to be set by `hash_bake_tasks()`.
+    """
+    manifests: dict[Path, dict[str, Any]] = {}
+    changed: list[BakeTask] = []
+    skipped: set[str] = set()
+
+    for task in tasks:
+        path = _manifest_path(task.image_path)
+        if path not in manifests:
+            manifests[path] = _load_manifest(path)
+
+        entry = manifests[path].get(Path(task.image_path).name)
+        stamps = _get_file_stamps(task)
+        if (
+            task.input_hash
+            and isinstance(entry, dict)
+            and entry.get("hash") == task.input_hash
+            and stamps is not None
+            and entry.get("files") == stamps
+        ):
+            skipped.add(task.image_name)
+            continue
+
+        changed.append(task)
+
+    if skipped:
+        log(f"Skipping unchanged images: {sorted(skipped)}")
+
+    return changed
+
+
+def record_bake_hashes(tasks: Iterable[BakeTask]) -> None:
+    """Store inputs hashes of the baked images to their manifests."""
+    by_manifest: dict[Path, dict[str, Any]] = {}
+    for task in tasks:
+        stamps = _get_file_stamps(task)
+        if not task.input_hash or stamps is None:
+            continue
+        by_manifest.setdefault(_manifest_path(task.image_path), {})[
+            Path(task.image_path).name
+        ] = {"hash": task.input_hash, "files": stamps}
+
+    for path, entries in by_manifest.items():
+        images = _load_manifest(path)
+        images.update(entries)
+        try:
+            _save_manifest(path, images)
+        except OSError as ex:
+            log_err(f"Can't write bake manifest {str(path)!r}: {ex}")
+
+
+def skip_unchanged_tasks(
+    context: blt.Context, texture_set: TextureSetProps, tasks: Sequence[BakeTask]
+) -> list[BakeTask]:
+    """Hash the tasks if needed and return only the ones of changed images.
+
+    Hashes are needed to skip unchanged images, see `TextureSetProps.skip_unchanged`,
+    and by the bake cache.
+    """
+    if not texture_set.skip_unchanged and BakeCache.from_preferences() is None:
+        return list(tasks)
+
+    hash_bake_tasks(context, tasks)
+    if not texture_set.skip_unchanged:
+        return list(tasks)
+
+    tasks_changed = filter_unchanged_tasks(tasks)
+    mark_shared_objects(tasks_changed)
+    return tasks_changed
@@ -0,0 +1,262 @@
+"""Estimate memory used by a bake and fit jobs into the memory budget.
+
+Estimates are rough, they cover the biggest allocations of a Cycles bake: image
+buffers, per pixel bake data, render buffers and scene geometry, and the buffers
+the image is downscaled and dilated in after Cycles frees its data. They are
+meant to catch jobs that would exhaust memory before the batch starts, not to
+predict the peak exactly. Textures rasterized, cast against a BVH tree or
+derived from other textures don't run Cycles and aren't estimated.
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import cast
+
+from bpy import types as blt
+
+from ..preferences import get_preferences
+from ..props import BakeSettings, get_bake_settings
+from ..props_enums import BakeTextureType
+from ..utils import AddonException
+from .bake_bvh import can_bake_normals_bvh
+from .bake_common import BakeObjects
+from .bake_plan import BakeTask, get_objects_key
+from .bake_raster import can_rasterize
+from .bake_tiles import get_tile_count, get_tile_padding
+from .image_stream import STREAM_MIN_PIXELS
+
+_GB = 1024**3
+_MB = 1024**2
+
+_BAKE_PIXEL_BYTES = 36
+"""Blender's `BakePixel` stored for every pixel, twice for Selected to Active."""
+_BAKE_RESULT_BYTES = 16
+"""RGBA float result of every pixel."""
+_RENDER_PIXEL_BYTES = 144
+"""Cycles render buffer passes and temporary copies of the result, per pixel.
+Measured on CPU bakes, GPU bakes keep part of it in device memory."""
+_TRIANGLE_BYTES = 512
+"""Mesh data of Blender and Cycles with BVH, per triangle."""
+_ENGINE_OVERHEAD = 256 * _MB
+"""Blender, Cycles kernels and scene data not depending on the job."""
+
+_IMAGE_PIXEL_BYTES = {False: 4, True: 16}
+"""Bytes of an RGBA image pixel by whether the image is float."""
+_FLOAT_PIXEL_BYTES = 16
+"""Float RGBA copy of a pixel, see `get_image_pixels`."""
+_DILATION_PIXEL_BYTES = 48
+"""Float copy of the pixels and the nearest pixel search, per output pixel."""
+
+_MAX_TILES = 64
+
+
+class _MemoryBudget:
+    workers: int = 1
+    """Number of processes baking in parallel and sharing the budget."""
+
+
+def set_memory_budget_workers(workers: int) -> None:
+    """Split the memory budget between processes baking in parallel."""
+    _MemoryBudget.workers = max(workers, 1)
+
+
+def get_memory_budget() -> int:
+    """Return memory budget of a bake in bytes, 0 if unlimited."""
+    return int(get_preferences().memory_budget * _GB) // _MemoryBudget.workers
+
+
+def format_memory(size: int) -> str:
+    """Return human readable size."""
+    return f"{size / _GB:.2f} GB"
+
+
+@dataclass(kw_only=True, frozen=True)
+class MemoryEstimate:
+    """Estimated memory of a bake job in bytes."""
+
+    images: int
+    """Baked image and buffers the result is assembled in."""
+    pixels: int
+    """Bake and render data of the baked pixels."""
+    finishing: int = 0
+    """Buffers of the downscale and dilation, allocated after Cycles finished."""
+    geometry: int
+    overhead: int = _ENGINE_OVERHEAD
+
+    @property
+    def total(self) -> int:
+        """Estimated peak memory."""
+        return (
+            self.images
+            + max(self.pixels, self.finishing)
+            + self.geometry
+            + self.overhead
+        )
+
+
+def estimate_bake_memory(
+    *,
+    size: int,
+    sampling: int,
+    is_float: bool,
+    triangles: int,
+    selected_to_active: bool = False,
+    tile_count: int = 1,
+    tile_padding: int = 0,
+    dilation: bool = False,
+) -> MemoryEstimate:
+    """Estimate memory of a bake job.
+
+    :param size: Output image size
+    :param sampling: Supersampling factor, see `BakeSettings.sampling`
+    :param triangles: Number of triangles of the baked objects
+    :param tile_count: Number of tiles per side, see `BakeSettings.tiles`
+    :param tile_padding: Padding of the tiles in output pixels
+    :param dilation: Whether margin is dilated after baking
+    """
+    image_pixel_bytes = _IMAGE_PIXEL_BYTES[is_float]
+    pixel_bytes = _BAKE_PIXEL_BYTES * (2 if selected_to_active else 1)
+    pixel_bytes += _BAKE_RESULT_BYTES + _RENDER_PIXEL_BYTES
+
+    finishing = 0
+    if tile_count > 1:
+        tile_size = min(-(-size // tile_count) + 2 * tile_padding, size) * sampling
+        images = size**2 * (image_pixel_bytes + _FLOAT_PIXEL_BYTES)
+        images += tile_size**2 * image_pixel_bytes
+        baked_pixels = tile_size**2
+    else:
+        baked_pixels = (size * sampling) ** 2
+        images = baked_pixels * image_pixel_bytes
+        if sampling > 1:
+            finishing += size**2 * _FLOAT_PIXEL_BYTES
+            # NOTE: Large images are downscaled through scratch files
+            if baked_pixels < STREAM_MIN_PIXELS:
+                finishing += baked_pixels * _FLOAT_PIXEL_BYTES
+    if dilation:
+        finishing += size**2 * _DILATION_PIXEL_BYTES
+
+    return MemoryEstimate(
+        images=images,
+        pixels=baked_pixels * pixel_bytes,
+        finishing=finishing,
+        geometry=triangles * _TRIANGLE_BYTES,
+    )
+
+
+def count_triangles(context: blt.Context, objects: Iterable[blt.Object]) -> int:
+    """Return number of triangles of the objects with modifiers applied."""
+    depsgraph = context.evaluated_depsgraph_get()
+    triangles = 0
+    for b_obj in objects:
+        # NOTE: Objects outside of the view layer aren't evaluated, their original
+        # data is returned
+        mesh = cast(blt.Object, b_obj.evaluated_get(depsgraph)).data
+        if isinstance(mesh, blt.Mesh):
+            triangles += len(mesh.loops) - 2 * len(mesh.polygons)
+    return triangles
+
+
+def is_baked_by_cycles(objects: BakeObjects, settings: BakeSettings) -> bool:
+    """Return whether the texture is baked by Cycles, see `BakeJob`."""
+    if BakeTextureType[settings.type].is_derived:
+        return False
+    return not (
+        can_rasterize(objects, settings) or can_bake_normals_bvh(objects, settings)
+    )
+
+
+def get_bake_tile_count(
+    *,
+    context: blt.Context,
+    objects: BakeObjects,
+    settings: BakeSettings,
+    can_tile: bool,
+    image_name: str,
+    triangles: int | None = None,
+) -> int:
+    """Return number of tiles per side fitting the bake into the memory budget.
+
+    Starts from the tiles set in the settings and increases them if needed.
+
+    :param can_tile: Whether the job bakes the whole image and can be tiled
+    :param triangles: Number of triangles of the objects, counted if not set
+    :raises AddonException: If the job doesn't fit even with tiles
+    """
+    requested = get_tile_count(settings) if can_tile else 1
+    budget = get_memory_budget()
+    if not budget:
+        return requested
+
+    if triangles is None:
+        triangles = count_triangles(
+            context, dict.fromkeys((objects.active, *objects.selected))
+        )
+
+    size = int(settings.size)
+    max_count = min(size, _MAX_TILES) if can_tile else 1
+    estimate: MemoryEstimate | None = None
+    for tile_count in range(requested, max(max_count, requested) + 1):
+        estimate = estimate_bake_memory(
+            size=size,
+            sampling=int(settings.sampling),
+            is_float=settings.is_float,
+            triangles=triangles,
+            selected_to_active=settings.use_selected_to_active,
+            tile_count=tile_count,
+            tile_padding=get_tile_padding(settings),
+            dilation=settings.use_dilation,
+        )
+        if estimate.total <= budget:
+            return tile_count
+
+    assert estimate is not None
+    hint = "Reduce its size, AA or geometry"
+    if not can_tile:
+        hint = f"It's baked in several passes and can't be tiled. {hint}"
+    raise AddonException(
+        f"Bake of {image_name!r} needs about {format_memory(estimate.total)}"
+        f" of memory, more than the budget of {format_memory(budget)}. {hint}",
+        {
+            "images": format_memory(estimate.images),
+            "pixels": format_memory(estimate.pixels),
+            "finishing": format_memory(estimate.finishing),
+            "geometry": format_memory(estimate.geometry),
+            "triangles": triangles,
+        },
+    )
+
+
+def check_memory_budget(context: blt.Context, tasks: Sequence[BakeTask]) -> None:
+    """Check that every task fits into the memory budget before baking starts.
+
+    :raises AddonException: Listing the tasks that don't fit
+    """
+    if not get_memory_budget():
+        return
+
+    triangles: dict[tuple[str, ...], int] = {}
+    errors: dict[str, str] = {}
+    for task in tasks:
+        settings = get_bake_settings(context, task.settings_id)
+        if not is_baked_by_cycles(task.objects, settings):
+            continue
+
+        key = get_objects_key(task.objects)
+        if key not in triangles:
+            triangles[key] = count_triangles(
+                context, dict.fromkeys((task.objects.active, *task.objects.selected))
+            )
+        try:
+            get_bake_tile_count(
+                context=context,
+                objects=task.objects,
+                settings=settings,
+                can_tile=task.clear_image and task.scale_image,
+                image_name=task.image_name,
+                triangles=triangles[key],
+            )
+        except AddonException as ex:
+            errors.setdefault(task.image_name, str(ex.args[0]))
+
+    if errors:
+        raise AddonException("\n".join(errors.values()))
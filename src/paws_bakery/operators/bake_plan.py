@@ -0,0 +1,430 @@
+"""Plan bake tasks for a Texture Set."""
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from itertools import chain
+
+from bpy import types as blt
+
+from ..common import match_low_to_high
+from ..props import (
+    BakeSettings,
+    MeshProps,
+    TextureProps,
+    TextureSetProps,
+    get_bake_settings,
+)
+from ..props_enums import BakeMode, BakeOrder, BakeState, BakeTextureType
+from ..utils import AddonException
+from ._utils import has_shared_materials
+from .bake_common import (
+    BakeObjects,
+    generate_extra_image_paths,
+    generate_image_name_and_path,
+)
+from .bake_udim import assign_udim_tiles
+
+
+@dataclass(kw_only=True)
+class BakeSource:
+    """Saved image of a texture another texture is derived from."""
+
+    texture: TextureProps
+    image_path: str
+
+
+@dataclass(kw_only=True)
+class BakeTask:
+    """Single run of the bake operator for a texture and a group of objects."""
+
+    texture: TextureProps
+    objects: BakeObjects
+    image_name: str
+    image_path: str
+
+    clear_image: bool = True
+    """Whether the task is the first one writing to the image."""
+    scale_image: bool = True
+    """Whether the task is the last one writing to the image."""
+    use_persistent_data: bool = False
+    """Whether the neighbouring task bakes the same objects."""
+    input_hash: str = ""
+    """Hash of the inputs of all tasks writing to the image, if computed.
+
+    Doesn't depend on names and paths, used as the key of the bake cache.
+    """
+    udim_tile: int = 0
+    """UDIM tile number the image is saved as, 0 if it isn't a tile."""
+    sources: dict[BakeTextureType, BakeSource] = field(default_factory=dict)
+    """Images the texture is derived from by their type, empty if it's baked."""
+    extra_paths: dict[int, str] = field(default_factory=dict)
+    """Paths of the image downscaled to the extra sizes, by size."""
+
+    @property
+    def settings_id(self) -> str:
+        """Id of the BakeSettings used by the task."""
+        return self.texture.prop_id
+
+
+def get_objects_key(bake_objects: BakeObjects) -> tuple[str, ...]:
+    """Return key identifying the geometry loaded for the bake."""
+    return (
+        bake_objects.active.name,
+        *sorted(b_obj.name for b_obj in bake_objects.selected),
+    )
+
+
+def set_meshes_state(
+    texture_set: TextureSetProps, bake_objects: BakeObjects, state: BakeState
+) -> None:
+    """Set bake state of the Texture Set meshes."""
+    for mesh in chain([bake_objects.active], bake_objects.selected):
+        texture_set.meshes[mesh.name].state = state.name
+
+
+def _can_bake_single_pass(
+    texture_set: TextureSetProps,
+    bake_settings: BakeSettings,
+    meshes: Sequence[MeshProps],
+) -> bool:
+    if (
+        BakeMode[texture_set.mode] is not BakeMode.SINGLE
+        or not texture_set.use_single_pass
+        or not meshes
+    ):
+        return False
+    if BakeTextureType[bake_settings.type] is not BakeTextureType.MATERIAL_ID:
+        return True
+    # NOTE: Objects baked one by one color their materials separately, a material
+    # shared by them can't have several colors in one bake
+    return not has_shared_materials([mesh.ensure_mesh_ref() for mesh in meshes])
+
+
+def get_texture_bake_objects(
+    *, context: blt.Context, texture_set: TextureSetProps, texture: TextureProps
+) -> list[BakeObjects]:
+    """Return groups of objects to bake for the texture."""
+    bake_settings = get_bake_settings(context, texture.prop_id)
+    meshes_enabled = texture_set.get_enabled_meshes()
+
+    bake_objects_list: list[BakeObjects] = []
+
+    if bake_settings.use_selected_to_active:
+        matching_names = match_low_to_high([m.name for m in meshes_enabled])
+        for low_high_map in matching_names:
+            active = texture_set.meshes[low_high_map.low].ensure_mesh_ref()
+            bake_objects_list.append(
+                BakeObjects(
+                    active=active,
+                    selected=[
+                        active,
+                        *(
+                            texture_set.meshes[name].ensure_mesh_ref()
+                            for name in low_high_map.high
+                        ),
+                    ],
+                )
+            )
+    elif _can_bake_single_pass(texture_set, bake_settings, meshes_enabled):
+        # NOTE: All objects write to the same atlas, bake them with one call
+        mesh_refs = [mesh.ensure_mesh_ref() for mesh in meshes_enabled]
+        bake_objects_list.append(BakeObjects(active=mesh_refs[0], selected=mesh_refs))
+    else:
+        for mesh in meshes_enabled:
+            mesh_ref = mesh.ensure_mesh_ref()
+            bake_objects_list.append(BakeObjects(active=mesh_ref, selected=[mesh_ref]))
+
+    return bake_objects_list
+
+
+def _plan_texture_tasks(
+    *,
+    context: blt.Context,
+    texture_set: TextureSetProps,
+    texture: TextureProps,
+    bake_objects_list: Sequence[BakeObjects],
+) -> list[BakeTask]:
+    tasks: list[BakeTask] = []
+    mode = BakeMode[texture_set.mode]
+    udim_tiles = (
+        assign_udim_tiles(bake_objects.active for bake_objects in bake_objects_list)
+        if mode is BakeMode.UDIM
+        else {}
+    )
+
+    for bake_objects in bake_objects_list:
+        object_prefix = ""
+        if mode is BakeMode.PER_OBJECT:
+            object_prefix = bake_objects.active.name
+        udim_tile = udim_tiles.get(bake_objects.active.name, 0)
+        udim_tile_str = str(udim_tile) if udim_tile else ""
+        img_name, img_path = generate_image_name_and_path(
+            context=context,
+            settings_id=texture.prop_id,
+            texture_set_name=texture_set.display_name,
+            object_prefix=object_prefix,
+            udim_tile=udim_tile_str,
+        )
+        extra_paths = generate_extra_image_paths(
+            context=context,
+            settings_id=texture.prop_id,
+            texture_set_name=texture_set.display_name,
+            object_prefix=object_prefix,
+            udim_tile=udim_tile_str,
+        )
+        tasks.append(
+            BakeTask(
+                texture=texture,
+                objects=bake_objects,
+                image_name=img_name,
+                image_path=img_path,
+                udim_tile=udim_tile,
+                extra_paths=extra_paths,
+            )
+        )
+
+    return tasks
+
+
+def find_source_texture(
+    *,
+    context: blt.Context,
+    texture_set: TextureSetProps,
+    texture: TextureProps,
+    source_type: BakeTextureType,
+) -> TextureProps:
+    """Return texture of the Texture Set the texture is derived from.
+
+    Enabled textures of the same size are preferred.
+
+    :raises AddonException: If the Texture Set has no texture of the type
+    """
+    settings = get_bake_settings(context, texture.prop_id)
+    candidates: list[TextureProps] = [
+        source
+        for source in texture_set.textures
+        if get_bake_settings(context, source.prop_id).type == source_type.name
+    ]
+    if not candidates:
+        raise AddonException(
+            f"Texture Set {texture_set.display_name!r} has no"
+            f" {source_type.value.ui_name!r} texture to derive"
+            f" {BakeTextureType[settings.type].value.ui_name!r} from"
+        )
+
+    def key(source: TextureProps) -> tuple[bool, bool]:
+        return (
+            get_bake_settings(context, source.prop_id).size != settings.size,
+            not source.is_enabled,
+        )
+
+    return min(candidates, key=key)
+
+
+def _plan_derived_tasks(
+    *, context: blt.Context, texture_set: TextureSetProps, texture: TextureProps
+) -> list[BakeTask]:
+    """Return one task per image of the derived texture, after its sources."""
+    source_types = BakeTextureType[
+        get_bake_settings(context, texture.prop_id).type
+    ].get_source_types()
+    source_textures = {
+        source_type: find_source_texture(
+            context=context,
+            texture_set=texture_set,
+            texture=texture,
+            source_type=source_type,
+        )
+        for source_type in source_types
+    }
+    # NOTE: Images follow the objects of the first source, e.g. low poly objects
+    # of a high to low Normal texture
+    first_source = source_textures[source_types[0]]
+    bake_objects_list = get_texture_bake_objects(
+        context=context, texture_set=texture_set, texture=first_source
+    )
+
+    tasks: dict[str, BakeTask] = {}
+    for task in _plan_texture_tasks(
+        context=context,
+        texture_set=texture_set,
+        texture=texture,
+        bake_objects_list=bake_objects_list,
+    ):
+        prev_task = tasks.get(task.image_path)
+        if prev_task is not None:
+            # NOTE: The whole image is derived at once, from all objects in it
+            prev_task.objects.selected.extend(
+                b_obj
+                for b_obj in task.objects.selected
+                if b_obj not in prev_task.objects.selected
+            )
+            continue
+
+        tasks[task.image_path] = task
+        task.objects = BakeObjects(
+            active=task.objects.active, selected=list(task.objects.selected)
+        )
+        object_prefix = (
+            task.objects.active.name
+            if BakeMode[texture_set.mode] is BakeMode.PER_OBJECT
+            else ""
+        )
+        for source_type, source in source_textures.items():
+            _, image_path = generate_image_name_and_path(
+                context=context,
+                settings_id=source.prop_id,
+                texture_set_name=texture_set.display_name,
+                object_prefix=object_prefix,
+                udim_tile=str(task.udim_tile) if task.udim_tile else "",
+            )
+            task.sources[source_type] = BakeSource(
+                texture=source, image_path=image_path
+            )
+
+    return list(tasks.values())
+
+
+def plan_texture_set_bake(
+    *,
+    context: blt.Context,
+    texture_set: TextureSetProps,
+    textures: Sequence[TextureProps],
+) -> list[BakeTask]:
+    """Return the ordered list of bake tasks for the textures of a Texture Set.
+
+    Derived textures are planned after all baked ones, see
+    `BakeTextureType.is_derived`.
+
+    :raises AddonException: If a derived texture has no source texture, or
+        Name Template of a texture with extra sizes has no `{size}`
+    """
+    tasks: list[BakeTask] = []
+    derived_textures: list[TextureProps] = []
+
+    for texture in textures:
+        settings = get_bake_settings(context, texture.prop_id)
+        if BakeTextureType[settings.type].is_derived:
+            derived_textures.append(texture)
+            continue
+
+        tasks += _plan_texture_tasks(
+            context=context,
+            texture_set=texture_set,
+            texture=texture,
+            bake_objects_list=get_texture_bake_objects(
+                context=context, texture_set=texture_set, texture=texture
+            ),
+        )
+
+    if BakeOrder[texture_set.order] is BakeOrder.OBJECT:
+        tasks = order_tasks_by_objects(tasks)
+
+    for texture in derived_textures:
+        tasks += _plan_derived_tasks(
+            context=context, texture_set=texture_set, texture=texture
+        )
+
+    mark_image_boundaries(tasks)
+    mark_shared_objects(tasks)
+
+    return tasks
+
+
+def order_tasks_by_objects(tasks: Sequence[BakeTask]) -> list[BakeTask]:
+    """Return tasks reordered to bake all textures of the same objects in a row.
+
+    Groups of objects keep the order of their first task, tasks in a group keep
+    their original order.
+    """
+    groups: dict[tuple[str, ...], list[BakeTask]] = {}
+    for task in tasks:
+        groups.setdefault(get_objects_key(task.objects), []).append(task)
+
+    return list(chain.from_iterable(groups.values()))
+
+
+def mark_shared_objects(tasks: Sequence[BakeTask]) -> None:
+    """Mark tasks baking the same objects as the previous or the next task.
+
+    Render data of such tasks can be kept between bakes.
+    """
+    keys = [get_objects_key(task.objects) for task in tasks]
+    for idx, task in enumerate(tasks):
+        task.use_persistent_data = (idx > 0 and keys[idx - 1] == keys[idx]) or (
+            idx + 1 < len(keys) and keys[idx + 1] == keys[idx]
+        )
+
+
+def mark_image_boundaries(tasks: Sequence[BakeTask]) -> None:
+    """Mark the first and the last task writing to each image.
+
+    The first task clears the image, the last one scales and finalizes it.
+    """
+    seen: set[tuple[str, str]] = set()
+    for task in tasks:
+        key = (task.settings_id, task.image_name)
+        task.clear_image = key not in seen
+        seen.add(key)
+
+    seen.clear()
+    for task in reversed(tasks):
+        key = (task.settings_id, task.image_name)
+        task.scale_image = key not in seen
+        seen.add(key)
+
+
+def partition_tasks(
+    tasks: Sequence[BakeTask],
+    count: int,
+    *,
+    cost: Callable[[BakeTask], float] = lambda _: 1.0,
+) -> list[list[int]]:
+    """Split tasks into balanced partitions, e.g. for parallel bake workers.
+
+    Tasks writing to the same image are kept in one partition, derived textures
+    together with their sources. Partitions contain task indices in the original
+    order.
+
+    :param count: Number of partitions
+    :param cost: Function returning estimated cost of a task
+    :return: List of `count` lists of task indices, some may be empty
+    """
+    if count < 1:
+        raise ValueError(f"Partition count must be positive, got {count}")
+
+    groups: dict[str, list[int]] = {}
+    # NOTE: Group of each image path
+    group_keys: dict[str, str] = {}
+    for idx, task in enumerate(tasks):
+        # NOTE: Derived images are computed from the saved sources, after them
+        paths = [source.image_path for source in task.sources.values()]
+        paths.append(task.image_path)
+        key = group_keys.get(paths[0], paths[0])
+        for path in paths:
+            other_key = group_keys.get(path, path)
+            if other_key != key:
+                groups.setdefault(key, []).extend(groups.pop(other_key, []))
+                for other_path, path_key in group_keys.items():
+                    if path_key == other_key:
+                        group_keys[other_path] = key
+            group_keys[path] = key
+        groups.setdefault(key, []).append(idx)
+
+    groups_sorted = sorted(
+        groups.values(),
+        key=lambda indices: sum(cost(tasks[i]) for i in indices),
+        reverse=True,
+    )
+
+    partitions: list[list[int]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for indices in groups_sorted:
+        least_loaded = loads.index(min(loads))
+        partitions[least_loaded].extend(indices)
+        loads[least_loaded] += sum(cost(tasks[i]) for i in indices)
+
+    for partition in partitions:
+        partition.sort()
+
+    return partitions
@@ -0,0 +1,406 @@
+"""Rasterize textures of mesh attributes and constant material values.
+
+Material ID, Position and emit textures of unlinked material sockets don't
+depend on lighting: Cycles only evaluates a constant or an interpolated
+attribute at every pixel. Such textures are written directly instead, by scan
+converting triangles in UV space with NumPy. A pixel is covered when its center
+is inside a triangle, as in Cycles.
+
+Textures of materials with linked sockets, high to low bakes, meshes evaluated
+differently for render and margins of Cycles' margin types are left to Cycles.
+"""
+
+from collections.abc import Iterator
+from typing import cast
+
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+
+from ..enums import Colorspace
+from ..props import BakeSettings
+from ..props_enums import BakeTextureType
+from ..utils import AddonException
+from ._utils import (
+    foreach_get_pixels,
+    foreach_set_pixels,
+    get_collection_array,
+    get_material_id_colors,
+    get_objects_materials,
+)
+from .bake_common import BakeObjects
+
+_MATERIAL_TYPES = frozenset(
+    (
+        BakeTextureType.EMIT_COLOR,
+        BakeTextureType.EMIT_ROUGHNESS,
+        BakeTextureType.EMIT_METALNESS,
+        BakeTextureType.EMIT_OPACITY,
+        BakeTextureType.MATERIAL_ID,
+    )
+)
+"""Types of constant values of the materials."""
+_ATTRIBUTE_TYPES = frozenset((BakeTextureType.POSITION,))
+"""Types of values interpolated from the mesh."""
+
+_EMIT_SOCKETS = {
+    BakeTextureType.EMIT_COLOR: "Base Color",
+    BakeTextureType.EMIT_ROUGHNESS: "Roughness",
+    BakeTextureType.EMIT_METALNESS: "Metallic",
+}
+"""Principled BSDF inputs baked by emit types, see `BakeMaterialManager`."""
+
+_MAX_CHUNK_PIXELS = 1 << 22
+"""Pixels processed at once, limits memory of the intermediate arrays."""
+
+
+def _get_principled_node(mat: blt.Material) -> blt.ShaderNodeBsdfPrincipled | None:
+    tree = mat.node_tree
+    output: blt.ShaderNode | None = (
+        tree.get_output_node("CYCLES") if isinstance(tree, blt.ShaderNodeTree) else None
+    )
+    if output is None or not output.inputs["Surface"].is_linked:
+        return None
+    node = output.inputs["Surface"].links[0].from_node
+    return node if isinstance(node, blt.ShaderNodeBsdfPrincipled) else None
+
+
+def _get_material_value(
+    mat: blt.Material, texture_type: BakeTextureType
+) -> tuple[float, float, float] | None:
+    """Return emitted value of the material, None if it isn't constant."""
+    shader_node = _get_principled_node(mat)
+    if shader_node is None:
+        return None
+
+    if texture_type is BakeTextureType.EMIT_OPACITY:
+        return (1.0, 1.0, 1.0)
+
+    socket = shader_node.inputs[_EMIT_SOCKETS[texture_type]]
+    if socket.is_linked:
+        return None
+    if isinstance(socket, blt.NodeSocketColor):
+        color = socket.default_value
+        return (color[0], color[1], color[2])
+    if isinstance(socket, blt.NodeSocketFloatFactor):
+        return (socket.default_value,) * 3
+    return None
+
+
+def is_evaluated_as_render(b_obj: blt.Object) -> bool:
+    """Return whether the viewport mesh is the one Cycles renders."""
+    for modifier in b_obj.modifiers:
+        if modifier.show_viewport != modifier.show_render:
+            return False
+        # NOTE: Subdivision and Multires modifiers have own render levels
+        if (
+            isinstance(modifier, blt.SubsurfModifier | blt.MultiresModifier)
+            and modifier.show_render
+            and modifier.render_levels != modifier.levels
+        ):
+            return False
+    return True
+
+
+def _get_material_values(
+    objects: BakeObjects, settings: BakeSettings
+) -> dict[str, tuple[float, float, float]] | None:
+    """Return emitted values by material name, None if any isn't constant."""
+    texture_type = BakeTextureType[settings.type]
+    materials = tuple(get_objects_materials(objects.selected))
+    if any(_get_principled_node(mat) is None for mat in materials):
+        return None
+
+    if texture_type is BakeTextureType.MATERIAL_ID:
+        # NOTE: Same colors as set up by `BakeManager`
+        return get_material_id_colors(objects.selected, per_object=True)
+
+    values = {}
+    for mat in materials:
+        value = _get_material_value(mat, texture_type)
+        if value is None:
+            return None
+        values[mat.name] = value
+    return values
+
+
+def _can_rasterize_settings(settings: BakeSettings) -> bool:
+    # NOTE: Opt-in, rasterized pixels aren't identical to Cycles' ones
+    if not settings.use_rasterize:
+        return False
+    texture_type = BakeTextureType[settings.type]
+    if texture_type not in _MATERIAL_TYPES | _ATTRIBUTE_TYPES:
+        return False
+    if settings.use_selected_to_active:
+        return False
+    # NOTE: Dilated margin is filled the same way after baking, Cycles' margin
+    # algorithms aren't reproduced
+    if not settings.use_dilation and settings.margin > 0:
+        return False
+    return not (
+        texture_type is BakeTextureType.MATERIAL_ID and settings.matid_use_object_color
+    )
+
+
+def _can_rasterize_object(b_obj: blt.Object) -> bool:
+    if b_obj.type != "MESH" or not is_evaluated_as_render(b_obj):
+        return False
+    # NOTE: Cycles reports objects it can't bake, leave them to it
+    slots = b_obj.material_slots
+    return bool(slots) and all(slot.material is not None for slot in slots)
+
+
+def can_rasterize(objects: BakeObjects, settings: BakeSettings) -> bool:
+    """Return whether the texture can be rasterized instead of baked by Cycles."""
+    if not _can_rasterize_settings(settings):
+        return False
+    if not all(_can_rasterize_object(b_obj) for b_obj in objects.selected):
+        return False
+
+    if BakeTextureType[settings.type] in _MATERIAL_TYPES:
+        return _get_material_values(objects, settings) is not None
+    return True
+
+
+def iter_triangle_pixels(
+    uvs: npt.NDArray[np.float32], width: int, height: int
+) -> Iterator[
+    tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.float32]]
+]:
+    """Find pixels covered by triangles in UV space, in chunks.
+
+    Pixels on an edge shared by two triangles belong to one of them.
+
+    :param uvs: UVs of triangle corners, float array of (triangles, 3, 2) shape
+    :return: Flat index of the covered pixels, their triangle and barycentric
+        weights of its corners
+    """
+    points = uvs.astype(np.float64) * (width, height)
+    edge_1 = points[:, 1] - points[:, 0]
+    edge_2 = points[:, 2] - points[:, 0]
+    det = edge_1[:, 0] * edge_2[:, 1] - edge_1[:, 1] * edge_2[:, 0]
+
+    # NOTE: Rows whose centers are within the triangle's height, clipped to image
+    row_start = np.clip(np.ceil(points[..., 1].min(axis=1) - 0.5), 0, height)
+    row_stop = np.clip(np.ceil(points[..., 1].max(axis=1) - 0.5), 0, height)
+    row_counts = np.where(det != 0, row_stop - row_start, 0).astype(np.int64)
+
+    span_tris = np.repeat(np.arange(len(points)), row_counts)
+    span_rows = row_start[span_tris] + (
+        np.arange(len(span_tris))
+        - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+    )
+    span_start, span_stop = _get_span_columns(points[span_tris], span_rows + 0.5)
+    span_start = np.clip(np.ceil(span_start - 0.5), 0, width).astype(np.int64)
+    span_stop = np.clip(np.ceil(span_stop - 0.5), 0, width).astype(np.int64)
+    span_lengths = np.maximum(span_stop - span_start, 0)
+
+    for chunk in _iter_span_chunks(span_lengths):
+        lengths = span_lengths[chunk]
+        tris = np.repeat(span_tris[chunk], lengths)
+        rows = np.repeat(span_rows[chunk], lengths).astype(np.int64)
+        offsets = np.arange(len(tris)) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        cols = np.repeat(span_start[chunk], lengths) + offsets
+
+        centers = np.stack((cols + 0.5, rows + 0.5), axis=-1) - points[tris, 0]
+        tri_det = det[tris]
+        weight_1 = (
+            centers[:, 0] * edge_2[tris, 1] - centers[:, 1] * edge_2[tris, 0]
+        ) / tri_det
+        weight_2 = (
+            edge_1[tris, 0] * centers[:, 1] - edge_1[tris, 1] * centers[:, 0]
+        ) / tri_det
+        weights = np.stack((1.0 - weight_1 - weight_2, weight_1, weight_2), axis=-1)
+
+        yield rows * width + cols, tris, weights.astype(np.float32)
+
+
+def _iter_span_chunks(span_lengths: npt.NDArray[np.int64]) -> Iterator[slice]:
+    """Split spans into chunks of `_MAX_CHUNK_PIXELS` at most, or of single spans."""
+    ends = np.cumsum(span_lengths)
+    first = 0
+    # NOTE: Every chunk takes at least one span
+    for _ in range(len(span_lengths)):
+        if first == len(span_lengths):
+            return
+        base = ends[first] - span_lengths[first]
+        last = int(np.searchsorted(ends, base + _MAX_CHUNK_PIXELS, side="right"))
+        last = max(last, first + 1)
+        yield slice(first, last)
+        first = last
+
+
+def _get_span_columns(
+    points: npt.NDArray[np.float64], row_centers: npt.NDArray[np.float64]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Return where the row centers cross the triangles, from left to right."""
+    start = np.full(len(points), np.inf)
+    stop = np.full(len(points), -np.inf)
+    for corner_a, corner_b in ((0, 1), (1, 2), (2, 0)):
+        point_a, point_b = points[:, corner_a], points[:, corner_b]
+        # NOTE: Half-open test, a row through a corner crosses one of its edges
+        crosses = (point_a[:, 1] <= row_centers) != (point_b[:, 1] <= row_centers)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = (row_centers - point_a[:, 1]) / (point_b[:, 1] - point_a[:, 1])
+        cols = point_a[:, 0] + factor * (point_b[:, 0] - point_a[:, 0])
+        start = np.where(crosses, np.minimum(start, cols), start)
+        stop = np.where(crosses, np.maximum(stop, cols), stop)
+    return start, stop
+
+
+def linear_to_srgb(values: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    """Return sRGB encoded values of linear ones."""
+    values = np.clip(values, 0.0, None)
+    return np.where(
+        values <= 0.0031308,
+        values * 12.92,
+        1.055 * np.power(values, 1 / 2.4) - 0.055,
+    )
+
+
+def get_mesh_triangles(
+    mesh: blt.Mesh, uv_layer: str
+) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.int32], npt.NDArray[np.int32]]:
+    """Return UVs, corners and material indices of the mesh triangles.
+
+    :raises AddonException: If the mesh has no UV layer
+    """
+    mesh.calc_loop_triangles()  # type: ignore[no-untyped-call]
+    triangles = mesh.loop_triangles
+    corners = get_collection_array(triangles, "loops", np.int32, 3).reshape((-1, 3))
+    material_indices = get_collection_array(triangles, "material_index", np.int32)
+
+    layer = mesh.uv_layers[uv_layer] if uv_layer else mesh.uv_layers.active
+    if layer is None:
+        raise AddonException("Mesh needs an active UV layer to bake", mesh.name)
+    loop_uvs = get_collection_array(layer.uv, "vector", np.float32, 2)
+
+    return loop_uvs.reshape((-1, 2))[corners], corners, material_indices
+
+
+def get_corner_positions(b_obj: blt.Object, mesh: blt.Mesh) -> npt.NDArray[np.float32]:
+    """Return world positions of the mesh loops."""
+    positions = get_collection_array(mesh.vertices, "co", np.float32, 3)
+    vertex_indices = get_collection_array(mesh.loops, "vertex_index", np.int32)
+
+    matrix = np.array(b_obj.matrix_world, dtype=np.float32)
+    world_positions: npt.NDArray[np.float32] = (
+        positions.reshape((-1, 3)) @ matrix[:3, :3].T + matrix[:3, 3]
+    )
+    return world_positions[vertex_indices]
+
+
+def _get_triangle_values(
+    b_obj: blt.Object,
+    eval_obj: blt.Object,
+    mesh: blt.Mesh,
+    *,
+    settings: BakeSettings,
+    material_values: dict[str, tuple[float, float, float]],
+    uv_layer: str,
+) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.float32]]:
+    """Return UVs of the triangles and their values.
+
+    :return: UVs, values of the triangle corners for attribute types, of whole
+        triangles for material types
+    """
+    uvs, corners, material_indices = get_mesh_triangles(mesh, uv_layer)
+    if BakeTextureType[settings.type] is BakeTextureType.POSITION:
+        return uvs, get_corner_positions(eval_obj, mesh)[corners]
+
+    slot_values = np.array(
+        [material_values[slot.material.name] for slot in b_obj.material_slots],
+        dtype=np.float32,
+    )
+    return uvs, slot_values[np.clip(material_indices, 0, len(slot_values) - 1)]
+
+
+def _rasterize_object(
+    pixels: npt.NDArray[np.float32],
+    b_obj: blt.Object,
+    *,
+    settings: BakeSettings,
+    material_values: dict[str, tuple[float, float, float]],
+    depsgraph: blt.Depsgraph,
+    uv_layer: str,
+) -> None:
+    height, width = pixels.shape[:2]
+    flat = pixels.reshape((-1, 4))
+
+    eval_obj = cast(blt.Object, b_obj.evaluated_get(depsgraph))
+    mesh = eval_obj.to_mesh()
+    try:
+        uvs, values = _get_triangle_values(
+            b_obj,
+            eval_obj,
+            mesh,
+            settings=settings,
+            material_values=material_values,
+            uv_layer=uv_layer,
+        )
+    finally:
+        eval_obj.to_mesh_clear()  # type: ignore[no-untyped-call]
+
+    for indices, tris, weights in iter_triangle_pixels(uvs, width, height):
+        if BakeTextureType[settings.type] is BakeTextureType.POSITION:
+            flat[indices, :3] = np.einsum("pc,pcv->pv", weights, values[tris])
+        else:
+            flat[indices, :3] = values[tris]
+        flat[indices, 3] = 1.0
+
+
+def rasterize_image(
+    image: blt.Image,
+    *,
+    context: blt.Context,
+    objects: BakeObjects,
+    settings: BakeSettings,
+    uv_layer: str = "",
+) -> None:
+    """Write the texture of the objects into the image, see `can_rasterize()`.
+
+    Only the covered pixels are written, like Cycles does without margin and
+    clearing the image.
+
+    :param uv_layer: UV layer to rasterize instead of the active one
+    """
+    width, height = image.size
+    pixels = np.zeros((height, width, 4), dtype=np.float32)
+    material_values = (
+        _get_material_values(objects, settings)
+        if BakeTextureType[settings.type] in _MATERIAL_TYPES
+        else {}
+    )
+    assert material_values is not None
+
+    depsgraph = context.evaluated_depsgraph_get()
+    for b_obj in objects.selected:
+        _rasterize_object(
+            pixels,
+            b_obj,
+            settings=settings,
+            material_values=material_values,
+            depsgraph=depsgraph,
+            uv_layer=uv_layer,
+        )
+
+    write_image_pixels(image, pixels)
+
+
+def write_image_pixels(image: blt.Image, pixels: npt.NDArray[np.float32]) -> None:
+    """Write linear RGBA pixels with non-zero alpha into the image."""
+    height, width = pixels.shape[:2]
+    written = pixels[..., 3] > 0
+    if not image.is_float and image.colorspace_settings.name == Colorspace.SRGB:
+        # NOTE: Byte images store encoded colors, Cycles encodes them on write
+        pixels[..., :3] = linear_to_srgb(pixels[..., :3])
+
+    channels = image.channels
+    image_pixels = np.empty(width * height * channels, dtype=np.float32)
+    foreach_get_pixels(image, image_pixels)
+    image_pixels.reshape((height, width, channels))[written] = pixels[written][
+        :, :channels
+    ]
+    foreach_set_pixels(image, image_pixels)
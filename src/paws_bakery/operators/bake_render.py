@@ -0,0 +1,59 @@
+"""Render settings of the bake by texture type, see `RenderProfile`."""
+
+from dataclasses import dataclass
+
+from bpy import types as blt
+
+from ..props import BakeSettings
+from ..props_enums import BakeTextureType, RenderProfile
+
+_AO_TYPES = frozenset((BakeTextureType.AO, BakeTextureType.AORM))
+"""AO node casts its own rays, light bounces don't change the result.
+
+Its distance and samples are inputs of the AO node in the add-on's node group,
+they are tuned there and aren't part of the render options."""
+
+
+@dataclass(kw_only=True, frozen=True)
+class RenderOptions:
+    """Cycles settings of a bake."""
+
+    samples: int
+    max_bounces: int | None
+    """None for Cycles' default."""
+    use_denoising: bool
+
+
+def get_render_options(settings: BakeSettings, scene_samples: int) -> RenderOptions:
+    """Return Cycles settings of the bake with the settings.
+
+    :param scene_samples: Samples of the user's scene, used if settings have 0
+    """
+    samples = settings.samples or scene_samples
+    if RenderProfile[settings.render_profile] is RenderProfile.CUSTOM:
+        return RenderOptions(
+            samples=samples, max_bounces=None, use_denoising=settings.use_denoising
+        )
+
+    texture_type = BakeTextureType[settings.type]
+    if texture_type.is_deterministic:
+        # NOTE: More samples only jitter pixels, AA is done by supersampling
+        return RenderOptions(samples=1, max_bounces=0, use_denoising=False)
+    if texture_type in _AO_TYPES:
+        return RenderOptions(
+            samples=samples, max_bounces=0, use_denoising=settings.use_denoising
+        )
+    return RenderOptions(
+        samples=samples, max_bounces=None, use_denoising=settings.use_denoising
+    )
+
+
+def apply_render_options(scene: blt.Scene, options: RenderOptions) -> None:
+    """Set Cycles settings of the scene, all of them as the scene is reused."""
+    cycles = scene.cycles
+    cycles.samples = options.samples
+    cycles.use_denoising = options.use_denoising
+    if options.max_bounces is None:
+        cycles.max_bounces = cycles.bl_rna.properties["max_bounces"].default
+    else:
+        cycles.max_bounces = options.max_bounces
@@ -10,8 +10,13 @@ from ..enums import BlenderEventType, BlenderJobType
 from ..enums import BlenderOperatorReturnType as BORT
 from ..enums import BlenderWMReportType as BWMRT
 from ..props import SIMPLE_BAKE_SETTINGS_ID, get_bake_settings
-from ..utils import Registry, TimerManager
-from .bake_common import BakeObjects, generate_image_name_and_path
+from ..props_enums import BakeTextureType
+from ..utils import AddonException, Registry, TimerManager
+from .bake_common import (
+    BakeObjects,
+    generate_extra_image_paths,
+    generate_image_name_and_path,
+)
 from .bake_job import BakeJob, BakeJobState
 from .bake_manager import BakeManager
 
@@ -48,11 +53,27 @@ class BakeSelected(blt.Operator):
             self.report({BWMRT.ERROR}, "PAWSBKR: Baking already running")
             return {BORT.CANCELLED}
 
+        settings = get_bake_settings(context, self.settings_id)
+        if BakeTextureType[settings.type].is_derived:
+            self.report(
+                {BWMRT.ERROR}, "PAWSBKR: Derived textures are baked in Texture Sets"
+            )
+            return {BORT.CANCELLED}
+
         img_name, img_path = generate_image_name_and_path(
             context=context,
             settings_id=self.settings_id,
             texture_set_name=SIMPLE_BAKE_SETTINGS_ID,
         )
+        try:
+            extra_paths = generate_extra_image_paths(
+                context=context,
+                settings_id=self.settings_id,
+                texture_set_name=SIMPLE_BAKE_SETTINGS_ID,
+            )
+        except AddonException as ex:
+            self.report({BWMRT.ERROR}, f"PAWSBKR: {ex.args[0]}")
+            return {BORT.CANCELLED}
 
         if context.active_object is None:
             self.report({BWMRT.ERROR}, "PAWSBKR: No active Object")
@@ -65,11 +86,12 @@ class BakeSelected(blt.Operator):
         self.__bake_job = BakeJob(
             context=context,
             objects=objects,
-            settings=get_bake_settings(context, self.settings_id),
+            settings=settings,
             clear_image=self.clear_image,
             scale_image=self.scale_image,
             image_name=img_name,
             image_path=img_path,
+            extra_paths=extra_paths,
         )
         self.__bake_job.on_execute()
 
@@ -0,0 +1,272 @@
+"""Bake an image in UV-space tiles to limit memory use.
+
+Each tile is baked with supersampling into a small image through a temporary UV
+layer mapping the tile to the whole image, then downscaled and pasted into the
+output. Memory used by Cycles depends on the tile size instead of the image size.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from itertools import pairwise
+from typing import cast
+
+import bpy
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+
+from .._helpers import log
+from ..props import BakeSettings
+from ..props_enums import DownscaleFilter
+from ..utils import AddonException
+from ._utils import (
+    foreach_set_pixels,
+    get_collection_array,
+    resize_image_buffer,
+    set_collection_array,
+)
+from .image_downscale import downscale, get_image_pixels
+
+TILE_UV_LAYER_NAME = "pawsbkr_tile"
+TILE_IMAGE_NAME = "pawsbkr_tile"
+
+_FILTER_REACH = 3
+"""Output pixels needed around a tile by the widest downscale filter."""
+
+
+@dataclass(kw_only=True, frozen=True)
+class BakeTile:
+    """Region of the output image baked separately, in output pixels.
+
+    Coordinates start at the bottom left corner, as in Blender images.
+    """
+
+    x: int
+    y: int
+    width: int
+    height: int
+    padded_x: int
+    padded_y: int
+    padded_width: int
+    padded_height: int
+    """Baked region, the tile with pixels around it cropped after downscaling.
+    Clipped to the image, so that its borders are filtered as in a single bake."""
+
+
+def get_tile_padding(settings: BakeSettings) -> int:
+    """Return padding covering the bake margin and the downscale filter."""
+    margin = 0 if settings.use_dilation else settings.margin
+    return margin + _FILTER_REACH
+
+
+def plan_tiles(size: int, count: int, padding: int) -> list[BakeTile]:
+    """Split square image into count x count tiles padded by `padding` pixels."""
+    if count < 1:
+        raise ValueError(f"Tile count must be positive, got {count}")
+
+    edges = [round(idx * size / count) for idx in range(count + 1)]
+    spans = [
+        (start, end, max(start - padding, 0), min(end + padding, size))
+        for start, end in pairwise(edges)
+    ]
+    return [
+        BakeTile(
+            x=x0,
+            y=y0,
+            width=x1 - x0,
+            height=y1 - y0,
+            padded_x=padded_x0,
+            padded_y=padded_y0,
+            padded_width=padded_x1 - padded_x0,
+            padded_height=padded_y1 - padded_y0,
+        )
+        for y0, y1, padded_y0, padded_y1 in spans
+        for x0, x1, padded_x0, padded_x1 in spans
+    ]
+
+
+def paste_tile(
+    output: npt.NDArray[np.float32],
+    tile_pixels: npt.NDArray[np.float32],
+    tile: BakeTile,
+) -> None:
+    """Paste downscaled pixels of the padded tile into the output pixels."""
+    left, bottom = tile.x - tile.padded_x, tile.y - tile.padded_y
+    output[tile.y : tile.y + tile.height, tile.x : tile.x + tile.width] = tile_pixels[
+        bottom : bottom + tile.height, left : left + tile.width
+    ]
+
+
+@dataclass(kw_only=True)
+class _TileUVLayer:
+    mesh: blt.Mesh
+    uvs: npt.NDArray[np.float32]
+    """Coordinates of the UV layer used for baking."""
+
+
+@dataclass(kw_only=True)
+class TiledBake:
+    """Bake tiles one by one into a small image and assemble the output image.
+
+    Call `begin()`, then `prepare_tile()` and `store_tile()` around the bake of
+    each tile, and `finish()` or `abort()` in the end.
+    """
+
+    image: blt.Image
+    """Output image of `size` x `size` pixels."""
+    meshes: Iterable[blt.Mesh]
+    """Meshes whose UVs are baked."""
+    settings: BakeSettings
+    tiles: list[BakeTile]
+
+    __index: int = field(init=False, default=0)
+    __uv_layers: list[_TileUVLayer] = field(init=False, default_factory=list)
+    __tile_image: blt.Image | None = field(init=False, default=None)
+    __pixels: npt.NDArray[np.float32] = field(init=False)
+
+    @property
+    def tile(self) -> BakeTile:
+        """Tile to bake next."""
+        return self.tiles[self.__index]
+
+    @property
+    def tile_image(self) -> blt.Image:
+        """Image the tiles are baked to."""
+        assert self.__tile_image is not None
+        return self.__tile_image
+
+    def begin(self) -> None:
+        """Create the tile image and UV layers."""
+        size = int(self.settings.size)
+        width, height = self.image.size
+        if (width, height) != (size, size):
+            raise AddonException(
+                "Tiled bake expects the image of the output size",
+                {"image": self.image.name, "size": (width, height)},
+            )
+
+        # NOTE: Black, like a cleared image
+        self.__pixels = np.zeros((size, size, self.image.channels), dtype=np.float32)
+        self.__pixels[..., 3:] = 0.0 if self.settings.use_dilation else 1.0
+
+        try:
+            self.__create_uv_layers()
+        except Exception:
+            self.abort()
+            raise
+
+        old_tile_image = bpy.data.images.get(TILE_IMAGE_NAME)
+        if old_tile_image is not None:
+            bpy.data.images.remove(old_tile_image)
+
+        tile_size = max(
+            max(tile.padded_width, tile.padded_height) for tile in self.tiles
+        )
+        self.__tile_image = bpy.data.images.new(
+            name=TILE_IMAGE_NAME,
+            width=tile_size * int(self.settings.sampling),
+            height=tile_size * int(self.settings.sampling),
+            alpha=False,
+            float_buffer=self.settings.is_float,
+        )
+        self.__tile_image.colorspace_settings.name = self.image.colorspace_settings.name
+        log(
+            f"Baking {self.image.name!r} in {len(self.tiles)} tiles"
+            f" of {tile_size * int(self.settings.sampling)}px"
+        )
+
+    def prepare_tile(self) -> None:
+        """Set up the tile image and UVs for the bake of the current tile."""
+        tile = self.tile
+        sampling = int(self.settings.sampling)
+        resize_image_buffer(
+            self.tile_image,
+            tile.padded_width * sampling,
+            tile.padded_height * sampling,
+            is_float=self.settings.is_float,
+            # NOTE: Alpha marks the baked pixels
+            alpha=0.0 if self.settings.use_dilation else 1.0,
+        )
+
+        size = int(self.settings.size)
+        offset = np.array([tile.padded_x, tile.padded_y])
+        scale = np.array([tile.padded_width, tile.padded_height])
+        for layer in self.__uv_layers:
+            tile_uvs = ((layer.uvs.reshape(-1, 2) * size - offset) / scale).astype(
+                np.float32
+            )
+            set_collection_array(
+                layer.mesh.uv_layers[TILE_UV_LAYER_NAME].uv, "vector", tile_uvs.ravel()
+            )
+            layer.mesh.update()
+
+    def store_tile(self) -> bool:
+        """Downscale the baked tile into the output, return whether tiles are left."""
+        tile = self.tile
+        downscale_filter = DownscaleFilter[self.settings.downscale_filter]
+        sampling = int(self.settings.sampling)
+
+        if sampling > 1 and downscale_filter is DownscaleFilter.BLENDER:
+            self.tile_image.scale(tile.padded_width, tile.padded_height)
+            tile_pixels = get_image_pixels(self.tile_image)
+        else:
+            tile_pixels = downscale(
+                get_image_pixels(self.tile_image),
+                sampling,
+                downscale_filter,
+                clip=not self.tile_image.is_float,
+            )
+        paste_tile(self.__pixels, tile_pixels, tile)
+
+        self.__index += 1
+        return self.__index < len(self.tiles)
+
+    def finish(self) -> None:
+        """Write the assembled pixels to the output image and clean up."""
+        foreach_set_pixels(self.image, self.__pixels.ravel())
+        self.abort()
+
+    def abort(self) -> None:
+        """Remove the tile image and UV layers."""
+        for layer in self.__uv_layers:
+            uv_layer = layer.mesh.uv_layers.get(TILE_UV_LAYER_NAME)
+            if uv_layer is not None:
+                layer.mesh.uv_layers.remove(uv_layer)
+        self.__uv_layers.clear()
+
+        if self.__tile_image is not None:
+            bpy.data.images.remove(self.__tile_image)
+            self.__tile_image = None
+
+    def __create_uv_layers(self) -> None:
+        for mesh in dict.fromkeys(self.meshes):
+            source = mesh.uv_layers.active
+            if source is None:
+                raise AddonException("Mesh has no UV layer to bake", mesh.name)
+
+            uvs = get_collection_array(source.uv, "vector", np.float32, 2)
+            source_name = source.name
+
+            tile_layer = mesh.uv_layers.new(name=TILE_UV_LAYER_NAME, do_init=False)
+            if tile_layer is None:
+                raise AddonException(
+                    "Tiled bake needs a free UV layer, mesh has the maximum of them",
+                    mesh.name,
+                )
+            self.__uv_layers.append(_TileUVLayer(mesh=mesh, uvs=uvs))
+            # NOTE: New layer may become active, keep the user's one
+            mesh.uv_layers.active = mesh.uv_layers[source_name]
+
+
+def get_tile_count(settings: BakeSettings) -> int:
+    """Return number of tiles per side, 1 if the image is baked at once."""
+    return max(min(int(settings.tiles), int(settings.size)), 1)
+
+
+def get_tiled_bake_meshes(
+    objects: Iterable[blt.Object], active: blt.Object, settings: BakeSettings
+) -> list[blt.Mesh]:
+    """Return meshes whose UVs the bake uses."""
+    if settings.use_selected_to_active:
+        return [cast(blt.Mesh, active.data)]
+    return [cast(blt.Mesh, b_obj.data) for b_obj in objects]
@@ -0,0 +1,102 @@
+"""Bake objects into the tiles of a UDIM texture.
+
+Each object gets its own tile. It's baked like in Per Object mode and saved as
+the tile's file, e.g. `name.1002.png`, which Blender loads as one tiled image.
+The UVs of the object are copied into a UV layer shifted to the tile, for
+materials using the tiled image.
+
+Tiles aren't baked into a tiled image at once: Blender bakes every tile of the
+image for every object, which costs about as many bakes as objects x tiles.
+"""
+
+from collections.abc import Iterable
+from typing import cast
+
+import numpy as np
+from bpy import types as blt
+
+from ..utils import AddonException
+from ._utils import get_collection_array, set_collection_array
+
+UDIM_TOKEN = "<UDIM>"
+UDIM_START = 1001
+UDIM_UV_LAYER_NAME = "pawsbkr_udim"
+
+_UDIM_COLUMNS = 10
+_UDIM_MAX_TILES = 1000
+"""Tiles 1001 to 2000, numbers Blender accepts."""
+
+
+def assign_udim_tiles(objects: Iterable[blt.Object]) -> dict[str, int]:
+    """Return UDIM tile numbers of the objects by name, in order of the objects.
+
+    :raises AddonException: If objects share a mesh, their UVs can't be in
+        different tiles, or there are too many objects
+    """
+    tiles: dict[str, int] = {}
+    mesh_users: dict[str, str] = {}
+    for b_obj in objects:
+        if b_obj.name in tiles:
+            continue
+
+        other = mesh_users.setdefault(b_obj.data.name, b_obj.name)
+        if other != b_obj.name:
+            raise AddonException(
+                "Objects sharing a mesh can't be baked into different UDIM tiles",
+                {"objects": (other, b_obj.name), "mesh": b_obj.data.name},
+            )
+        tiles[b_obj.name] = UDIM_START + len(tiles)
+
+    if len(tiles) > _UDIM_MAX_TILES:
+        raise AddonException(
+            f"UDIM texture can't have more than {_UDIM_MAX_TILES} tiles",
+            {"objects": len(tiles)},
+        )
+    return tiles
+
+
+def get_udim_tile_offset(tile: int) -> tuple[int, int]:
+    """Return UV offset of the tile, ten tiles per row."""
+    row, column = divmod(tile - UDIM_START, _UDIM_COLUMNS)
+    return column, row
+
+
+def set_udim_uvs(b_obj: blt.Object, tile: int) -> None:
+    """Write UVs of the object shifted to the tile into the UDIM UV layer.
+
+    The layer is created if needed and left unchanged if it's up to date, so
+    that render data kept between bakes stays valid.
+    """
+    mesh = cast(blt.Mesh, b_obj.data)
+    source = mesh.uv_layers.active
+    if source is None or source.name == UDIM_UV_LAYER_NAME:
+        raise AddonException(
+            "Mesh needs an active UV layer to bake into UDIM tiles", mesh.name
+        )
+
+    uvs = get_collection_array(source.uv, "vector", np.float32, 2)
+    uvs.reshape((-1, 2))[:] += get_udim_tile_offset(tile)
+
+    udim_layer = mesh.uv_layers.get(UDIM_UV_LAYER_NAME)
+    if udim_layer is not None:
+        current = get_collection_array(udim_layer.uv, "vector", np.float32, 2)
+        if np.array_equal(current, uvs):
+            return
+    else:
+        source_name = source.name
+        udim_layer = mesh.uv_layers.new(name=UDIM_UV_LAYER_NAME, do_init=False)
+        if udim_layer is None:
+            raise AddonException(
+                "UDIM bake needs a free UV layer, mesh has the maximum of them",
+                mesh.name,
+            )
+        # NOTE: New layer may become active, keep the user's one
+        mesh.uv_layers.active = mesh.uv_layers[source_name]
+
+    set_collection_array(udim_layer.uv, "vector", uvs)
+    mesh.update()
+
+
+def use_udim_uvs(b_obj: blt.Object) -> None:
+    """Render the object with the UDIM UV layer, see `set_udim_uvs()`."""
+    cast(blt.Mesh, b_obj.data).uv_layers[UDIM_UV_LAYER_NAME].active_render = True
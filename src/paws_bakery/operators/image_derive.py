@@ -0,0 +1,138 @@
+"""Derive curvature masks from baked Normal and Position textures.
+
+Curvature is the divergence of the tangent space normals: on convex features X
+of the normal grows along U and Y along V. Normals `radius` pixels apart are
+compared with NumPy over the whole image, without Cycles.
+
+Position texture keeps the comparisons within UV islands. Pixels farther apart in
+world space than their distance in pixels allows are across a UV seam or out of
+the islands, only the other neighbour is compared then.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+
+from ..props import BakeSettings
+from ..props_enums import BakeTextureType
+from ..utils import AddonException
+from .bake_raster import write_image_pixels
+from .image_downscale import read_image_file
+
+_SEAM_FACTOR = 4.0
+"""Neighbours farther than this many times the typical world distance between
+pixels are across a UV seam."""
+
+
+def _shift(
+    values: npt.NDArray[np.float32], offset: int, axis: int
+) -> tuple[npt.NDArray[np.float32], npt.NDArray[np.bool_]]:
+    """Return values `offset` pixels away along the axis, and if they're in image."""
+    size = values.shape[axis]
+    indices = np.arange(size) + offset
+    shifted = np.take(values, np.clip(indices, 0, size - 1), axis=axis)
+
+    shape = [1, 1]
+    shape[axis] = size
+    is_inside = ((indices >= 0) & (indices < size)).reshape(shape)
+    return shifted, np.broadcast_to(is_inside, values.shape[:2])
+
+
+def get_pixel_distance(positions: npt.NDArray[np.float32]) -> float:
+    """Return typical world distance between neighbouring pixels, 0 if unknown."""
+    distances = np.linalg.norm(np.diff(positions[..., :3], axis=1), axis=-1)
+    distances = distances[distances > 0]
+    return float(np.median(distances)) if distances.size else 0.0
+
+
+def get_curvature(
+    normals: npt.NDArray[np.float32], positions: npt.NDArray[np.float32], radius: int
+) -> npt.NDArray[np.float32]:
+    """Return curvature of the normals, from -1 concave to 1 convex.
+
+    :param normals: Tangent space normals encoded to 0..1, float array of
+        (height, width, channels) shape
+    :param positions: World positions of the same pixels
+    :param radius: Distance in pixels between the compared normals
+    """
+    vectors = normals[..., :2] * 2.0 - 1.0
+    positions = positions[..., :3]
+    max_distance = get_pixel_distance(positions) * radius * _SEAM_FACTOR or np.inf
+
+    curvature = np.zeros(normals.shape[:2], dtype=np.float32)
+    # NOTE: Columns go along U and X of the normal, rows along V and Y
+    for axis, component in ((1, 0), (0, 1)):
+        center = vectors[..., component]
+        difference = np.zeros_like(center)
+        count = np.zeros_like(center)
+        for direction in (1, -1):
+            neighbours, is_valid = _shift(center, direction * radius, axis)
+            neighbour_positions, _ = _shift(positions, direction * radius, axis)
+            is_valid = is_valid & (
+                np.linalg.norm(neighbour_positions - positions, axis=-1) <= max_distance
+            )
+            difference += np.where(is_valid, (neighbours - center) * direction, 0.0)
+            count += is_valid
+        curvature += difference / np.maximum(count, 1.0)
+
+    return np.clip(curvature / 2.0, -1.0, 1.0)
+
+
+def get_derived_values(
+    texture_type: BakeTextureType, curvature: npt.NDArray[np.float32]
+) -> npt.NDArray[np.float32]:
+    """Return 0..1 values of the derived texture type from the curvature."""
+    if texture_type is BakeTextureType.CURVATURE:
+        values = 0.5 + 0.5 * curvature
+    elif texture_type is BakeTextureType.CAVITY:
+        values = -curvature
+    elif texture_type is BakeTextureType.EDGE:
+        values = curvature
+    else:
+        raise ValueError(f"Texture type {texture_type.name!r} isn't derived")
+    return np.clip(values, 0.0, 1.0)
+
+
+def derive_image(
+    image: blt.Image,
+    *,
+    settings: BakeSettings,
+    source_paths: Mapping[BakeTextureType, str],
+) -> None:
+    """Write the derived texture into the image, computed from saved sources.
+
+    :param source_paths: Image paths by the source types of the texture, see
+        `BakeTextureType.get_source_types()`
+    """
+    texture_type = BakeTextureType[settings.type]
+    normals = read_image_file(source_paths[BakeTextureType.NORMAL])
+    positions = read_image_file(source_paths[BakeTextureType.POSITION])
+    if normals.shape[:2] != positions.shape[:2]:
+        raise AddonException(
+            "Normal and Position textures have different sizes",
+            {"normal": normals.shape[:2], "position": positions.shape[:2]},
+        )
+
+    curvature = get_curvature(normals, positions, settings.derived_radius)
+    values = get_derived_values(texture_type, curvature * settings.derived_strength)
+
+    # NOTE: AA images are downscaled back to the texture size when finalized
+    width, height = image.size
+    factor = width // values.shape[1]
+    if (
+        factor < 1
+        or values.shape[1] * factor != width
+        or values.shape[0] * factor != height
+    ):
+        raise AddonException(
+            "Source textures size doesn't match the derived texture",
+            {"image": (width, height), "sources": values.shape[1::-1]},
+        )
+    if factor > 1:
+        values = np.repeat(np.repeat(values, factor, axis=0), factor, axis=1)
+
+    pixels = np.ones((height, width, 4), dtype=np.float32)
+    pixels[..., :3] = values[..., None]
+    write_image_pixels(image, pixels)
@@ -0,0 +1,188 @@
+"""Fill the bake margin after downscaling, instead of baking it with Cycles.
+
+Images are baked without margin into transparent pixels, so their alpha marks the
+pixels covered by UVs. After downscaling, empty pixels get the color of the
+nearest covered pixel, found with the jump flooding algorithm at the output
+resolution.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+
+from ..props import BakeSettings
+from ..props_enums import BakeTextureType, MarginType
+from ._utils import foreach_get_pixels, foreach_set_pixels
+
+_COVERED_ALPHA = 0.5
+"""Downscaled pixels with lower coverage are filled as empty ones."""
+_NO_SEED = -1e9
+"""Seed coordinate of pixels without a nearest covered pixel yet, far away from
+any image."""
+
+_BACKGROUNDS: dict[str, tuple[float, float, float]] = {
+    "NORMAL": (0.5, 0.5, 1.0),
+}
+"""Color of pixels out of the margin by Cycles bake type, as Cycles clears them.
+Black for other types."""
+
+
+def get_dilation_margin(settings: BakeSettings) -> int | None:
+    """Return margin filled after baking in output pixels, None to fill all."""
+    if MarginType[settings.margin_type] is MarginType.DILATE_ALL:
+        return None
+    return int(settings.margin)
+
+
+def get_dilation_background(settings: BakeSettings) -> tuple[float, float, float]:
+    """Return color of the pixels out of the dilated margin."""
+    return _BACKGROUNDS.get(BakeTextureType[settings.type].cycles_type, (0, 0, 0))
+
+
+def _nearest_in_rows(covered: npt.NDArray[np.bool_]) -> npt.NDArray[np.float32]:
+    """Return column of the nearest covered pixel in the row, `_NO_SEED` if none."""
+    width = covered.shape[1]
+    cols = np.arange(width, dtype=np.float32)
+    left = np.where(covered, cols, np.float32(_NO_SEED))
+    np.maximum.accumulate(left, axis=1, out=left)
+    right = np.where(covered, cols, np.float32(-_NO_SEED))
+    np.minimum.accumulate(right[:, ::-1], axis=1, out=right[:, ::-1])
+    return np.where(cols - left <= right - cols, left, right)
+
+
+def _scan_rows(
+    row_cols: npt.NDArray[np.float32], margin: int
+) -> tuple[npt.NDArray[np.int32], npt.NDArray[np.float32]]:
+    """Compare nearest pixels of the rows up to `margin` away, exactly.
+
+    :return: Row of the nearest pixel and squared distance to it
+    """
+    height, width = row_cols.shape
+    cols = np.arange(width, dtype=np.float32)
+    row_distances = np.square(row_cols - cols)
+    distances = row_distances.copy()
+    offsets = np.zeros(row_cols.shape, dtype=np.int32)
+
+    for dy in range(-margin, margin + 1):
+        if not dy or abs(dy) >= height:
+            continue
+
+        dst = slice(max(-dy, 0), height - max(dy, 0))
+        src = slice(max(dy, 0), height - max(-dy, 0))
+        candidate = row_distances[src] + np.float32(dy * dy)
+        nearer = candidate < distances[dst]
+        np.copyto(distances[dst], candidate, where=nearer)
+        np.copyto(offsets[dst], dy, where=nearer)
+
+    return offsets + np.arange(height, dtype=np.int32)[:, None], distances
+
+
+def _flood_rows(
+    row_cols: npt.NDArray[np.float32],
+) -> tuple[npt.NDArray[np.int32], npt.NDArray[np.float32]]:
+    """Spread nearest pixels of the rows along columns with a jump flood.
+
+    Steps halve from the image height down to 1, the found pixel may be farther
+    than the nearest one by about a pixel.
+
+    :return: Row of the nearest pixel and squared distance to it
+    """
+    height, width = row_cols.shape
+    rows = np.arange(height, dtype=np.float32)[:, None]
+    cols = np.arange(width, dtype=np.float32)
+    seed_rows = np.broadcast_to(rows, row_cols.shape).copy()
+    seed_cols = row_cols.copy()
+    distances = np.square(seed_cols - cols)
+
+    first_step = 1 << max(height - 1, 0).bit_length()
+    for step in (first_step >> shift for shift in range(first_step.bit_length())):
+        for dy in (-step, step):
+            if abs(dy) >= height:
+                continue
+
+            dst = slice(max(-dy, 0), height - max(dy, 0))
+            src = slice(max(dy, 0), height - max(-dy, 0))
+            candidate_rows, candidate_cols = seed_rows[src], seed_cols[src]
+            candidate = np.square(candidate_rows - rows[dst])
+            candidate += np.square(candidate_cols - cols)
+
+            nearer = candidate < distances[dst]
+            # NOTE: Sources overlap destinations, NumPy copies them when needed
+            np.copyto(distances[dst], candidate, where=nearer)
+            np.copyto(seed_rows[dst], candidate_rows, where=nearer)
+            np.copyto(seed_cols[dst], candidate_cols, where=nearer)
+
+    return seed_rows.astype(np.int32), distances
+
+
+def _find_nearest(
+    covered: npt.NDArray[np.bool_], margin: int | None
+) -> tuple[npt.NDArray[np.int32], npt.NDArray[np.int32], npt.NDArray[np.float32]]:
+    """Find the nearest covered pixel of every pixel.
+
+    The nearest covered pixel in each row is found first, then the nearest of
+    them in the other rows.
+
+    :param margin: Search only pixels up to this distance, the result is exact.
+        None to search all, see `_flood_rows()`
+    :return: Row and column of the nearest pixel and squared distance to it, inf
+        where none was found
+    """
+    row_cols = _nearest_in_rows(covered)
+    if margin is None:
+        seed_rows, distances = _flood_rows(row_cols)
+    else:
+        seed_rows, distances = _scan_rows(row_cols, margin)
+
+    seed_cols = row_cols[seed_rows, np.arange(covered.shape[1])]
+    distances[seed_cols == _NO_SEED] = np.inf
+    return seed_rows, seed_cols.astype(np.int32), distances
+
+
+def dilate(
+    pixels: npt.NDArray[np.float32],
+    margin: int | None,
+    background: Sequence[float] = (0.0, 0.0, 0.0),
+) -> None:
+    """Fill pixels not covered by the bake with the nearest covered ones, in place.
+
+    :param pixels: RGBA float array of (height, width, 4) shape, coverage in
+        alpha. Alpha is set to 1
+    :param margin: Number of pixels to fill around covered ones, None to fill
+        all pixels, e.g. to keep background out of the texture's mipmaps
+    :param background: Color of the pixels out of the margin
+    """
+    coverage = pixels[..., 3]
+    covered = coverage >= _COVERED_ALPHA
+
+    # NOTE: Downscaled edges are averaged with transparent black background,
+    # restore the color of the covered part
+    partial = covered & (coverage < 1.0)
+    pixels[partial, :3] /= coverage[partial, None]
+
+    if not covered.all():
+        seed_rows, seed_cols, distances = _find_nearest(covered, margin)
+
+        filled = ~covered & np.isfinite(distances)
+        if margin is not None:
+            filled &= distances <= margin**2
+        pixels[filled, :3] = pixels[seed_rows[filled], seed_cols[filled], :3]
+        pixels[~covered & ~filled, :3] = background
+
+    coverage[:] = 1.0
+
+
+def dilate_image(img: blt.Image, settings: BakeSettings) -> None:
+    """Fill the margin of the baked image in place, see `dilate()`."""
+    width, height = img.size
+    pixels = np.empty(width * height * img.channels, dtype=np.float32)
+    foreach_get_pixels(img, pixels)
+
+    dilate(
+        pixels.reshape((height, width, img.channels)),
+        get_dilation_margin(settings),
+        get_dilation_background(settings),
+    )
+    foreach_set_pixels(img, pixels)
@@ -0,0 +1,289 @@
+"""Downscale supersampled images with NumPy."""
+
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import bpy
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+
+from ..enums import Colorspace
+from ..props_enums import DownscaleFilter
+from ..utils import AddonException
+from ._utils import foreach_get_pixels, foreach_set_pixels, resize_image_buffer
+from .image_stream import (
+    create_scratch_pixels,
+    get_block_rows,
+    get_scratch_directory,
+    is_large_image,
+    map_image_pixels,
+)
+
+_LANCZOS_LOBES = 3
+# NOTE: Mitchell-Netravali recommended parameters
+_MITCHELL_B = 1 / 3
+_MITCHELL_C = 1 / 3
+
+
+def _box(x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    return (np.abs(x) < 0.5).astype(np.float64)
+
+
+def _mitchell(x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    b, c = _MITCHELL_B, _MITCHELL_C
+    x = np.abs(x)
+    near = (12 - 9 * b - 6 * c) * x**3 + (-18 + 12 * b + 6 * c) * x**2 + (6 - 2 * b)
+    far = (
+        (-b - 6 * c) * x**3
+        + (6 * b + 30 * c) * x**2
+        + (-12 * b - 48 * c) * x
+        + (8 * b + 24 * c)
+    )
+    return np.where(x < 1, near, np.where(x < 2, far, 0.0)) / 6
+
+
+def _lanczos(x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    return np.where(
+        np.abs(x) < _LANCZOS_LOBES, np.sinc(x) * np.sinc(x / _LANCZOS_LOBES), 0.0
+    )
+
+
+@dataclass(kw_only=True, frozen=True)
+class _Kernel:
+    function: Callable[[npt.NDArray[np.float64]], npt.NDArray[np.float64]]
+    radius: float
+    """Distance in output pixels beyond which the weights are 0."""
+
+
+_KERNELS: dict[DownscaleFilter, _Kernel] = {
+    DownscaleFilter.BOX: _Kernel(function=_box, radius=0.5),
+    DownscaleFilter.MITCHELL: _Kernel(function=_mitchell, radius=2.0),
+    DownscaleFilter.LANCZOS: _Kernel(function=_lanczos, radius=_LANCZOS_LOBES),
+}
+
+
+def get_filter_taps(
+    factor: int, downscale_filter: DownscaleFilter
+) -> tuple[npt.NDArray[np.int_], npt.NDArray[np.float32]]:
+    """Return offsets and normalized weights of the filter taps.
+
+    With an integer factor every output pixel uses the same weights. Offset is
+    relative to the first source pixel of the output pixel.
+    """
+    kernel = _KERNELS[downscale_filter]
+    reach = math.ceil(kernel.radius * factor)
+    offsets = np.arange(-reach, factor + reach)
+    # NOTE: Distance between pixel centers, in output pixels
+    weights = kernel.function((offsets + 0.5 - factor / 2) / factor)
+
+    nonzero = np.abs(weights) > 1e-8
+    offsets, weights = offsets[nonzero], weights[nonzero]
+    return offsets, (weights / weights.sum()).astype(np.float32)
+
+
+def _downscale_axis(
+    pixels: npt.NDArray[np.float32],
+    axis: int,
+    factor: int,
+    taps: tuple[npt.NDArray[np.int_], npt.NDArray[np.float32]],
+) -> npt.NDArray[np.float32]:
+    shape = pixels.shape
+    count = shape[axis] // factor
+    # NOTE: Group source pixels into blocks of output pixels. With contiguous input
+    # it's a view, and each block shift is a single vectorised weighted sum
+    blocks = np.ascontiguousarray(
+        pixels.take(range(count * factor), axis=axis)
+        if shape[axis] % factor
+        else pixels
+    ).reshape(math.prod(shape[:axis]), count, factor, -1)
+    result = np.zeros((blocks.shape[0], count, blocks.shape[3]), dtype=np.float32)
+
+    offsets, weights = taps
+    for shift in np.unique(offsets // factor):
+        in_block = offsets // factor == shift
+        block_weights = np.zeros(factor, dtype=np.float32)
+        block_weights[offsets[in_block] % factor] = weights[in_block]
+
+        first, last = max(-shift, 0), min(count - shift, count)
+        if first < last:
+            result[:, first:last] += np.einsum(
+                "i,paiq->paq",
+                block_weights,
+                blocks[:, first + shift : last + shift],
+            )
+        # NOTE: Blocks outside of the image extend the edge pixels
+        if first > 0:
+            result[:, :first] += block_weights.sum() * blocks[:, :1, 0]
+        if last < count:
+            result[:, last:] += block_weights.sum() * blocks[:, -1:, -1]
+
+    return result.reshape(*shape[:axis], count, *shape[axis + 1 :])
+
+
+def downscale(
+    pixels: npt.NDArray[np.float32],
+    factor: int,
+    downscale_filter: DownscaleFilter,
+    *,
+    clip: bool = False,
+) -> npt.NDArray[np.float32]:
+    """Downscale pixels by an integer factor.
+
+    :param pixels: Array of (height, width, channels) shape
+    :param clip: Clip the result to [0, 1], e.g. for byte images, as Mitchell and
+        Lanczos filters may overshoot
+    :return: float32 array of (height // factor, width // factor, channels) shape
+    """
+    if factor < 1:
+        raise ValueError(f"Downscale factor must be positive, got {factor}")
+    if downscale_filter is DownscaleFilter.BLENDER:
+        raise ValueError("Blender filter is not supported by NumPy downscale")
+
+    if factor == 1:
+        return pixels.astype(np.float32)
+
+    taps = get_filter_taps(factor, downscale_filter)
+    # NOTE: Rows first, the second pass gets already reduced input
+    result = _downscale_axis(pixels, 0, factor, taps)
+    result = _downscale_axis(result, 1, factor, taps)
+
+    if clip:
+        np.clip(result, 0.0, 1.0, out=result)
+
+    return result
+
+
+def downscale_rows(
+    pixels: npt.NDArray[np.float32],
+    factor: int,
+    downscale_filter: DownscaleFilter,
+    start: int,
+    stop: int,
+    *,
+    clip: bool = False,
+) -> npt.NDArray[np.float32]:
+    """Downscale pixels by an integer factor, only output rows `start:stop`.
+
+    Reads only the source rows the filter needs, the result is the same as the
+    rows of `downscale()`. See `downscale()` for parameters.
+    """
+    if factor < 1:
+        raise ValueError(f"Downscale factor must be positive, got {factor}")
+    if downscale_filter is DownscaleFilter.BLENDER:
+        raise ValueError("Blender filter is not supported by NumPy downscale")
+
+    if factor == 1:
+        return pixels[start:stop].astype(np.float32)
+
+    taps = get_filter_taps(factor, downscale_filter)
+    # NOTE: Output rows around the block the filter reaches to
+    shifts = taps[0] // factor
+    first = max(start + min(shifts.min(), 0), 0)
+    last = min(stop + max(shifts.max(), 0), pixels.shape[0] // factor)
+
+    result = _downscale_axis(pixels[first * factor : last * factor], 0, factor, taps)
+    result = _downscale_axis(result[start - first : stop - first], 1, factor, taps)
+
+    if clip:
+        np.clip(result, 0.0, 1.0, out=result)
+
+    return result
+
+
+def downscale_to_size(
+    pixels: npt.NDArray[np.float32],
+    size: int,
+    downscale_filter: DownscaleFilter,
+    *,
+    clip: bool = False,
+) -> npt.NDArray[np.float32]:
+    """Downscale square pixels to the size, a block of rows at once.
+
+    Only the rows of a block are read at once, e.g. of pixels paged to a scratch
+    file. See `downscale()` for parameters.
+    """
+    height, width, channels = pixels.shape
+    if height != width or width % size:
+        raise AddonException(
+            "Image can't be downscaled by an integer factor",
+            {"size": (width, height), "target_size": size},
+        )
+
+    factor = width // size
+    result = np.empty((size, size, channels), dtype=np.float32)
+    block_rows = get_block_rows(width, channels, factor)
+    for start in range(0, size, block_rows):
+        stop = min(start + block_rows, size)
+        result[start:stop] = downscale_rows(
+            pixels, factor, downscale_filter, start, stop, clip=clip
+        )
+    return result
+
+
+def get_image_pixels(img: blt.Image) -> npt.NDArray[np.float32]:
+    """Return copy of image pixels as float32 array of (height, width, channels)."""
+    width, height = img.size
+    pixels = np.empty(width * height * img.channels, dtype=np.float32)
+    foreach_get_pixels(img, pixels)
+    return pixels.reshape((height, width, img.channels))
+
+
+def read_image_file(image_path: str) -> npt.NDArray[np.float32]:
+    """Return pixels of the saved image file as stored, see `get_image_pixels()`.
+
+    :raises AddonException: If the file doesn't exist, e.g. the texture isn't baked
+    """
+    abs_path = bpy.path.abspath(image_path)
+    if not Path(abs_path).is_file():
+        raise AddonException(
+            "Image file doesn't exist, bake it first", {"image": image_path}
+        )
+
+    img = bpy.data.images.load(abs_path, check_existing=False)
+    img.colorspace_settings.name = Colorspace.NON_COLOR
+    try:
+        return get_image_pixels(img)
+    finally:
+        bpy.data.images.remove(img)
+
+
+def downscale_image(
+    img: blt.Image, size: int, downscale_filter: DownscaleFilter
+) -> None:
+    """Downscale square image in place."""
+    if downscale_filter is DownscaleFilter.BLENDER:
+        img.scale(size, size)
+        return
+
+    width, height = img.size
+    if width != height or width % size:
+        raise AddonException(
+            "Image can't be downscaled by an integer factor",
+            {"image": img.name, "size": tuple(img.size), "target_size": size},
+        )
+
+    colorspace = img.colorspace_settings.name
+
+    factor = width // size
+    if is_large_image(img):
+        pixels = map_image_pixels(img)
+        result = create_scratch_pixels(
+            (size, size, img.channels), get_scratch_directory(img)
+        )
+        block_rows = get_block_rows(width, img.channels, factor)
+        for start in range(0, size, block_rows):
+            stop = min(start + block_rows, size)
+            result[start:stop] = downscale_rows(
+                pixels, factor, downscale_filter, start, stop, clip=not img.is_float
+            )
+    else:
+        pixels = get_image_pixels(img)
+        result = downscale(pixels, factor, downscale_filter, clip=not img.is_float)
+    del pixels
+
+    resize_image_buffer(img, size, size, is_float=img.is_float)
+    img.colorspace_settings.name = colorspace
+    foreach_set_pixels(img, result.reshape(-1))
@@ -0,0 +1,335 @@
+"""Finalize baked images on worker threads.
+
+The bake job copies the baked pixels from Blender on the main thread and hands
+them to `PostProcessQueue`. Downscaling, PNG encoding and writing run on worker
+threads while the next bake is already running. Only NumPy data is used in the
+workers, Blender data can be accessed only from the main thread.
+"""
+
+import os
+import struct
+import threading
+import zlib
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+
+from .._helpers import log, log_err
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_COLOR_TYPES = {3: 2, 4: 6}
+"""PNG color type by number of channels: RGB and RGBA."""
+_PNG_FILTER_SUB = 1
+_PNG_DPI = 72
+"""Resolution Blender writes for new images, the only one supported."""
+_PNG_PPM = _PNG_DPI / 0.0254
+_PNG_COMPRESS_LEVEL = 1
+"""Fast zlib level, Blender also uses low compression for PNG by default."""
+
+_DEFAULT_WORKERS = 2
+_DEFAULT_PENDING = 2
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(data, zlib.crc32(chunk_type))
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+def _check_png_format(channels: int, bit_depth: int) -> None:
+    if channels not in _PNG_COLOR_TYPES:
+        raise ValueError(f"Only RGB and RGBA images are supported, got {channels}")
+    if bit_depth not in (8, 16):
+        raise ValueError(f"Unsupported bit depth: {bit_depth}")
+
+
+def _png_header(width: int, height: int, channels: int, bit_depth: int) -> bytes:
+    """Return signature and chunks before the pixels, the same ones Blender writes."""
+    header = struct.pack(
+        ">IIBBBBB", width, height, bit_depth, _PNG_COLOR_TYPES[channels], 0, 0, 0
+    )
+    # NOTE: Big-endian TIFF with a single IFD of X and Y resolution rationals
+    exif = struct.pack(
+        ">2sHIIIIIHHHIIHHIII",
+        *(b"MM", 42, 24, _PNG_DPI, 1, _PNG_DPI, 1, 2),
+        *(0x011A, 5, 1, 8),
+        *(0x011B, 5, 1, 16),
+        0,
+    )
+    ppm = int(_PNG_PPM)
+    return b"".join(
+        (
+            _PNG_SIGNATURE,
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"eXIf", exif),
+            _png_chunk(b"oFFs", struct.pack(">iiB", 0, 0, 0)),
+            _png_chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1)),
+        )
+    )
+
+
+def _unpremultiply_alpha(pixels: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    """Return RGBA pixels with straight alpha, as Blender saves float images.
+
+    Color of fully transparent pixels is kept.
+    """
+    alpha = pixels[..., 3:]
+    color = np.divide(
+        pixels[..., :3], alpha, out=pixels[..., :3].copy(), where=alpha > 0.0
+    )
+    return np.concatenate((color, alpha), axis=-1)
+
+
+def _filter_png_rows(
+    pixels: npt.NDArray[np.float32], bit_depth: int, *, premultiplied: bool
+) -> bytes:
+    """Return filtered scanlines of the rows, from the top one."""
+    height, _, channels = pixels.shape
+    if premultiplied and channels == 4:
+        pixels = _unpremultiply_alpha(pixels)
+    max_value = (1 << bit_depth) - 1
+    values = np.clip(pixels[::-1], 0.0, 1.0) * max_value + 0.5
+    dtype = np.dtype(np.uint8) if bit_depth == 8 else np.dtype(">u2")
+    rows = values.astype(dtype).view(np.uint8).reshape(height, -1)
+
+    # NOTE: Sub filter - difference with the previous pixel, cheap to compute and
+    # compresses smooth bakes well
+    pixel_size = channels * bit_depth // 8
+    filtered = np.empty((height, rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = _PNG_FILTER_SUB
+    filtered[:, 1 : pixel_size + 1] = rows[:, :pixel_size]
+    np.subtract(
+        rows[:, pixel_size:], rows[:, :-pixel_size], out=filtered[:, pixel_size + 1 :]
+    )
+    return filtered.tobytes()
+
+
+def encode_png(
+    pixels: npt.NDArray[np.float32],
+    *,
+    bit_depth: int = 8,
+    compress_level: int = _PNG_COMPRESS_LEVEL,
+    premultiplied: bool = False,
+) -> bytes:
+    """Encode pixels as PNG, the same way Blender saves them.
+
+    :param pixels: float array of (height, width, channels) shape in Blender's
+        order - the first row is the bottom one. Values are clipped to [0, 1]
+    :param bit_depth: 8 or 16
+    :param premultiplied: Whether alpha is premultiplied, as in float images
+    """
+    height, width, channels = pixels.shape
+    _check_png_format(channels, bit_depth)
+
+    data = zlib.compress(
+        _filter_png_rows(pixels, bit_depth, premultiplied=premultiplied),
+        compress_level,
+    )
+    return b"".join(
+        (
+            _png_header(width, height, channels, bit_depth),
+            _png_chunk(b"IDAT", data),
+            _png_chunk(b"IEND", b""),
+        )
+    )
+
+
+def write_png(
+    path: Path,
+    get_rows: Callable[[int, int], npt.NDArray[np.float32]],
+    *,
+    width: int,
+    height: int,
+    channels: int,
+    block_rows: int,
+    bit_depth: int = 8,
+    compress_level: int = _PNG_COMPRESS_LEVEL,
+    premultiplied: bool = False,
+) -> None:
+    """Encode PNG block by block and write it atomically, as `encode_png()`.
+
+    Only a block of rows is held at once, e.g. for images too large to copy.
+
+    :param get_rows: Return float pixels of rows `start:stop` in Blender's order,
+        of (stop - start, width, channels) shape. Called from the top block down
+    :param block_rows: Number of rows requested at once
+    """
+    _check_png_format(channels, bit_depth)
+
+    compressor = zlib.compressobj(compress_level)
+    with _open_atomic(path) as file:
+        file.write(_png_header(width, height, channels, bit_depth))
+        for stop in range(height, 0, -block_rows):
+            rows = get_rows(max(stop - block_rows, 0), stop)
+            data = compressor.compress(
+                _filter_png_rows(rows, bit_depth, premultiplied=premultiplied)
+            )
+            if data:
+                file.write(_png_chunk(b"IDAT", data))
+        file.write(_png_chunk(b"IDAT", compressor.flush()))
+        file.write(_png_chunk(b"IEND", b""))
+
+
+@contextmanager
+def _open_atomic(path: Path) -> Iterator[BinaryIO]:
+    """Open temporary file replacing the path when closed without errors.
+
+    Readers never see a partially written file.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tmp_path.open("wb") as file:
+        try:
+            yield file
+        except BaseException:
+            file.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def can_encode_image(img: blt.Image) -> bool:
+    """Whether `encode_png()` saves the image the same way as Blender.
+
+    Float images are converted to the colorspace on save, only data ones are
+    saved as is. Only the default resolution of new images is written.
+    """
+    return (
+        img.file_format == "PNG"
+        and Path(img.filepath_raw).suffix.lower() == ".png"
+        and img.channels in _PNG_COLOR_TYPES
+        and (not img.is_float or img.colorspace_settings.is_data)
+        and all(
+            abs(ppm - _PNG_PPM) < 0.01 for ppm in (img.resolution[0], img.resolution[1])
+        )
+    )
+
+
+def get_image_channels(img: blt.Image) -> int:
+    """Return number of channels Blender saves the image with."""
+    # NOTE: Images without alpha have RGB planes, but RGBA pixels
+    return 4 if img.depth in {32, 128} else 3
+
+
+def reload_image(img: blt.Image, image_path: str) -> None:
+    """Reload image from the saved file, keeping its colorspace."""
+    colorspace = img.colorspace_settings.name
+    img.source = "FILE"
+    img.filepath = image_path
+    img.reload()  # type: ignore[no-untyped-call]
+    img.colorspace_settings.name = colorspace
+
+
+@dataclass(kw_only=True)
+class _PendingImage:
+    image_path: str
+    future: Future[None]
+    on_done: Callable[[], None] | None
+
+
+@dataclass(kw_only=True)
+class PostProcessQueue:
+    """Run image post-processing on worker threads.
+
+    Use `poll()` on the main thread to run completion callbacks, and `join()`
+    before using the saved images, e.g. to create materials.
+    """
+
+    max_workers: int = _DEFAULT_WORKERS
+    max_pending: int = _DEFAULT_PENDING
+    """Maximum number of images in flight. `submit()` blocks when reached, each
+    pending image holds a full resolution pixel buffer, paged to a scratch file
+    for large images."""
+
+    failed: dict[str, str] = field(init=False, default_factory=dict)
+    """Error messages by image path."""
+
+    __executor: ThreadPoolExecutor | None = field(init=False, default=None)
+    __slots: threading.BoundedSemaphore = field(init=False)
+    __pending: list[_PendingImage] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        """Create the backpressure semaphore."""
+        self.__slots = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(
+        self,
+        image_path: str,
+        process: Callable[[], None],
+        *,
+        on_done: Callable[[], None] | None = None,
+    ) -> None:
+        """Run `process` on a worker thread and `on_done` on the main thread after.
+
+        `on_done` isn't called if `process` fails.
+        """
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="pawsbkr_post"
+            )
+
+        if not self.__slots.acquire(blocking=False):
+            log("Waiting for post-processing of previous images")
+            self.__slots.acquire()
+            self.poll()
+
+        def run() -> None:
+            try:
+                process()
+            finally:
+                self.__slots.release()
+
+        self.__pending.append(
+            _PendingImage(
+                image_path=image_path,
+                future=self.__executor.submit(run),
+                on_done=on_done,
+            )
+        )
+
+    def poll(self) -> None:
+        """Handle finished images. Call from the main thread."""
+        pending: list[_PendingImage] = []
+        for item in self.__pending:
+            if item.future.done():
+                self.__finish(item)
+            else:
+                pending.append(item)
+        self.__pending = pending
+
+    def join(self) -> None:
+        """Wait for all images and handle them. Call from the main thread."""
+        for item in self.__pending:
+            item.future.exception()
+            self.__finish(item)
+        self.__pending = []
+
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def __finish(self, item: _PendingImage) -> None:
+        ex = item.future.exception()
+        if ex is not None:
+            log_err(f"Failed to save image {item.image_path!r}: {ex}")
+            self.failed[item.image_path] = str(ex)
+            return
+
+        if item.on_done is not None:
+            try:
+                item.on_done()
+            # pylint: disable-next=broad-exception-caught
+            except Exception as on_done_ex:
+                log_err(f"Failed to finish image {item.image_path!r}", with_tb=True)
+                self.failed[item.image_path] = str(on_done_ex)
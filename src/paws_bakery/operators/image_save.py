@@ -0,0 +1,197 @@
+"""Save baked images in the file format of their bake settings."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import bpy
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+
+from ..enums import Colorspace
+from ..props import BakeSettings
+from ..props_enums import (
+    BakePrecision,
+    BakeTextureType,
+    ExrCodec,
+    ImageFileFormat,
+    OutputProfile,
+)
+from ._utils import foreach_set_pixels
+from .image_post_process import get_image_channels
+
+_SAVE_SCENE_NAME = "pawsbkr_image_save"
+
+
+@dataclass(kw_only=True, frozen=True)
+class _ProfileCompression:
+    compression: int
+    exr_codec: ExrCodec
+
+
+_PROFILES = {
+    OutputProfile.STANDARD: _ProfileCompression(compression=15, exr_codec=ExrCodec.ZIP),
+    OutputProfile.FAST: _ProfileCompression(compression=0, exr_codec=ExrCodec.NONE),
+    # NOTE: Higher PNG levels are many times slower for a few percent smaller files
+    OutputProfile.SMALL: _ProfileCompression(compression=70, exr_codec=ExrCodec.ZIP),
+}
+"""Compression and EXR codec of the profiles."""
+
+
+@dataclass(kw_only=True, frozen=True)
+class OutputOptions:
+    """File settings of a baked image."""
+
+    file_format: ImageFileFormat
+    color_depth: str
+    """Bits per channel, as in Blender's image format settings."""
+    compression: int
+    """Compression of PNG and TIFF files in percent."""
+    exr_codec: ExrCodec
+
+    @property
+    def png_compress_level(self) -> int:
+        """Return zlib level Blender uses for the compression."""
+        return self.compression * 9 // 100
+
+    @property
+    def tiff_codec(self) -> str:
+        """Return Blender's TIFF codec for the compression."""
+        return "DEFLATE" if self.compression else "NONE"
+
+
+def get_output_options(settings: BakeSettings) -> OutputOptions:
+    """Return file settings of the image baked with the settings."""
+    file_format = ImageFileFormat[settings.file_format]
+
+    if file_format is ImageFileFormat.OPEN_EXR:
+        is_full_float = BakePrecision[settings.precision] is BakePrecision.BIT_32
+        color_depth = "32" if is_full_float else "16"
+    else:
+        color_depth = "16" if settings.is_float else "8"
+
+    profile = OutputProfile[settings.output_profile]
+    if profile is OutputProfile.CUSTOM:
+        compression, exr_codec = settings.compression, ExrCodec[settings.exr_codec]
+    else:
+        compression = _PROFILES[profile].compression
+        exr_codec = _PROFILES[profile].exr_codec
+
+    return OutputOptions(
+        file_format=file_format,
+        color_depth=color_depth,
+        compression=compression,
+        exr_codec=exr_codec,
+    )
+
+
+def get_default_output_options(
+    file_format: ImageFileFormat, *, is_float: bool
+) -> OutputOptions:
+    """Return file settings of the Standard output profile, e.g. for packed images.
+
+    :param is_float: Save 16 bit file instead of 8 bit, EXR files are half float
+    """
+    profile = _PROFILES[OutputProfile.STANDARD]
+    is_16_bit = is_float or file_format is ImageFileFormat.OPEN_EXR
+    return OutputOptions(
+        file_format=file_format,
+        color_depth="16" if is_16_bit else "8",
+        compression=profile.compression,
+        exr_codec=profile.exr_codec,
+    )
+
+
+def get_image_colorspace(settings: BakeSettings) -> str:
+    """Return colorspace of the image baked with the settings."""
+    colorspace = BakeTextureType[settings.type].colorspace
+    # NOTE: EXR files store linear colors
+    is_exr = ImageFileFormat[settings.file_format] is ImageFileFormat.OPEN_EXR
+    if is_exr and colorspace is not Colorspace.NON_COLOR:
+        return Colorspace.LINEAR
+    return colorspace
+
+
+def save_image(img: blt.Image, image_path: str, options: OutputOptions) -> None:
+    """Save the image with the output options.
+
+    Unlike `Image.save()`, applies the compression and bit depth of the options.
+    The image stays generated with its pixels, reload it to use the saved file.
+    """
+    scene = bpy.data.scenes.new(_SAVE_SCENE_NAME)
+    try:
+        _save_render(img, image_path, options, scene)
+    finally:
+        bpy.data.scenes.remove(scene)
+
+    img.file_format = options.file_format.name
+
+
+def _save_render(
+    img: blt.Image, image_path: str, options: OutputOptions, scene: blt.Scene
+) -> None:
+    image_settings = scene.render.image_settings
+    image_settings.file_format = options.file_format.name
+    image_settings.color_mode = "RGBA" if get_image_channels(img) == 4 else "RGB"
+    image_settings.color_depth = options.color_depth
+    match options.file_format:
+        case ImageFileFormat.PNG:
+            image_settings.compression = options.compression
+        case ImageFileFormat.OPEN_EXR:
+            image_settings.exr_codec = options.exr_codec.name
+        case ImageFileFormat.TIFF:
+            image_settings.tiff_codec = options.tiff_codec
+
+    # NOTE: Save pixels as they are, without the view transform of the scene
+    image_settings.color_management = "OVERRIDE"
+    image_settings.view_settings.view_transform = "Standard"
+    image_settings.view_settings.look = "None"
+
+    img.save_render(bpy.path.abspath(image_path), scene=scene)
+
+
+def save_pixels(
+    pixels: npt.NDArray[np.float32],
+    image_path: str,
+    options: OutputOptions,
+    *,
+    is_float: bool,
+    colorspace: str,
+) -> None:
+    """Save pixels to a new image file, as `save_image()`.
+
+    The image is created only to be saved and removed after.
+
+    :param pixels: Array of (height, width, channels) shape in Blender's order,
+        RGB file is saved for 3 channels, RGBA for 4
+    :param is_float: Whether pixels are stored as of float image, or as of byte
+        image in its colorspace
+    """
+    height, width, channels = pixels.shape
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[..., :channels] = pixels
+
+    img = bpy.data.images.new(
+        Path(image_path).name,
+        width,
+        height,
+        alpha=channels == 4,
+        float_buffer=is_float,
+    )
+    try:
+        _save_image_pixels(img, rgba, image_path, options, colorspace=colorspace)
+    finally:
+        bpy.data.images.remove(img)
+
+
+def _save_image_pixels(
+    img: blt.Image,
+    pixels: npt.NDArray[np.float32],
+    image_path: str,
+    options: OutputOptions,
+    *,
+    colorspace: str,
+) -> None:
+    img.colorspace_settings.name = colorspace
+    foreach_set_pixels(img, pixels.ravel())
+    save_image(img, image_path, options)
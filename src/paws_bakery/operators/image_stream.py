@@ -0,0 +1,83 @@
+"""Process very large images in row blocks through memory-mapped scratch files.
+
+Blender copies image pixels only as a whole. For large images they are copied
+into a scratch file mapped to memory, which the OS can page out, and then read
+back in blocks of rows. Extra memory is a few blocks instead of full copies.
+
+Only the processing is streamed, the copy out of Blender isn't: any slice of
+`Image.pixels` copies the whole image first, so reading it in row blocks would
+copy the image once per block. Blender's own pixel buffer stays in memory for
+the whole copy.
+"""
+
+import tempfile
+from pathlib import Path
+
+import bpy
+import numpy as np
+import numpy.typing as npt
+from bpy import types as blt
+
+from ._utils import foreach_get_pixels
+
+_MB = 1024**2
+
+STREAM_MIN_PIXELS = 8192 * 8192
+"""Images with this many pixels are processed through scratch files, a float
+copy of them takes 1 GB."""
+_BLOCK_BYTES = 32 * _MB
+"""Float source pixels read at once."""
+
+
+def is_large_image(img: blt.Image) -> bool:
+    """Whether the image is processed through a scratch file."""
+    width, height = img.size
+    return width * height >= STREAM_MIN_PIXELS
+
+
+def get_block_rows(width: int, channels: int, factor: int = 1) -> int:
+    """Return number of output rows processed at once.
+
+    :param width: Width of the source pixels
+    :param factor: Downscale factor, each output row reads `factor` source rows
+    """
+    row_bytes = width * channels * factor * np.dtype(np.float32).itemsize
+    return max(_BLOCK_BYTES // row_bytes, 1)
+
+
+def create_scratch_pixels(
+    shape: tuple[int, int, int], directory: Path | None = None
+) -> npt.NDArray[np.float32]:
+    """Return float32 array backed by an anonymous scratch file.
+
+    The file is removed when the array is released. It's created in the
+    `directory`, e.g. next to the output image, as the system temp directory may
+    be in memory.
+    """
+    if directory is not None:
+        directory.mkdir(parents=True, exist_ok=True)
+    # NOTE: The map keeps the file open, it's deleted with the last reference
+    with tempfile.TemporaryFile(
+        prefix="pawsbkr_", suffix=".pixels", dir=directory
+    ) as file:
+        return np.memmap(file, dtype=np.float32, mode="w+", shape=shape)
+
+
+def get_scratch_directory(img: blt.Image) -> Path | None:
+    """Return directory of the image file, system temp directory if unsaved."""
+    if not img.filepath_raw:
+        return None
+    return Path(bpy.path.abspath(img.filepath_raw)).parent
+
+
+def map_image_pixels(img: blt.Image) -> npt.NDArray[np.float32]:
+    """Return pixels of the image copied into a scratch file.
+
+    Array of (height, width, channels) shape, as `get_image_pixels()`.
+    """
+    width, height = img.size
+    pixels = create_scratch_pixels(
+        (height, width, img.channels), get_scratch_directory(img)
+    )
+    foreach_get_pixels(img, pixels.reshape(-1))
+    return pixels
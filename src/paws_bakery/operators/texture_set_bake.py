@@ -2,14 +2,12 @@
 """Bake texture set."""
 
 import datetime
-from itertools import chain
 
 import bpy
 from bpy import props as blp
 from bpy import types as blt
 
 from .._helpers import log, log_err
-from ..common import match_low_to_high
 from ..enums import BlenderEventType, BlenderJobType
 from ..enums import BlenderOperatorReturnType as BORT
 from ..enums import BlenderWMReportType as BWMRT
@@ -19,15 +17,17 @@ from ..props import (
     get_bake_settings,
     get_props,
 )
-from ..props_enums import BakeMode, BakeState
-from ..utils import Registry, TimerManager
-from .bake_common import (
-    BakeObjects,
-    generate_image_name_and_path,
-)
+from ..props_enums import BakeState
+from ..utils import AddonException, Registry, TimerManager
 from .bake_job import BakeJob, BakeJobState
 from .bake_manager import BakeManager
+from .bake_manifest import record_bake_hashes, skip_unchanged_tasks
+from .bake_memory import check_memory_budget
+from .bake_plan import BakeTask, plan_texture_set_bake, set_meshes_state
+from .image_post_process import PostProcessQueue
+from .texture_set_bake_blocking import bake_texture_set_blocking
 from .texture_set_material_create import create_materials
+from .texture_set_pack import pack_texture_set_channels
 
 
 @Registry.add
@@ -44,15 +44,22 @@ class TextureSetBake(blt.Operator):
         options={"HIDDEN", "SKIP_SAVE"},
     )
 
-    _clear_image: bool = True
-
-    _time_start: datetime.datetime
-
     _texture_set: TextureSetProps
     _bake_textures: list[TextureProps]
-    _bake_objects_list: list[BakeObjects]
+    _bake_tasks: list[BakeTask]
+    _tasks_left: dict[str, int]
+    """Number of tasks left for each texture, by settings id."""
+    _time_start: dict[str, datetime.datetime]
+    """Time of the first task of each texture, by settings id."""
 
     __bake_job: BakeJob | None = None
+    _post_process: PostProcessQueue
+    _saved_tasks: list[BakeTask]
+    """Tasks which finalized their images, saved by `_post_process`."""
+
+    _idle_time: float
+    """Total time between the end of a bake and the start of the next one."""
+    _idle_gaps: int
 
     def execute(  # noqa: D102
         self, context: blt.Context
@@ -64,6 +71,16 @@ class TextureSetBake(blt.Operator):
 
         self._texture_set = get_props(context).texture_sets[self.texture_set_id]
 
+        if bpy.app.background:
+            # NOTE: Modal operators never receive events in background mode
+            summary = bake_texture_set_blocking(
+                context=context,
+                texture_set=self._texture_set,
+                texture_id=self.texture_id,
+            )
+            log(summary.format())
+            return {BORT.FINISHED} if summary.is_ok else {BORT.CANCELLED}
+
         self._bake_textures = []
         if self.texture_id:
             texture = self._texture_set.textures[self.texture_id]
@@ -75,10 +92,34 @@ class TextureSetBake(blt.Operator):
         for texture in self._bake_textures:
             texture.state = BakeState.QUEUED.name
 
-        self.__prepare_bake_objects(context, self._bake_textures[0])
-
-        self._time_start = datetime.datetime.now()
+        try:
+            self._bake_tasks = self.__plan_tasks(context)
+        except AddonException as ex:
+            log_err(str(ex))
+            self.report({BWMRT.ERROR}, f"PAWSBKR: {ex.args[0]}")
+            for texture in self._bake_textures:
+                texture.state = BakeState.CANCELLED.name
+            return {BORT.CANCELLED}
 
+        self._tasks_left = {}
+        for task in self._bake_tasks:
+            set_meshes_state(self._texture_set, task.objects, BakeState.QUEUED)
+            self._tasks_left[task.settings_id] = (
+                self._tasks_left.get(task.settings_id, 0) + 1
+            )
+
+        self._time_start = {}
+        self._idle_time = 0.0
+        self._idle_gaps = 0
+        self._post_process = PostProcessQueue()
+        self._saved_tasks = []
+
+        if not self._bake_tasks:
+            log("Nothing to bake")
+            self._finish_outputs(context)
+            return {BORT.FINISHED}
+
+        BakeManager.begin_batch()
         TimerManager.acquire()
         context.window_manager.modal_handler_add(self)
 
@@ -91,9 +132,11 @@ class TextureSetBake(blt.Operator):
             self._cancel(context)
             return {BORT.CANCELLED}
 
-        if event.type != BlenderEventType.TIMER or bpy.app.is_job_running(
-            BlenderJobType.OBJECT_BAKE
-        ):
+        if event.type != BlenderEventType.TIMER:
+            return {BORT.PASS_THROUGH}
+
+        self._post_process.poll()
+        if bpy.app.is_job_running(BlenderJobType.OBJECT_BAKE):
             return {BORT.PASS_THROUGH}
 
         bake_job = self.__ensure_bake_job(context)
@@ -120,40 +163,31 @@ class TextureSetBake(blt.Operator):
 
         return False, msg
 
-    def __prepare_bake_objects(
-        self, context: blt.Context, texture: TextureProps
-    ) -> None:
-        bake_settings = get_bake_settings(context, texture.prop_id)
-
-        meshes_enabled = self._texture_set.get_enabled_meshes()
-
-        self._bake_objects_list = []
-
-        if bake_settings.use_selected_to_active:
-            matching_names = match_low_to_high([m.name for m in meshes_enabled])
-            for low_high_map in matching_names:
-                active = self._texture_set.meshes[low_high_map.low].ensure_mesh_ref()
-                self._bake_objects_list.append(
-                    BakeObjects(
-                        active=active,
-                        selected=[
-                            active,
-                            *(
-                                self._texture_set.meshes[name].ensure_mesh_ref()
-                                for name in low_high_map.high
-                            ),
-                        ],
-                    )
-                )
-        else:
-            for mesh in meshes_enabled:
-                mesh_ref = mesh.ensure_mesh_ref()
-                self._bake_objects_list.append(
-                    BakeObjects(active=mesh_ref, selected=[mesh_ref])
-                )
+    def __plan_tasks(self, context: blt.Context) -> list[BakeTask]:
+        """Return tasks of the changed textures fitting into the memory budget.
+
+        :raises AddonException: If the textures can't be baked
+        """
+        self._bake_tasks = plan_texture_set_bake(
+            context=context,
+            texture_set=self._texture_set,
+            textures=self._bake_textures,
+        )
+        tasks = self.__skip_unchanged(context)
+        check_memory_budget(context, tasks)
+        return tasks
+
+    def __skip_unchanged(self, context: blt.Context) -> list[BakeTask]:
+        tasks_changed = skip_unchanged_tasks(
+            context, self._texture_set, self._bake_tasks
+        )
+
+        changed_ids = {task.settings_id for task in tasks_changed}
+        for texture in self._bake_textures:
+            if texture.prop_id not in changed_ids:
+                texture.state = BakeState.FINISHED.name
 
-        for mesh in meshes_enabled:
-            mesh.state = BakeState.QUEUED.name
+        return tasks_changed
 
     def __ensure_bake_job(self, context: blt.Context) -> BakeJob:
         return self.__bake_job or self.__bake_next(context)
@@ -179,9 +213,8 @@ class TextureSetBake(blt.Operator):
     def __handle_job_state_finished(self, context: blt.Context) -> set[BORT]:
         pawsbkr = get_props(context)
 
-        bake_objects = self._bake_objects_list[0]
-        for mesh in chain([bake_objects.active], bake_objects.selected):
-            self._texture_set.meshes[mesh.name].state = BakeState.FINISHED.name
+        task = self._bake_tasks[0]
+        set_meshes_state(self._texture_set, task.objects, BakeState.FINISHED)
 
         if pawsbkr.utils_settings.debug_pause:
             if pawsbkr.utils_settings.debug_pause_continue:
@@ -190,50 +223,59 @@ class TextureSetBake(blt.Operator):
                 log("debug_pause is active. skipping next bake...")
                 return {BORT.PASS_THROUGH}
 
-        if BakeMode[self._texture_set.mode] is BakeMode.SINGLE:
-            self._clear_image = False
-
-        del self._bake_objects_list[0]
-        if not self._bake_objects_list:
-            self._finish_texture(context)
-            if not self._bake_textures:
-                self._finish(context)
-                return {BORT.FINISHED}
+        if task.scale_image:
+            self._saved_tasks.append(task)
 
-            self.__prepare_bake_objects(context, self._bake_textures[0])
+        del self._bake_tasks[0]
+        self._tasks_left[task.settings_id] -= 1
+        if not self._tasks_left[task.settings_id]:
+            self._finish_texture(context, task.texture)
+        if not self._bake_tasks:
+            self._finish(context)
+            return {BORT.FINISHED}
 
         self.__bake_next(context)
 
         return {BORT.PASS_THROUGH}
 
     def __bake_next(self, context: blt.Context) -> BakeJob:
-        self._bake_textures[0].state = BakeState.RUNNING.name
+        task = self._bake_tasks[0]
 
-        bake_objects = self._bake_objects_list[0]
-        for mesh in chain([bake_objects.active], bake_objects.selected):
-            self._texture_set.meshes[mesh.name].state = BakeState.RUNNING.name
-
-        if BakeMode[self._texture_set.mode] is BakeMode.PER_OBJECT:
-            object_prefix = bake_objects.active.name
-        else:
-            object_prefix = ""
-        img_name, img_path = generate_image_name_and_path(
-            context=context,
-            settings_id=self._bake_textures[0].prop_id,
-            texture_set_name=self._texture_set.display_name,
-            object_prefix=object_prefix,
-        )
+        task.texture.state = BakeState.RUNNING.name
+        self._time_start.setdefault(task.settings_id, datetime.datetime.now())
+        set_meshes_state(self._texture_set, task.objects, BakeState.RUNNING)
 
+        prev_job = self.__bake_job
         self.__bake_job = BakeJob(
             context=context,
-            objects=bake_objects,
-            settings=get_bake_settings(context, self._bake_textures[0].prop_id),
-            clear_image=self._clear_image,
-            scale_image=len(self._bake_objects_list) < 2,
-            image_name=img_name,
-            image_path=img_path,
+            objects=task.objects,
+            settings=get_bake_settings(context, task.settings_id),
+            clear_image=task.clear_image,
+            scale_image=task.scale_image,
+            image_name=task.image_name,
+            image_path=task.image_path,
+            use_persistent_data=task.use_persistent_data,
+            cache_key=task.input_hash,
+            post_process=self._post_process,
+            udim_tile=task.udim_tile,
+            source_paths={
+                source_type: source.image_path
+                for source_type, source in task.sources.items()
+            },
+            extra_paths=task.extra_paths,
         )
         self.__bake_job.on_execute()
+
+        if prev_job is not None and prev_job.time_completed:
+            self._idle_time += self.__bake_job.time_started - prev_job.time_completed
+            self._idle_gaps += 1
+            # NOTE: Poll short jobs more often in case bake handlers weren't called
+            TimerManager.set_interval(
+                (prev_job.time_completed - prev_job.time_started) / 4
+            )
+        else:
+            TimerManager.set_interval(TimerManager.DEFAULT_INTERVAL)
+
         return self.__bake_job
 
     def _cancel(self, _context: blt.Context) -> None:
@@ -241,27 +283,62 @@ class TextureSetBake(blt.Operator):
 
         if self.__bake_job is not None:
             self.__bake_job.cancel()
+        BakeManager.end_batch()
+        self.__join_post_process()
 
         for texture in self._bake_textures:
-            texture.state = BakeState.CANCELLED.name
+            if self._tasks_left.get(texture.prop_id):
+                texture.state = BakeState.CANCELLED.name
 
-        for bake_objects in self._bake_objects_list:
-            for mesh in chain([bake_objects.active], bake_objects.selected):
-                self._texture_set.meshes[mesh.name].state = BakeState.CANCELLED.name
+        for task in self._bake_tasks:
+            set_meshes_state(self._texture_set, task.objects, BakeState.CANCELLED)
 
-    def _finish_texture(self, _context: blt.Context) -> None:
-        delta: datetime.timedelta = datetime.datetime.now() - self._time_start
+    def _finish_texture(self, _context: blt.Context, texture: TextureProps) -> None:
+        delta: datetime.timedelta = (
+            datetime.datetime.now() - self._time_start[texture.prop_id]
+        )
         minutes, seconds = divmod(delta.seconds, 60)
 
-        self._bake_textures[0].last_bake_time = f"{minutes:02}:{seconds:02}"
-        self._bake_textures[0].state = BakeState.FINISHED.name
-        del self._bake_textures[0]
+        texture.last_bake_time = f"{minutes:02}:{seconds:02}"
+        texture.state = BakeState.FINISHED.name
+
+    def __join_post_process(self) -> None:
+        self._post_process.join()
 
-        self._clear_image = True
-        self._time_start = datetime.datetime.now()
+        failed = self._post_process.failed
+        for image_path, msg in failed.items():
+            self.report({BWMRT.ERROR}, f"Failed to save image {image_path!r}: {msg}")
+        for task in self._saved_tasks:
+            if task.image_path in failed:
+                task.texture.state = BakeState.CANCELLED.name
+
+        record_bake_hashes(
+            task for task in self._saved_tasks if task.image_path not in failed
+        )
 
     def _finish(self, context: blt.Context) -> None:
         TimerManager.release()
+        BakeManager.end_batch()
+        self.__join_post_process()
+
+        if self._idle_gaps:
+            log(
+                f"Idle time between jobs: {self._idle_time:.2f}s total,"
+                f" {self._idle_time / self._idle_gaps * 1000:.0f}ms average"
+                f" over {self._idle_gaps} gaps"
+            )
+
+        self._finish_outputs(context)
+
+    def _finish_outputs(self, context: blt.Context) -> None:
+        if self._texture_set.pack_channels:
+            try:
+                pack_texture_set_channels(
+                    context=context, texture_set=self._texture_set
+                )
+            except AddonException as ex:
+                log_err(str(ex))
+                self.report({BWMRT.ERROR}, f"PAWSBKR: {ex.args[0]}")
 
         if self._texture_set.create_materials:
             try:
@@ -0,0 +1,289 @@
+"""Bake texture set synchronously, without a window or a modal operator."""
+
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import bpy
+from bpy import types as blt
+
+from .._helpers import log, log_err
+from ..enums import BlenderJobType
+from ..props import TextureProps, TextureSetProps, get_bake_settings
+from ..props_enums import BakeState
+from ..utils import AddonException
+from .bake_job import BakeJob
+from .bake_manager import BakeManager
+from .bake_manifest import record_bake_hashes, skip_unchanged_tasks
+from .bake_memory import check_memory_budget
+from .bake_plan import BakeTask, plan_texture_set_bake, set_meshes_state
+from .image_post_process import PostProcessQueue
+from .texture_set_material_create import (
+    create_materials as create_texture_set_materials,
+)
+from .texture_set_pack import pack_texture_set_channels
+
+
+@dataclass(kw_only=True)
+class BakeSummary:
+    """Result of a blocking Texture Set bake."""
+
+    texture_set_name: str
+    baked: list[str] = field(default_factory=list)
+    """Paths of the saved images."""
+    failed: list[str] = field(default_factory=list)
+    """Names of the textures that failed to bake."""
+    skipped: list[str] = field(default_factory=list)
+    """Names of the images skipped as unchanged."""
+    errors: list[str] = field(default_factory=list)
+    jobs_total: int = 0
+    jobs_done: int = 0
+    time_spent: float = 0.0
+
+    @property
+    def is_ok(self) -> bool:
+        """Whether all jobs finished without errors."""
+        return not self.failed and not self.errors
+
+    def format(self) -> str:
+        """Return human readable summary."""
+        header = (
+            f"Texture Set {self.texture_set_name!r}:"
+            f" {'OK' if self.is_ok else 'FAILED'},"
+            f" jobs {self.jobs_done}/{self.jobs_total},"
+            f" images {len(self.baked)},"
+            f" skipped {len(self.skipped)},"
+            f" time {self.time_spent:.1f}s"
+        )
+        lines = [
+            header,
+            *(f"  baked: {path}" for path in self.baked),
+            *(f"  skipped: {name}" for name in self.skipped),
+            *(f"  failed: {name}" for name in self.failed),
+            *(f"  error: {msg}" for msg in self.errors),
+        ]
+        return "\n".join(lines)
+
+
+def bake_texture_set_blocking(
+    *,
+    context: blt.Context,
+    texture_set: TextureSetProps,
+    texture_id: str = "",
+    tasks: Sequence[BakeTask] | None = None,
+    create_materials: bool = True,
+    pack_channels: bool = True,
+    record_hashes: bool = True,
+) -> BakeSummary:
+    """Bake textures of the Texture Set and return when done.
+
+    Runs the same tasks as `TextureSetBake` operator, but each bake is executed
+    synchronously, so it works in background mode (`blender -b`).
+    A failed texture doesn't stop baking of the others.
+
+    :param texture_id: Bake only this texture, defaults to all enabled textures
+    :param tasks: Already planned subset of the Texture Set tasks to run,
+        e.g. a partition of a bake farm worker
+    :param create_materials: Allow material creation if enabled in the Texture Set
+    :param pack_channels: Allow channel packing if enabled in the Texture Set
+    :param record_hashes: Store inputs hashes of baked images to the manifest
+        if computed, see `TextureSetProps.skip_unchanged`
+
+    Images are saved on worker threads while the next textures bake, all of them
+    are saved when the function returns.
+
+    :raises AddonException: If a task doesn't fit into the memory budget or a
+        derived texture has no source texture, before anything is baked
+    """
+    if BakeManager.is_running() or bpy.app.is_job_running(BlenderJobType.OBJECT_BAKE):
+        raise AddonException("Baking already running")
+
+    time_start = time.perf_counter()
+    summary = BakeSummary(texture_set_name=texture_set.display_name)
+
+    if tasks is None:
+        tasks, summary.skipped = _plan_tasks(
+            context=context, texture_set=texture_set, texture_id=texture_id
+        )
+
+    check_memory_budget(context, tasks)
+
+    for task in tasks:
+        task.texture.state = BakeState.QUEUED.name
+
+    summary.jobs_total = len(tasks)
+
+    post_process = PostProcessQueue()
+    BakeManager.begin_batch()
+    try:
+        _run_tasks(
+            context=context,
+            texture_set=texture_set,
+            tasks=tasks,
+            summary=summary,
+            post_process=post_process,
+        )
+    finally:
+        BakeManager.end_batch()
+        post_process.join()
+
+    saved_tasks = _check_saved_images(
+        tasks=tasks, summary=summary, failed=post_process.failed
+    )
+    if record_hashes:
+        record_bake_hashes(saved_tasks)
+
+    if pack_channels and texture_set.pack_channels and summary.is_ok:
+        try:
+            pack_texture_set_channels(context=context, texture_set=texture_set)
+        except AddonException as ex:
+            log_err(str(ex))
+            summary.errors.append(f"Failed to pack channels: {ex.args[0]}")
+
+    if create_materials and texture_set.create_materials and summary.is_ok:
+        try:
+            create_texture_set_materials(context=context, texture_set=texture_set)
+        # pylint: disable-next=broad-exception-caught
+        except Exception as ex:
+            log_err(f"Failed to create materials: {ex}", with_tb=True)
+            summary.errors.append(f"Failed to create materials: {ex}")
+
+    summary.time_spent = time.perf_counter() - time_start
+
+    return summary
+
+
+def _plan_tasks(
+    *, context: blt.Context, texture_set: TextureSetProps, texture_id: str
+) -> tuple[list[BakeTask], list[str]]:
+    """Return tasks to run and names of the images skipped as unchanged."""
+    textures: list[TextureProps]
+    if texture_id:
+        textures = [texture_set.textures[texture_id]]
+    else:
+        textures = texture_set.get_enabled_textures()
+
+    tasks = plan_texture_set_bake(
+        context=context, texture_set=texture_set, textures=textures
+    )
+    tasks_changed = skip_unchanged_tasks(context, texture_set, tasks)
+
+    changed_ids = {task.settings_id for task in tasks_changed}
+    for texture in textures:
+        if texture.prop_id not in changed_ids:
+            texture.state = BakeState.FINISHED.name
+
+    changed_images = {task.image_name for task in tasks_changed}
+    skipped = sorted({task.image_name for task in tasks} - changed_images)
+
+    return tasks_changed, skipped
+
+
+def _run_tasks(
+    *,
+    context: blt.Context,
+    texture_set: TextureSetProps,
+    tasks: Sequence[BakeTask],
+    summary: BakeSummary,
+    post_process: PostProcessQueue,
+) -> None:
+    last_tasks = {task.settings_id: task for task in tasks}
+    texture_time_start: dict[str, float] = {}
+    failed_ids: set[str] = set()
+
+    for task in tasks:
+        if task.settings_id in failed_ids:
+            continue
+
+        texture_time_start.setdefault(task.settings_id, time.perf_counter())
+        if not _run_task(
+            context=context,
+            texture_set=texture_set,
+            task=task,
+            summary=summary,
+            post_process=post_process,
+        ):
+            failed_ids.add(task.settings_id)
+            continue
+
+        if task is last_tasks[task.settings_id]:
+            _finish_texture(task.texture, texture_time_start[task.settings_id])
+
+
+def _run_task(
+    *,
+    context: blt.Context,
+    texture_set: TextureSetProps,
+    task: BakeTask,
+    summary: BakeSummary,
+    post_process: PostProcessQueue,
+) -> bool:
+    task.texture.state = BakeState.RUNNING.name
+    set_meshes_state(texture_set, task.objects, BakeState.RUNNING)
+
+    job = BakeJob(
+        context=context,
+        objects=task.objects,
+        settings=get_bake_settings(context, task.settings_id),
+        clear_image=task.clear_image,
+        scale_image=task.scale_image,
+        image_name=task.image_name,
+        image_path=task.image_path,
+        blocking=True,
+        use_persistent_data=task.use_persistent_data,
+        cache_key=task.input_hash,
+        post_process=post_process,
+        udim_tile=task.udim_tile,
+        source_paths={
+            source_type: source.image_path
+            for source_type, source in task.sources.items()
+        },
+        extra_paths=task.extra_paths,
+    )
+    try:
+        job.on_execute()
+    # NOTE: Operators raise RuntimeError when reporting errors
+    except (AddonException, RuntimeError) as ex:
+        log_err(f"Failed to bake {task.image_name!r}", with_tb=True)
+        summary.failed.append(task.image_name)
+        summary.errors.append(str(ex))
+        task.texture.state = BakeState.CANCELLED.name
+        set_meshes_state(texture_set, task.objects, BakeState.CANCELLED)
+        return False
+
+    summary.jobs_done += 1
+    set_meshes_state(texture_set, task.objects, BakeState.FINISHED)
+
+    if task.scale_image:
+        summary.baked.append(bpy.path.abspath(task.image_path))
+        log(f"Baked {task.image_name!r}")
+
+    return True
+
+
+def _check_saved_images(
+    *, tasks: Sequence[BakeTask], summary: BakeSummary, failed: dict[str, str]
+) -> list[BakeTask]:
+    """Move images failed to save to the failed ones, return tasks of saved ones."""
+    saved_tasks: list[BakeTask] = []
+    for task in tasks:
+        image_path = bpy.path.abspath(task.image_path)
+        if not task.scale_image or image_path not in summary.baked:
+            continue
+
+        if task.image_path not in failed:
+            saved_tasks.append(task)
+            continue
+
+        summary.baked.remove(image_path)
+        summary.failed.append(task.image_name)
+        summary.errors.append(failed[task.image_path])
+        task.texture.state = BakeState.CANCELLED.name
+
+    return saved_tasks
+
+
+def _finish_texture(texture: TextureProps, time_start: float) -> None:
+    minutes, seconds = divmod(int(time.perf_counter() - time_start), 60)
+    texture.last_bake_time = f"{minutes:02}:{seconds:02}"
+    texture.state = BakeState.FINISHED.name
@@ -4,6 +4,7 @@
 from collections.abc import Sequence
 from dataclasses import dataclass
 from itertools import chain
+from pathlib import Path
 from typing import cast
 
 import bpy
@@ -18,6 +19,13 @@ from ..props import MeshProps, TextureSetProps, get_bake_settings, get_props
 from ..props_enums import BakeMode
 from ..utils import AddonException, AssetLibraryManager, Registry
 from .bake_common import generate_image_name_and_path
+from .bake_udim import (
+    UDIM_START,
+    UDIM_TOKEN,
+    assign_udim_tiles,
+    set_udim_uvs,
+    use_udim_uvs,
+)
 from .texture_import import UTIL_MATS_IMPORT_SAMPLE_NAME, assign_images_to_material
 
 
@@ -72,6 +80,12 @@ def create_materials(*, context: blt.Context, texture_set: TextureSetProps) -> N
     )
 
     bpy.ops.ed.undo_push(message="Create Materials")
+    if BakeMode[texture_set.mode] is BakeMode.UDIM and (
+        texture_set.create_materials_reuse_existing
+        or texture_set.create_materials_assign_to_objects
+    ):
+        _render_udim_uvs(mat_info_list)
+
     for mat_info in mat_info_list:
         if texture_set.create_materials_reuse_existing:
             for mat in set(
@@ -129,13 +143,29 @@ def _collect_material_update_info(
                     context=context, texture_set_name=texture_set.display_name
                 ),
                 meshes=meshes_to_update,
-                images=_load_images(context=context, texture_set=texture_set),
+                images=_load_images(
+                    context=context,
+                    texture_set=texture_set,
+                    udim=BakeMode[texture_set.mode] is BakeMode.UDIM,
+                ),
             )
         )
 
     return mat_info_list
 
 
+def _render_udim_uvs(mat_info_list: Sequence[_MaterialUpdateInfo]) -> None:
+    """Render the meshes with UVs in their UDIM tiles, as the materials sample them.
+
+    UVs are written here too, skipped unchanged bakes don't write them.
+    """
+    for mat_info in mat_info_list:
+        udim_tiles = assign_udim_tiles(mat_info.meshes)
+        for mesh in mat_info.meshes:
+            set_udim_uvs(mesh, udim_tiles[mesh.name])
+            use_udim_uvs(mesh)
+
+
 def _get_meshes_to_update(
     *, context: blt.Context, texture_set: TextureSetProps
 ) -> list[blt.Object]:
@@ -171,19 +201,30 @@ def _load_images(
     context: blt.Context,
     texture_set: TextureSetProps,
     object_prefix: str = "",
+    udim: bool = False,
 ) -> list[blt.Image]:
     images: list[blt.Image] = []
     images_missing: list[str] = []
 
     for texture_props in texture_set.get_enabled_textures():
-        img_name, _ = generate_image_name_and_path(
+        img_name, img_path = generate_image_name_and_path(
             context=context,
             settings_id=texture_props.prop_id,
             texture_set_name=texture_set.display_name,
             object_prefix=object_prefix,
+            udim_tile=UDIM_TOKEN if udim else "",
         )
+        file_path = img_path.replace(UDIM_TOKEN, str(UDIM_START))
 
         image = bpy.data.images.get(img_name)
+        if image is not None and udim:
+            # NOTE: Tiles were saved by the bake, the tiled image was not updated
+            image.reload()  # type: ignore[no-untyped-call]
+        elif image is None and Path(bpy.path.abspath(file_path)).exists():
+            # NOTE: Image could be baked by another process or unlinked after bake
+            image = bpy.data.images.load(img_path, check_existing=True)
+            if udim:
+                image.source = "TILED"
         if image:
             images.append(image)
         else:
@@ -0,0 +1,336 @@
+# flake8: noqa: F821
+"""Pack channels of baked textures into images of other engines' layouts.
+
+Packs are assembled from the saved single channel textures of the Texture Set,
+e.g. AO, Roughness and Metalness into ORM, without baking them again.
+"""
+
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import bpy
+import numpy as np
+import numpy.typing as npt
+from bpy import props as blp
+from bpy import types as blt
+
+from .._helpers import log, log_err
+from ..enums import BlenderOperatorReturnType as BORT
+from ..enums import BlenderOperatorType as BOT
+from ..enums import BlenderWMReportType as BWMRT
+from ..enums import Colorspace
+from ..preferences import get_preferences
+from ..props import (
+    ChannelPackProps,
+    TextureProps,
+    TextureSetProps,
+    get_bake_settings,
+    get_props,
+)
+from ..props_enums import BakeMode, ImageFileFormat, PackChannel
+from ..utils import AddonException, Registry
+from .bake_common import generate_image_name_and_path
+from .bake_plan import get_texture_bake_objects
+from .bake_udim import assign_udim_tiles
+from .image_downscale import read_image_file
+from .image_post_process import write_png
+from .image_save import OutputOptions, get_default_output_options, save_pixels
+
+
+@Registry.add
+class TextureSetPackAdd(blt.Operator):
+    """Add Channel Pack to Texture Set."""
+
+    bl_idname = "pawsbkr.texture_set_pack_add"
+    bl_label = "Add Channel Pack"
+    bl_options = {BOT.REGISTER, BOT.UNDO}  # noqa: RUF012
+
+    def execute(self, context: blt.Context) -> set[str]:  # noqa: D102
+        texture_set = get_props(context).active_texture_set
+        assert texture_set
+
+        texture_set.packs.add()
+        texture_set.packs_active_index = len(texture_set.packs) - 1
+
+        return {BORT.FINISHED}
+
+
+@Registry.add
+class TextureSetPackRemove(blt.Operator):
+    """Remove Channel Pack from Texture Set."""
+
+    bl_idname = "pawsbkr.texture_set_pack_remove"
+    bl_label = "Remove Channel Pack"
+    bl_options = {BOT.REGISTER, BOT.UNDO}  # noqa: RUF012
+
+    def execute(self, context: blt.Context) -> set[str]:  # noqa: D102
+        texture_set = get_props(context).active_texture_set
+        assert texture_set
+
+        texture_set.packs.remove(texture_set.packs_active_index)
+        texture_set.packs_active_index = max(texture_set.packs_active_index - 1, 0)
+
+        return {BORT.FINISHED}
+
+
+@Registry.add
+class TextureSetPack(blt.Operator):
+    """Pack channels of baked textures of Texture Set."""
+
+    bl_idname = "pawsbkr.texture_set_pack"
+    bl_label = "Pack Channels of Baked Textures"
+
+    texture_set_id: blp.StringProperty(  # type: ignore[valid-type]
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
+
+    def execute(self, context: blt.Context) -> set[str]:  # noqa: D102
+        if not self.texture_set_id:
+            raise AddonException("texture_set_id is required")
+
+        texture_set = get_props(context).texture_sets[self.texture_set_id]
+        try:
+            pack_texture_set_channels(context=context, texture_set=texture_set)
+        except AddonException as ex:
+            log_err(str(ex))
+            self.report({BWMRT.ERROR}, f"PAWSBKR: {ex.args[0]}")
+            return {BORT.CANCELLED}
+
+        return {BORT.FINISHED}
+
+
+@dataclass(kw_only=True)
+class PackImage:
+    """Packed image and the saved images its channels are read from."""
+
+    image_path: str
+    channels: list[PackChannel]
+    source_paths: dict[PackChannel, str]
+    """Image paths of the channels read from textures."""
+    is_float: bool
+    """Whether any source is saved with 16 bit or more."""
+
+
+def find_channel_texture(
+    *, context: blt.Context, texture_set: TextureSetProps, channel: PackChannel
+) -> TextureProps:
+    """Return texture of the Texture Set the channel is read from.
+
+    Enabled textures are preferred, then the order of the channel texture types.
+
+    :raises AddonException: If the Texture Set has no texture of the types
+    """
+    texture_types = [texture_type.name for texture_type in channel.get_texture_types()]
+    candidates: list[TextureProps] = [
+        texture
+        for texture in texture_set.textures
+        if get_bake_settings(context, texture.prop_id).type in texture_types
+    ]
+    if not candidates:
+        raise AddonException(
+            f"Texture Set {texture_set.display_name!r} has no texture of"
+            f" {channel.value.ui_name!r} channel",
+            {"types": texture_types},
+        )
+
+    def key(texture: TextureProps) -> tuple[bool, int]:
+        return (
+            not texture.is_enabled,
+            texture_types.index(get_bake_settings(context, texture.prop_id).type),
+        )
+
+    return min(candidates, key=key)
+
+
+def _generate_pack_path(
+    *,
+    texture_set: TextureSetProps,
+    pack: ChannelPackProps,
+    object_prefix: str,
+    udim_tile: str,
+) -> str:
+    """Return path of the packed image, as `generate_image_name_and_path()`."""
+    name = pack.get_name(texture_set.display_name)
+    if object_prefix:
+        name = f"{object_prefix}_{name}"
+    if udim_tile:
+        name = f"{name}.{udim_tile}"
+    name += ImageFileFormat[pack.file_format].extension
+    return f"{get_preferences().output_directory}/{texture_set.display_name}/{name}"
+
+
+def plan_pack_images(
+    *, context: blt.Context, texture_set: TextureSetProps, pack: ChannelPackProps
+) -> list[PackImage]:
+    """Return images of the pack, one per image of its textures.
+
+    :raises AddonException: If the pack has no texture channels or the Texture
+        Set misses their textures
+    """
+    channels = pack.get_channels()
+    textures = {
+        channel: find_channel_texture(
+            context=context, texture_set=texture_set, channel=channel
+        )
+        for channel in channels
+        if channel.get_texture_types()
+    }
+    if not textures:
+        raise AddonException(
+            f"Channel pack {pack.suffix!r} has only constant channels",
+            {"texture_set": texture_set.display_name},
+        )
+    is_float = any(
+        get_bake_settings(context, texture.prop_id).is_float
+        for texture in textures.values()
+    )
+
+    # NOTE: Images follow the objects of the first texture, as bake tasks do
+    bake_objects_list = get_texture_bake_objects(
+        context=context, texture_set=texture_set, texture=next(iter(textures.values()))
+    )
+    mode = BakeMode[texture_set.mode]
+    udim_tiles = (
+        assign_udim_tiles(bake_objects.active for bake_objects in bake_objects_list)
+        if mode is BakeMode.UDIM
+        else {}
+    )
+
+    images: dict[str, PackImage] = {}
+    for bake_objects in bake_objects_list:
+        object_prefix = bake_objects.active.name if mode is BakeMode.PER_OBJECT else ""
+        udim_tile = udim_tiles.get(bake_objects.active.name, 0)
+        udim_tile_str = str(udim_tile) if udim_tile else ""
+
+        image_path = _generate_pack_path(
+            texture_set=texture_set,
+            pack=pack,
+            object_prefix=object_prefix,
+            udim_tile=udim_tile_str,
+        )
+        if image_path in images:
+            continue
+
+        source_paths: dict[PackChannel, str] = {}
+        for channel, texture in textures.items():
+            _, source_paths[channel] = generate_image_name_and_path(
+                context=context,
+                settings_id=texture.prop_id,
+                texture_set_name=texture_set.display_name,
+                object_prefix=object_prefix,
+                udim_tile=udim_tile_str,
+            )
+        images[image_path] = PackImage(
+            image_path=image_path,
+            channels=channels,
+            source_paths=source_paths,
+            is_float=is_float,
+        )
+
+    return list(images.values())
+
+
+def pack_pixels(
+    channels: Sequence[PackChannel],
+    sources: Mapping[PackChannel, npt.NDArray[np.float32]],
+) -> npt.NDArray[np.float32]:
+    """Return packed pixels of (height, width, channels) shape.
+
+    :param sources: Pixels of the texture channels, red channel is packed
+    :raises AddonException: If the sources have different sizes
+    """
+    sizes = {pixels.shape[:2] for pixels in sources.values()}
+    if len(sizes) != 1:
+        raise AddonException(
+            "Textures of the channel pack have different sizes",
+            {channel.name: pixels.shape[1::-1] for channel, pixels in sources.items()},
+        )
+    height, width = sizes.pop()
+
+    packed = np.empty((height, width, len(channels)), dtype=np.float32)
+    for idx, channel in enumerate(channels):
+        if channel not in sources:
+            packed[..., idx] = channel.constant
+        elif channel.invert:
+            packed[..., idx] = 1.0 - sources[channel][..., 0]
+        else:
+            packed[..., idx] = sources[channel][..., 0]
+
+    return packed
+
+
+def _save_packed(
+    pixels: npt.NDArray[np.float32], image_path: str, options: OutputOptions
+) -> None:
+    height, width, channels = pixels.shape
+    if options.file_format is ImageFileFormat.PNG:
+        write_png(
+            Path(bpy.path.abspath(image_path)),
+            lambda start, stop: pixels[start:stop],
+            width=width,
+            height=height,
+            channels=channels,
+            block_rows=height,
+            bit_depth=int(options.color_depth),
+            compress_level=options.png_compress_level,
+        )
+        return
+
+    save_pixels(
+        pixels,
+        image_path,
+        options,
+        is_float=True,
+        colorspace=Colorspace.NON_COLOR,
+    )
+
+
+def pack_image(pack_image_info: PackImage, file_format: ImageFileFormat) -> None:
+    """Read the sources of the packed image and save it.
+
+    :raises AddonException: If a source isn't baked or the sizes differ
+    """
+    pixels_by_path: dict[str, npt.NDArray[np.float32]] = {}
+    sources: dict[PackChannel, npt.NDArray[np.float32]] = {}
+    for channel, source_path in pack_image_info.source_paths.items():
+        if source_path not in pixels_by_path:
+            pixels_by_path[source_path] = read_image_file(source_path)
+        sources[channel] = pixels_by_path[source_path]
+
+    pixels = pack_pixels(pack_image_info.channels, sources)
+    options = get_default_output_options(file_format, is_float=pack_image_info.is_float)
+    _save_packed(pixels, pack_image_info.image_path, options)
+
+    # NOTE: Update the packed image if it's open in Blender
+    for img in bpy.data.images:
+        if img.filepath == pack_image_info.image_path:
+            img.reload()  # type: ignore[no-untyped-call]
+
+
+def pack_texture_set_channels(
+    *, context: blt.Context, texture_set: TextureSetProps
+) -> list[str]:
+    """Pack channels of the saved textures into enabled packs of the Texture Set.
+
+    :return: Paths of the packed images
+    :raises AddonException: If a pack can't be assembled from the saved textures
+    """
+    time_start = time.perf_counter()
+
+    image_paths: list[str] = []
+    for pack in texture_set.packs:
+        if not pack.is_enabled:
+            continue
+        for pack_image_info in plan_pack_images(
+            context=context, texture_set=texture_set, pack=pack
+        ):
+            pack_image(pack_image_info, ImageFileFormat[pack.file_format])
+            image_paths.append(pack_image_info.image_path)
+
+    log(
+        f"Packed {len(image_paths)} images of {texture_set.display_name!r}"
+        f" in {time.perf_counter() - time_start:.2f}s"
+    )
+    return image_paths
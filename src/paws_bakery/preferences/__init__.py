@@ -11,6 +11,7 @@ from bpy import types as blt
 from .._helpers import log_warn
 from ..enums import BlenderOperatorReturnType as BORT
 from ..enums import BlenderOperatorType as BOT
+from ..props_enums import RenderDevice
 from ..utils import Registry
 from .defaults import DefaultTextureImportRule
 from .props import TextureImportRuleProps
@@ -163,6 +164,61 @@ class AddonPreferences(blt.AddonPreferences):
         options=set() if bpy.app.version < (4, 5) else {"PATH_SUPPORTS_BLEND_RELATIVE"},
     )
 
+    cache_directory: blp.StringProperty(  # type: ignore[valid-type]
+        name="Cache Directory",
+        description=(
+            "Directory to store baked images for reuse in any .blend file,"
+            " can be on a shared drive. Leave empty to disable the cache"
+        ),
+        default="",
+        subtype="DIR_PATH",
+    )
+
+    cache_size_limit: blp.FloatProperty(  # type: ignore[valid-type]
+        name="Cache Size Limit",
+        description=(
+            "Maximum size of the cache in GB. Least recently used images are"
+            " removed when exceeded. 0 for unlimited"
+        ),
+        default=10.0,
+        min=0.0,
+        soft_max=1000.0,
+    )
+
+    memory_budget: blp.FloatProperty(  # type: ignore[valid-type]
+        name="Memory Budget",
+        description=(
+            "Maximum memory in GB a single bake may use. Textures exceeding it are"
+            " baked in tiles, bakes that don't fit even then fail before baking"
+            " starts. 0 for unlimited"
+        ),
+        default=0.0,
+        min=0.0,
+        soft_max=256.0,
+    )
+
+    render_device: RenderDevice.get_blender_enum_property()  # type: ignore[valid-type]
+
+    render_threads: blp.IntProperty(  # type: ignore[valid-type]
+        name="Render Threads",
+        description=(
+            "Number of CPU threads used for baking, 0 to detect. Overridden by"
+            " --threads of the command line"
+        ),
+        default=0,
+        min=0,
+        max=1024,
+    )
+
+    render_tile_size: blp.IntProperty(  # type: ignore[valid-type]
+        name="Tile Size",
+        description="Cycles tile size of CPU bakes in pixels, 0 for Blender's default",
+        subtype="PIXEL",
+        default=0,
+        min=0,
+        max=16384,
+    )
+
     enable_debug_tools: blp.BoolProperty(  # type: ignore[valid-type]
         name="Enable Debug Tools",
         description=(
@@ -219,6 +275,22 @@ class AddonPreferences(blt.AddonPreferences):
 
     def _draw_general(self, lyt: blt.UILayout) -> None:
         lyt.prop(self, "output_directory")
+
+        col = lyt.column(align=True)
+        col.prop(self, "cache_directory")
+        row = col.row()
+        row.active = bool(self.cache_directory)
+        row.prop(self, "cache_size_limit")
+
+        lyt.prop(self, "memory_budget")
+
+        col = lyt.column(align=True)
+        col.prop(self, "render_device")
+        row = col.row(align=True)
+        row.active = RenderDevice[self.render_device] is not RenderDevice.GPU
+        row.prop(self, "render_threads")
+        row.prop(self, "render_tile_size")
+
         lyt.prop(self, "enable_debug_tools")
 
     def _draw_texture_import(self, lyt: blt.UILayout) -> None:
@@ -10,7 +10,22 @@ from bpy import props as blp
 from bpy import types as blt
 
 from .common import sort_mesh_names
-from .props_enums import BakeMode, BakeState, BakeTextureType
+from .props_enums import (
+    BakeMode,
+    BakeOrder,
+    BakePrecision,
+    BakeState,
+    BakeTextureType,
+    DownscaleFilter,
+    ExrCodec,
+    ImageFileFormat,
+    MarginType,
+    NormalEngine,
+    OutputProfile,
+    PackChannel,
+    PackLayout,
+    RenderProfile,
+)
 from .utils import Registry, naturalize_key
 
 SIMPLE_BAKE_SETTINGS_ID = "pawsbkr_simple"
@@ -42,6 +57,18 @@ class _UUIDNamePropertyGroup(blt.PropertyGroup):
         return cast(str, self.name)
 
 
+_SIZE_ITEMS = (
+    ("64", "64", ""),
+    ("128", "128", ""),
+    ("256", "256", ""),
+    ("512", "512", ""),
+    ("1024", "1024", ""),
+    ("2048", "2048", ""),
+    ("4096", "4096", ""),
+    ("8192", "8192", ""),
+)
+
+
 @Registry.add
 class BakeSettings(blt.PropertyGroup):
     """Bake settings."""
@@ -61,18 +88,18 @@ class BakeSettings(blt.PropertyGroup):
     size: blp.EnumProperty(  # type: ignore[valid-type]
         name="Size",
         description="Texture size",
-        items=(
-            ("64", "64", ""),
-            ("128", "128", ""),
-            ("256", "256", ""),
-            ("512", "512", ""),
-            ("1024", "1024", ""),
-            ("2048", "2048", ""),
-            ("4096", "4096", ""),
-            ("8192", "8192", ""),
-        ),
+        items=_SIZE_ITEMS,
         default="512",
     )
+    extra_sizes: blp.EnumProperty(  # type: ignore[valid-type]
+        name="Extra Sizes",
+        description=(
+            "Also save the texture downscaled to these sizes, e.g. for LODs."
+            " Name Template must contain {size}"
+        ),
+        items=_SIZE_ITEMS,
+        options={"ENUM_FLAG"},
+    )
     sampling: blp.EnumProperty(  # type: ignore[valid-type]
         name="AA",
         description="Anti Aliasing",
@@ -84,9 +111,37 @@ class BakeSettings(blt.PropertyGroup):
         ),
         default="1",
     )
+    downscale_filter: DownscaleFilter.get_blender_enum_property()  # type: ignore[valid-type]
+    precision: BakePrecision.get_blender_enum_property()  # type: ignore[valid-type]
+    file_format: ImageFileFormat.get_blender_enum_property()  # type: ignore[valid-type]
+    output_profile: OutputProfile.get_blender_enum_property()  # type: ignore[valid-type]
+    compression: blp.IntProperty(  # type: ignore[valid-type]
+        name="Compression",
+        description=(
+            "Compression of PNG and TIFF files. Higher is smaller and slower to"
+            " save, 0 saves uncompressed files"
+        ),
+        subtype="PERCENTAGE",
+        default=15,
+        min=0,
+        max=100,
+    )
+    exr_codec: ExrCodec.get_blender_enum_property()  # type: ignore[valid-type]
+    tiles: blp.IntProperty(  # type: ignore[valid-type]
+        name="Tiles",
+        description=(
+            "Bake the texture in N x N tiles to limit memory use with high AA."
+            "\nOnly for textures baked in one pass. 1 to bake the texture at once"
+        ),
+        default=1,
+        min=1,
+        soft_max=16,
+        max=64,
+    )
+    render_profile: RenderProfile.get_blender_enum_property()  # type: ignore[valid-type]
     samples: blp.IntProperty(  # type: ignore[valid-type]
         name="Samples",
-        description="Number of samples. Global value if 0",
+        description="Number of samples. Value of the current scene if 0",
         default=24,
         min=0,
     )
@@ -100,14 +155,15 @@ class BakeSettings(blt.PropertyGroup):
         description="Margin",
         default=4,
     )
-    margin_type: blp.EnumProperty(  # type: ignore[valid-type]
-        name="MarginType",
-        description="Margin Type",
-        items=(
-            ("EXTEND", "EXTEND", ""),
-            ("ADJACENT_FACES", "ADJACENT_FACES", ""),
+    margin_type: MarginType.get_blender_enum_property()  # type: ignore[valid-type]
+    use_rasterize: blp.BoolProperty(  # type: ignore[valid-type]
+        name="Rasterize",
+        description=(
+            "Draw Material ID, Position and emit textures of constant material"
+            " values from the mesh UVs without Cycles, many times faster."
+            "\nPixels may differ from Cycles' by 1 step of 8 bit color"
         ),
-        default="EXTEND",
+        default=False,
     )
 
     # MATID
@@ -142,17 +198,75 @@ class BakeSettings(blt.PropertyGroup):
         soft_max=100,
         soft_min=0,
     )
+    normal_engine: NormalEngine.get_blender_enum_property()  # type: ignore[valid-type]
+
+    # DERIVED
+    derived_radius: blp.IntProperty(  # type: ignore[valid-type]
+        name="Radius",
+        description=(
+            "Distance in pixels between the compared normals. Larger radius"
+            " picks wider features"
+        ),
+        default=2,
+        min=1,
+        soft_max=16,
+        max=64,
+    )
+    derived_strength: blp.FloatProperty(  # type: ignore[valid-type]
+        name="Strength",
+        description="Multiplier of the curvature",
+        default=1.0,
+        min=0.0,
+        soft_max=4.0,
+    )
+
+    @property
+    def is_float(self) -> bool:
+        """Whether the image is baked to a float buffer, see `precision`."""
+        # NOTE: EXR files are float, 8 bit images would lose precision for nothing
+        if ImageFileFormat[self.file_format] is ImageFileFormat.OPEN_EXR:
+            return True
+
+        precision = BakePrecision[self.precision]
+        if precision is BakePrecision.AUTO:
+            return BakeTextureType[self.type].is_float
+        return precision is not BakePrecision.BIT_8
+
+    @property
+    def use_dilation(self) -> bool:
+        """Whether margin is dilated after baking instead of baked by Cycles."""
+        return MarginType[self.margin_type].cycles_type is None or self.use_bvh_normals
+
+    @property
+    def use_bvh_normals(self) -> bool:
+        """Whether high to low normals are baked by casting rays without Cycles."""
+        return (
+            bool(self.use_selected_to_active)
+            and BakeTextureType[self.type] is BakeTextureType.NORMAL
+            and NormalEngine[self.normal_engine] is NormalEngine.BVH
+        )
 
     @property
     def bake_high_to_low(self) -> bool:
         """Whether baking should run from high to low matched by name."""
         return cast(bool, self.use_selected_to_active)
 
-    def get_name(self, set_name: str = "") -> str:
-        """Return compiled name."""
+    def get_extra_sizes(self) -> list[int]:
+        """Return extra sizes smaller than the texture size, largest first."""
+        size = int(self.size)
+        return sorted(
+            (int(extra) for extra in self.extra_sizes if int(extra) < size),
+            reverse=True,
+        )
+
+    def get_name(self, set_name: str = "", size: str = "") -> str:
+        """Return compiled name.
+
+        :param size: Size of the image if not the texture size
+        """
         placeholders: Mapping[str, str] = {
             "set_name": set_name,
-            "size": self.size,
+            "size": size or self.size,
             "type_short": BakeTextureType[self.type].short_name,
             "type_full": BakeTextureType[self.type].name.lower(),
         }
@@ -262,6 +376,44 @@ class TextureProps(_UUIDNamePropertyGroup):
     )
 
 
+@Registry.add
+class ChannelPackProps(blt.PropertyGroup):
+    """Channel pack properties."""
+
+    is_enabled: blp.BoolProperty(  # type: ignore[valid-type]
+        name="Pack Enabled", default=True
+    )
+    suffix: blp.StringProperty(  # type: ignore[valid-type]
+        name="Suffix",
+        description="Added to the Texture Set name in the packed image name",
+        default="orm",
+    )
+    layout: PackLayout.get_blender_enum_property()  # type: ignore[valid-type]
+    channel_r: PackChannel.get_blender_enum_property()  # type: ignore[valid-type]
+    channel_g: PackChannel.get_blender_enum_property()  # type: ignore[valid-type]
+    channel_b: PackChannel.get_blender_enum_property()  # type: ignore[valid-type]
+    channel_a: PackChannel.get_blender_enum_property()  # type: ignore[valid-type]
+    file_format: ImageFileFormat.get_blender_enum_property()  # type: ignore[valid-type]
+
+    def get_channels(self) -> list[PackChannel]:
+        """Return values of RGB or RGBA channels of the packed image."""
+        layout = PackLayout[self.layout]
+        if layout is not PackLayout.CUSTOM:
+            return [PackChannel[name] for name in layout.channels]
+
+        channels = [
+            PackChannel[name]
+            for name in (self.channel_r, self.channel_g, self.channel_b)
+        ]
+        if PackChannel[self.channel_a] is not PackChannel.NONE:
+            channels.append(PackChannel[self.channel_a])
+        return channels
+
+    def get_name(self, set_name: str) -> str:
+        """Return name of the packed image without extension."""
+        return f"{set_name}_{self.suffix}"
+
+
 @Registry.add
 class TextureSetProps(_UUIDNamePropertyGroup):
     """Texture set properties."""
@@ -312,6 +464,34 @@ class TextureSetProps(_UUIDNamePropertyGroup):
 
     mode: BakeMode.get_blender_enum_property()  # type: ignore[valid-type]
 
+    use_single_pass: blp.BoolProperty(  # type: ignore[valid-type]
+        name="Single Pass",
+        description=(
+            "Bake all objects of the atlas with a single bake call."
+            "\nDisable to bake objects one by one, e.g. to reduce memory usage"
+        ),
+        default=True,
+    )
+
+    order: BakeOrder.get_blender_enum_property()  # type: ignore[valid-type]
+
+    skip_unchanged: blp.BoolProperty(  # type: ignore[valid-type]
+        name="Skip Unchanged",
+        description=(
+            "Don't bake images whose objects, materials and bake settings didn't"
+            " change since the last bake and whose files exist"
+        ),
+        default=False,
+    )
+
+    pack_channels: blp.BoolProperty(  # type: ignore[valid-type]
+        name="Pack Channels",
+        description="Pack channels of the baked textures after baking",
+        default=False,
+    )
+    packs: blp.CollectionProperty(type=ChannelPackProps)  # type: ignore[valid-type]
+    packs_active_index: blp.IntProperty()  # type: ignore[valid-type]
+
     @property
     def active_mesh(self) -> MeshProps | None:
         """Get active mesh."""
@@ -328,6 +508,14 @@ class TextureSetProps(_UUIDNamePropertyGroup):
         except IndexError:
             return None
 
+    @property
+    def active_pack(self) -> ChannelPackProps | None:
+        """Get active channel pack."""
+        try:
+            return cast(ChannelPackProps, self.packs[self.packs_active_index])
+        except IndexError:
+            return None
+
     def get_enabled_meshes(self) -> list[MeshProps]:
         """Get enabled meshes."""
         return [x for x in self.meshes if x.is_enabled]
@@ -30,7 +30,7 @@ class BlenderPropertyEnum(Enum):
     __bl_prop_description__: str = ""
 
     value: EnumItemInfo
-    DEFAULT: EnumItemInfo
+    DEFAULT: Self
 
     def __init_subclass__(cls) -> None:
         """Validate fields after initialization."""
@@ -65,6 +65,11 @@ class BakeTextureTypeInfo(EnumItemInfo):
     is_float: bool = False
     is_native: bool
     """Uses native Blender's bake type without additional setup."""
+    is_deterministic: bool = False
+    """Result doesn't depend on samples or light paths, e.g. a material value."""
+    derived_from: tuple[str, ...] = ()
+    """Names of the baked texture types the texture is computed from, without
+    Cycles."""
 
 
 class BakeTextureType(BlenderPropertyEnum):
@@ -80,12 +85,14 @@ class BakeTextureType(BlenderPropertyEnum):
         description="Bake current material output in emit mode",
         short_name="emit",
         is_native=True,
+        is_deterministic=True,
     )
     EMIT_COLOR = BakeTextureTypeInfo(
         ui_name="Color(Emit)",
         description="Bake color value as emit output",
         short_name="color",
         is_native=False,
+        is_deterministic=True,
     )
     EMIT_ROUGHNESS = BakeTextureTypeInfo(
         ui_name="Roughness(Emit)",
@@ -93,6 +100,7 @@ class BakeTextureType(BlenderPropertyEnum):
         short_name="roughness",
         colorspace=Colorspace.NON_COLOR,
         is_native=False,
+        is_deterministic=True,
     )
     EMIT_METALNESS = BakeTextureTypeInfo(
         ui_name="Metalness(Emit)",
@@ -100,6 +108,7 @@ class BakeTextureType(BlenderPropertyEnum):
         short_name="metalness",
         colorspace=Colorspace.NON_COLOR,
         is_native=False,
+        is_deterministic=True,
     )
     EMIT_OPACITY = BakeTextureTypeInfo(
         ui_name="Opacity(Emit)",
@@ -107,6 +116,7 @@ class BakeTextureType(BlenderPropertyEnum):
         short_name="opacity",
         colorspace=Colorspace.NON_COLOR,
         is_native=False,
+        is_deterministic=True,
     )
     DIFFUSE = BakeTextureTypeInfo(
         ui_name="Diffuse",
@@ -122,6 +132,7 @@ class BakeTextureType(BlenderPropertyEnum):
         cycles_type=CyclesBakeType.ROUGHNESS,
         colorspace=Colorspace.NON_COLOR,
         is_native=True,
+        is_deterministic=True,
     )
     NORMAL = BakeTextureTypeInfo(
         ui_name="Normal",
@@ -131,12 +142,14 @@ class BakeTextureType(BlenderPropertyEnum):
         colorspace=Colorspace.NON_COLOR,
         is_float=True,
         is_native=True,
+        is_deterministic=True,
     )
     MATERIAL_ID = BakeTextureTypeInfo(
         ui_name="Material ID",
         description="Bake Material ID map",
         short_name="matid",
         is_native=False,
+        is_deterministic=True,
     )
     AO = BakeTextureTypeInfo(
         ui_name="AO",
@@ -157,12 +170,14 @@ class BakeTextureType(BlenderPropertyEnum):
         description="Bake color grid map",
         short_name="grid_color",
         is_native=False,
+        is_deterministic=True,
     )
     UTILS_GRID_UV = BakeTextureTypeInfo(
         ui_name="Utils: Grid UV",
         description="Bake UV grid map",
         short_name="grid_uv",
         is_native=False,
+        is_deterministic=True,
     )
     COMBINED = BakeTextureTypeInfo(
         ui_name="Combined",
@@ -187,6 +202,7 @@ class BakeTextureType(BlenderPropertyEnum):
         colorspace=Colorspace.NON_COLOR,
         is_float=True,
         is_native=True,
+        is_deterministic=True,
     )
     UV = BakeTextureTypeInfo(
         ui_name="UV",
@@ -195,6 +211,43 @@ class BakeTextureType(BlenderPropertyEnum):
         cycles_type=CyclesBakeType.UV,
         colorspace=Colorspace.NON_COLOR,
         is_native=True,
+        is_deterministic=True,
+    )
+    CURVATURE = BakeTextureTypeInfo(
+        ui_name="Curvature (Derived)",
+        description=(
+            "Compute curvature of the baked Normal texture, convex is bright and"
+            " concave is dark. Needs Normal and Position textures"
+        ),
+        short_name="curvature",
+        colorspace=Colorspace.NON_COLOR,
+        is_native=False,
+        is_deterministic=True,
+        derived_from=("NORMAL", "POSITION"),
+    )
+    CAVITY = BakeTextureTypeInfo(
+        ui_name="Cavity (Derived)",
+        description=(
+            "Compute mask of concave features of the baked Normal texture. Needs"
+            " Normal and Position textures"
+        ),
+        short_name="cavity",
+        colorspace=Colorspace.NON_COLOR,
+        is_native=False,
+        is_deterministic=True,
+        derived_from=("NORMAL", "POSITION"),
+    )
+    EDGE = BakeTextureTypeInfo(
+        ui_name="Edge (Derived)",
+        description=(
+            "Compute mask of convex features of the baked Normal texture, e.g. for"
+            " edge wear. Needs Normal and Position textures"
+        ),
+        short_name="edge",
+        colorspace=Colorspace.NON_COLOR,
+        is_native=False,
+        is_deterministic=True,
+        derived_from=("NORMAL", "POSITION"),
     )
     ENVIRONMENT = BakeTextureTypeInfo(
         ui_name="Environment",
@@ -227,6 +280,17 @@ class BakeTextureType(BlenderPropertyEnum):
         self.colorspace = info.colorspace
         self.is_float = info.is_float
         self.is_native = info.is_native
+        self.is_deterministic = info.is_deterministic
+        self.derived_from = info.derived_from
+
+    @property
+    def is_derived(self) -> bool:
+        """Whether the texture is computed from other baked textures."""
+        return bool(self.derived_from)
+
+    def get_source_types(self) -> list[Self]:
+        """Return types of the textures the texture is derived from."""
+        return [type(self)[name] for name in self.derived_from]
 
     @classmethod
     def get_native_list(cls) -> list[Self]:
@@ -257,6 +321,11 @@ class BakeMode(BlenderPropertyEnum):
         description="Bake the materials using a separate texture for each object",
     )
 
+    UDIM = EnumItemInfo(
+        ui_name="UDIM Tiles (Experimental)",
+        description="Bake each object into its own tile of a single UDIM texture",
+    )
+
     DEFAULT = SINGLE  # type: ignore[misc]
 
     # PER_MATERIAL = EnumItemInfo(
@@ -267,6 +336,443 @@ class BakeMode(BlenderPropertyEnum):
     # )
 
 
+class BakeOrder(BlenderPropertyEnum):
+    """Order of bake jobs."""
+
+    __bl_prop_name__ = "Job Order"
+    __bl_prop_description__ = "Order of bake jobs"
+
+    value: EnumItemInfo
+
+    TEXTURE = EnumItemInfo(
+        ui_name="By Texture",
+        description="Bake a texture for all objects before moving to the next texture",
+    )
+
+    OBJECT = EnumItemInfo(
+        ui_name="By Object",
+        description=(
+            "Bake all textures of an object before moving to the next object."
+            "\nReuses render data of heavy meshes between textures"
+        ),
+    )
+
+    DEFAULT = TEXTURE  # type: ignore[misc]
+
+
+class DownscaleFilter(BlenderPropertyEnum):
+    """Filter used to downscale supersampled images."""
+
+    __bl_prop_name__ = "AA Filter"
+    __bl_prop_description__ = "Filter used to downscale the image baked with AA"
+
+    value: EnumItemInfo
+
+    BLENDER = EnumItemInfo(
+        ui_name="Blender",
+        description="Scale the image with Blender's image scaling",
+    )
+    BOX = EnumItemInfo(
+        ui_name="Box",
+        description="Average of the samples. Fast, slightly soft",
+    )
+    MITCHELL = EnumItemInfo(
+        ui_name="Mitchell",
+        description="Balance between sharpness and ringing",
+    )
+    LANCZOS = EnumItemInfo(
+        ui_name="Lanczos",
+        description="Sharpest result, may produce ringing at hard edges",
+    )
+
+    DEFAULT = BOX  # type: ignore[misc]
+
+
+@dataclass(kw_only=True, frozen=True)
+class MarginTypeInfo(EnumItemInfo):
+    """Margin type additional info."""
+
+    cycles_type: str | None
+    """Margin type of Blender's bake, None if the margin is dilated after baking."""
+
+
+class MarginType(BlenderPropertyEnum):
+    """Ways to extend the baked texture beyond UV islands."""
+
+    __bl_prop_name__ = "Margin Type"
+    __bl_prop_description__ = "Algorithm to extend the baked result"
+
+    value: MarginTypeInfo
+
+    EXTEND = MarginTypeInfo(
+        ui_name="Extend",
+        description="Extend border pixels outwards, baked by Blender",
+        cycles_type="EXTEND",
+    )
+    ADJACENT_FACES = MarginTypeInfo(
+        ui_name="Adjacent Faces",
+        description=(
+            "Use pixels from adjacent faces across UV seams, baked by Blender"
+        ),
+        cycles_type="ADJACENT_FACES",
+    )
+    DILATE = MarginTypeInfo(
+        ui_name="Dilate",
+        description=(
+            "Bake without margin and fill it with the nearest baked pixels after"
+            " AA downscale. Faster with high AA"
+        ),
+        cycles_type=None,
+    )
+    DILATE_ALL = MarginTypeInfo(
+        ui_name="Dilate All",
+        description=(
+            "As Dilate, but fill the whole texture regardless of Margin. Keeps"
+            " background out of the texture's mipmaps"
+        ),
+        cycles_type=None,
+    )
+
+    DEFAULT = EXTEND  # type: ignore[misc]
+
+    def __init__(self, info: MarginTypeInfo) -> None:
+        """Initialize cycles type."""
+        self.cycles_type = info.cycles_type
+
+
+class BakePrecision(BlenderPropertyEnum):
+    """Bits per channel of the baked image buffer and file."""
+
+    __bl_prop_name__ = "Precision"
+    __bl_prop_description__ = "Bits per channel of the baked image"
+
+    value: EnumItemInfo
+
+    AUTO = EnumItemInfo(
+        ui_name="Auto",
+        description="16 bit for Normal and Position textures, 8 bit for others",
+    )
+    BIT_8 = EnumItemInfo(
+        ui_name="8 bit",
+        description=(
+            "Bake to a byte image and save 8 bit file. Uses 4 times less memory"
+            " than 16 bit and saves faster. EXR files are always half float"
+        ),
+    )
+    BIT_16 = EnumItemInfo(
+        ui_name="16 bit",
+        description="Bake to a float image and save 16 bit or half float file",
+    )
+    BIT_32 = EnumItemInfo(
+        ui_name="32 bit",
+        description=(
+            "Bake to a float image and save full float EXR file. Other formats"
+            " are saved in 16 bit"
+        ),
+    )
+
+    DEFAULT = AUTO  # type: ignore[misc]
+
+
+@dataclass(kw_only=True, frozen=True)
+class ImageFileFormatInfo(EnumItemInfo):
+    """Image file format additional info."""
+
+    extension: str
+    """File extension with the leading dot."""
+
+
+class ImageFileFormat(BlenderPropertyEnum):
+    """Formats of the baked image files, named as Blender's file formats."""
+
+    __bl_prop_name__ = "File Format"
+    __bl_prop_description__ = "Format of the baked image file"
+
+    value: ImageFileFormatInfo
+
+    PNG = ImageFileFormatInfo(
+        ui_name="PNG",
+        description="8 or 16 bit PNG, lossless",
+        extension=".png",
+    )
+    OPEN_EXR = ImageFileFormatInfo(
+        ui_name="OpenEXR",
+        description="Half or full float EXR, see Precision. Colors are stored linear",
+        extension=".exr",
+    )
+    TIFF = ImageFileFormatInfo(
+        ui_name="TIFF",
+        description="8 or 16 bit TIFF, lossless",
+        extension=".tif",
+    )
+
+    DEFAULT = PNG  # type: ignore[misc]
+
+    def __init__(self, info: ImageFileFormatInfo) -> None:
+        """Initialize extension."""
+        self.extension = info.extension
+
+
+class OutputProfile(BlenderPropertyEnum):
+    """Compression profiles of the baked image files."""
+
+    __bl_prop_name__ = "Output Profile"
+    __bl_prop_description__ = "Compression of the baked image file"
+
+    value: EnumItemInfo
+
+    STANDARD = EnumItemInfo(
+        ui_name="Default",
+        description="Blender's default compression",
+    )
+    FAST = EnumItemInfo(
+        ui_name="Fast Encode",
+        description=(
+            "Save without compression. Several times larger files, but the"
+            " fastest saving, e.g. for iterations"
+        ),
+    )
+    SMALL = EnumItemInfo(
+        ui_name="Small Files",
+        description="Stronger lossless compression, slower saving. For release builds",
+    )
+    CUSTOM = EnumItemInfo(
+        ui_name="Custom",
+        description="Set compression manually",
+    )
+
+    DEFAULT = STANDARD  # type: ignore[misc]
+
+
+class ExrCodec(BlenderPropertyEnum):
+    """Compression codecs of EXR files, named as Blender's codecs."""
+
+    __bl_prop_name__ = "EXR Codec"
+    __bl_prop_description__ = "Compression of EXR files"
+
+    value: EnumItemInfo
+
+    NONE = EnumItemInfo(
+        ui_name="None",
+        description="No compression, fastest saving",
+    )
+    ZIP = EnumItemInfo(
+        ui_name="ZIP",
+        description="Lossless compression",
+    )
+    DWAA = EnumItemInfo(
+        ui_name="DWAA",
+        description="Lossy compression, smallest files. Not for data textures",
+    )
+
+    DEFAULT = ZIP  # type: ignore[misc]
+
+
+class RenderProfile(BlenderPropertyEnum):
+    """Render settings of the bake."""
+
+    __bl_prop_name__ = "Render Profile"
+    __bl_prop_description__ = "Render settings of the bake"
+
+    value: EnumItemInfo
+
+    AUTO = EnumItemInfo(
+        ui_name="Auto",
+        description=(
+            "Faster bakes by texture type. 1 sample without light bounces for"
+            " textures of material values, e.g. Color or Normal. No light"
+            " bounces for AO. Samples and Denoise for others. Pixels may differ"
+            " slightly from Custom"
+        ),
+    )
+    CUSTOM = EnumItemInfo(
+        ui_name="Custom",
+        description="Use Samples and Denoise for any texture type",
+    )
+
+    # NOTE: Keeps baked pixels of existing settings, Auto is opt-in
+    DEFAULT = CUSTOM  # type: ignore[misc]
+
+
+class RenderDevice(BlenderPropertyEnum):
+    """Cycles device used for baking."""
+
+    __bl_prop_name__ = "Render Device"
+    __bl_prop_description__ = "Device used for baking"
+
+    value: EnumItemInfo
+
+    AUTO = EnumItemInfo(
+        ui_name="Auto",
+        description="GPU if Cycles has a GPU device enabled, CPU otherwise",
+    )
+    CPU = EnumItemInfo(
+        ui_name="CPU",
+        description="Bake on CPU with the render threads and tile size below",
+    )
+    GPU = EnumItemInfo(
+        ui_name="GPU",
+        description=(
+            "Bake on GPU devices enabled in Cycles preferences. Falls back to"
+            " CPU if there are none"
+        ),
+    )
+
+    DEFAULT = AUTO  # type: ignore[misc]
+
+
+class NormalEngine(BlenderPropertyEnum):
+    """Engine of high to low normal bakes."""
+
+    __bl_prop_name__ = "Engine"
+    __bl_prop_description__ = "Engine casting rays from low to high poly"
+
+    value: EnumItemInfo
+
+    CYCLES = EnumItemInfo(
+        ui_name="Cycles",
+        description="Bake with Cycles, including normal maps and bump of materials",
+    )
+    BVH = EnumItemInfo(
+        ui_name="BVH",
+        description=(
+            "Cast rays against high poly meshes without Cycles, usually slower."
+            " Reads smooth mesh normals only, ignoring materials. Margin is"
+            " always dilated"
+        ),
+    )
+
+    DEFAULT = CYCLES  # type: ignore[misc]
+
+
+@dataclass(kw_only=True, frozen=True)
+class PackChannelInfo(EnumItemInfo):
+    """Channel pack source additional info."""
+
+    texture_types: tuple[str, ...] = ()
+    """Names of texture types the channel is read from, in order of preference.
+    Constant channel if empty."""
+    invert: bool = False
+    constant: float = 0.0
+
+
+class PackChannel(BlenderPropertyEnum):
+    """Values stored in a channel of a packed image."""
+
+    __bl_prop_name__ = "Channel"
+    __bl_prop_description__ = "Value stored in the channel"
+
+    value: PackChannelInfo
+
+    NONE = PackChannelInfo(
+        ui_name="None",
+        description="Black. Alpha channel is not stored",
+    )
+    WHITE = PackChannelInfo(
+        ui_name="White",
+        description="White",
+        constant=1.0,
+    )
+    AO = PackChannelInfo(
+        ui_name="AO",
+        description="AO texture",
+        texture_types=("AO",),
+    )
+    ROUGHNESS = PackChannelInfo(
+        ui_name="Roughness",
+        description="Roughness texture",
+        texture_types=("EMIT_ROUGHNESS", "ROUGHNESS"),
+    )
+    SMOOTHNESS = PackChannelInfo(
+        ui_name="Smoothness",
+        description="Inverted Roughness texture",
+        texture_types=("EMIT_ROUGHNESS", "ROUGHNESS"),
+        invert=True,
+    )
+    METALNESS = PackChannelInfo(
+        ui_name="Metalness",
+        description="Metalness texture",
+        texture_types=("EMIT_METALNESS",),
+    )
+    OPACITY = PackChannelInfo(
+        ui_name="Opacity",
+        description="Opacity texture",
+        texture_types=("EMIT_OPACITY",),
+    )
+    CURVATURE = PackChannelInfo(
+        ui_name="Curvature",
+        description="Curvature texture",
+        texture_types=("CURVATURE",),
+    )
+    CAVITY = PackChannelInfo(
+        ui_name="Cavity",
+        description="Cavity texture",
+        texture_types=("CAVITY",),
+    )
+    EDGE = PackChannelInfo(
+        ui_name="Edge",
+        description="Edge texture",
+        texture_types=("EDGE",),
+    )
+
+    DEFAULT = NONE  # type: ignore[misc]
+
+    def __init__(self, info: PackChannelInfo) -> None:
+        """Initialize channel info."""
+        self.invert = info.invert
+        self.constant = info.constant
+        self.texture_types = info.texture_types
+
+    def get_texture_types(self) -> list[BakeTextureType]:
+        """Return texture types the channel is read from, in order of preference."""
+        return [BakeTextureType[name] for name in self.texture_types]
+
+
+@dataclass(kw_only=True, frozen=True)
+class PackLayoutInfo(EnumItemInfo):
+    """Channel pack layout additional info."""
+
+    channels: tuple[str, ...] = ()
+    """Names of `PackChannel` of RGB or RGBA channels, custom if empty."""
+
+
+class PackLayout(BlenderPropertyEnum):
+    """Channel layouts of packed images."""
+
+    __bl_prop_name__ = "Layout"
+    __bl_prop_description__ = "Channels of the packed image"
+
+    value: PackLayoutInfo
+
+    ORM = PackLayoutInfo(
+        ui_name="ORM",
+        description=(
+            "AO, Roughness, Metalness, also known as ARM. Unreal Engine, glTF, Godot"
+        ),
+        channels=("AO", "ROUGHNESS", "METALNESS"),
+    )
+    UNITY_MASK = PackLayoutInfo(
+        ui_name="Unity Mask Map",
+        description="Metalness, AO, detail mask, Smoothness. Unity HDRP",
+        channels=("METALNESS", "AO", "NONE", "SMOOTHNESS"),
+    )
+    UNITY_METALLIC = PackLayoutInfo(
+        ui_name="Unity Metallic",
+        description="Metalness and Smoothness in alpha. Unity Standard and URP",
+        channels=("METALNESS", "NONE", "NONE", "SMOOTHNESS"),
+    )
+    CUSTOM = PackLayoutInfo(
+        ui_name="Custom",
+        description="Choose value of each channel",
+    )
+
+    DEFAULT = ORM  # type: ignore[misc]
+
+    def __init__(self, info: PackLayoutInfo) -> None:
+        """Initialize channels."""
+        self.channels = info.channels
+
+
 class BakeState(BlenderPropertyEnum):
     """Bake states."""
 
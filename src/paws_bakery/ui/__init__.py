@@ -8,6 +8,8 @@ from .texture_set import (
     Main,
     Meshes,
     MeshUIList,
+    Packs,
+    PackUIList,
     SetUIList,
     Texture,
     TextureUIList,
@@ -22,6 +24,8 @@ __all__ = [
     "Meshes",
     "MeshUIList",
     "ObjectsColor",
+    "Packs",
+    "PackUIList",
     "Settings",
     "SetUIList",
     "SimpleBake",
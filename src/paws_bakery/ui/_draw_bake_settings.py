@@ -9,21 +9,13 @@ from ..props import (  # type: ignore[attr-defined]
     BakeSettings,
     BakeTextureType,
 )
+from ..props_enums import ImageFileFormat, MarginType, OutputProfile, RenderProfile
 from ._utils import LayoutPanel
 
 
-def draw_bake_settings(
-    layout: blt.UILayout,
-    settings: BakeSettings,
-    texture_set_display_name: str = "",
+def _draw_output_settings(
+    layout: blt.UILayout, settings: BakeSettings, texture_set_display_name: str
 ) -> None:
-    """Draws a bake settings layout."""
-    assert isinstance(settings, BakeSettings)
-    is_simple_mode = texture_set_display_name == SIMPLE_BAKE_SETTINGS_ID
-
-    row = layout.row()
-    row.label(text="SETTINGS", icon="TOOL_SETTINGS")
-
     row = layout.row()
     row.prop(settings, "name_template")
     row = layout.row()
@@ -37,18 +29,54 @@ def draw_bake_settings(
     row = layout.row()
     row.prop(settings, "size")
     row.prop(settings, "sampling")
+    if int(settings.sampling) > 1:
+        row.prop(settings, "downscale_filter", text="")
+    row = layout.row(align=True)
+    row.alert = bool(settings.extra_sizes) and "{size}" not in settings.name_template
+    row = row.split(factor=0.25, align=True)
+    row.label(text="Extra Sizes:")
+    row.row(align=True).prop(settings, "extra_sizes")
+    row = layout.row()
+    row.prop(settings, "tiles")
+    row.prop(settings, "precision")
+    row = layout.row()
+    row.prop(settings, "file_format")
+    row.prop(settings, "output_profile", text="")
+    if OutputProfile[settings.output_profile] is OutputProfile.CUSTOM:
+        row = layout.row()
+        if ImageFileFormat[settings.file_format] is ImageFileFormat.OPEN_EXR:
+            row.prop(settings, "exr_codec")
+        else:
+            row.prop(settings, "compression")
+
+
+def _draw_render_settings(layout: blt.UILayout, settings: BakeSettings) -> None:
+    row = layout.row()
+    row.prop(settings, "render_profile")
     row = layout.row()
+    row.active = (
+        RenderProfile[settings.render_profile] is RenderProfile.CUSTOM
+        or not BakeTextureType[settings.type].is_deterministic
+    )
     row.prop(settings, "samples")
     row.prop(settings, "use_denoising")
 
     row = layout.row()
-    row.prop(settings, "margin")
+    margin_row = row.row()
+    margin_row.active = MarginType[settings.margin_type] is not MarginType.DILATE_ALL
+    margin_row.prop(settings, "margin")
     row.prop(settings, "margin_type")
+    row = layout.row()
+    row.prop(settings, "use_rasterize")
 
     if BakeTextureType[settings.type] == BakeTextureType.MATERIAL_ID:
         row = layout.row()
         row.prop(settings, "matid_use_object_color")
 
+
+def _draw_selected_to_active(
+    layout: blt.UILayout, settings: BakeSettings, *, is_simple_mode: bool
+) -> None:
     header, panel = cast(
         LayoutPanel,
         layout.panel("use_selected_to_active", default_closed=True),
@@ -58,8 +86,36 @@ def draw_bake_settings(
     if panel:
         panel.active = settings.use_selected_to_active
 
+        if BakeTextureType[settings.type] is BakeTextureType.NORMAL:
+            row = panel.row()
+            row.prop(settings, "normal_engine")
         row = panel.row()
         row.prop(settings, "use_cage")
         row = panel.row()
         row.prop(settings, "cage_extrusion")
         row.prop(settings, "max_ray_distance")
+
+
+def draw_bake_settings(
+    layout: blt.UILayout,
+    settings: BakeSettings,
+    texture_set_display_name: str = "",
+) -> None:
+    """Draws a bake settings layout."""
+    assert isinstance(settings, BakeSettings)
+    is_simple_mode = texture_set_display_name == SIMPLE_BAKE_SETTINGS_ID
+
+    row = layout.row()
+    row.label(text="SETTINGS", icon="TOOL_SETTINGS")
+
+    _draw_output_settings(layout, settings, texture_set_display_name)
+
+    # NOTE: Derived textures are computed from baked ones, without rendering
+    if BakeTextureType[settings.type].is_derived:
+        row = layout.row()
+        row.prop(settings, "derived_radius")
+        row.prop(settings, "derived_strength")
+        return
+
+    _draw_render_settings(layout, settings)
+    _draw_selected_to_active(layout, settings, is_simple_mode=is_simple_mode)
@@ -2,12 +2,15 @@
 
 from .main import Main, SetUIList
 from .mesh import Meshes, MeshUIList
+from .pack import Packs, PackUIList
 from .texture import Texture, TextureUIList
 
 __all__ = [
     "Main",
     "Meshes",
     "MeshUIList",
+    "Packs",
+    "PackUIList",
     "SetUIList",
     "Texture",
     "TextureUIList",
@@ -12,6 +12,7 @@ from ...operators.texture_set_bake import TextureSetBake
 from ...operators.texture_set_material_create import TextureSetMaterialCreate
 from ...preferences import get_preferences
 from ...props import TextureSetProps, get_props
+from ...props_enums import BakeMode
 from ...utils import Registry
 from .._utils import LayoutPanel, SidePanelMixin, register_and_duplicate_to_node_editor
 
@@ -129,6 +130,10 @@ class Main(SidePanelMixin):
 
             col = layout.column(align=True)
             col.prop(active_set, "mode")
+            if BakeMode[active_set.mode] is BakeMode.SINGLE:
+                col.prop(active_set, "use_single_pass")
+            col.prop(active_set, "order")
+            col.prop(active_set, "skip_unchanged")
 
             self._draw_material_creation(context, active_set)
 
@@ -0,0 +1,108 @@
+"""UI Panel - Texture Set Channel Packs."""
+
+from typing import Any, cast
+
+import bpy
+from bpy import types as blt
+
+from ...enums import BlenderJobType
+from ...operators import TextureSetPack, TextureSetPackAdd, TextureSetPackRemove
+from ...props import ChannelPackProps, get_props
+from ...props_enums import PackLayout
+from ...utils import Registry
+from .._utils import SidePanelMixin, register_and_duplicate_to_node_editor
+from .main import Main
+
+
+@Registry.add
+class PackUIList(blt.UIList):
+    """UI List - Texture Set channel packs."""
+
+    bl_idname = "PAWSBKR_UL_texture_set_packs"
+
+    def draw_item(  # noqa: D102
+        self,
+        context: blt.Context | None,
+        layout: blt.UILayout,
+        _data: Any | None,
+        item: ChannelPackProps | None,
+        _icon: int | None,
+        _active_data: Any,
+        _active_property: str | None,
+        _index: Any | None = 0,
+        _flt_flag: Any | None = 0,
+    ) -> None:
+        assert context
+        assert item
+        texture_set = get_props(context).active_texture_set
+        assert texture_set
+
+        row = layout.row(align=True)
+        row.prop(item, "is_enabled", text="")
+
+        row = row.split(factor=0.6, align=True)
+        row.label(text=item.get_name(texture_set.display_name))
+        row.label(text=" ".join(channel.name for channel in item.get_channels()))
+
+
+@register_and_duplicate_to_node_editor
+class Packs(SidePanelMixin):
+    """UI Panel - TextureSet - Channel Packs."""
+
+    bl_parent_id = Main.bl_idname
+    bl_idname = "PAWSBKR_PT_main_texture_set_packs"
+    bl_label = "Channel Packs"
+    bl_order = 1
+
+    @classmethod
+    def poll(cls, context: blt.Context) -> bool:  # noqa: D102
+        pawsbkr = get_props(context)
+        texture_set = pawsbkr.active_texture_set
+        return texture_set is not None
+
+    def draw_header(self, context: blt.Context) -> None:  # noqa: D102
+        texture_set = get_props(context).active_texture_set
+        assert texture_set
+        self.layout.prop(texture_set, "pack_channels", text="")
+
+    def draw(self, context: blt.Context) -> None:  # noqa: D102
+        texture_set = get_props(context).active_texture_set
+        assert texture_set
+        pack = texture_set.active_pack
+
+        lyt = self.layout
+        lyt.enabled = not bpy.app.is_job_running(BlenderJobType.OBJECT_BAKE)
+
+        if pack is not None:
+            col = lyt.column(align=True)
+            col.prop(pack, "suffix")
+            col.prop(pack, "layout")
+            if PackLayout[pack.layout] is PackLayout.CUSTOM:
+                col.prop(pack, "channel_r", text="R")
+                col.prop(pack, "channel_g", text="G")
+                col.prop(pack, "channel_b", text="B")
+                col.prop(pack, "channel_a", text="A")
+            col.prop(pack, "file_format")
+
+        row = lyt.row()
+        row.template_list(
+            PackUIList.bl_idname,
+            "pawsbkr_texture_set_packs",
+            texture_set,
+            "packs",
+            texture_set,
+            "packs_active_index",
+            rows=2,
+        )
+        col = row.column(align=True)
+        col.operator(TextureSetPackAdd.bl_idname, icon="ADD", text="")
+        col.operator(TextureSetPackRemove.bl_idname, icon="REMOVE", text="")
+
+        if not texture_set.packs:
+            return
+
+        props = cast(
+            TextureSetPack,
+            lyt.operator(TextureSetPack.bl_idname, icon="IMAGE_RGB_ALPHA"),
+        )
+        props.texture_set_id = texture_set.prop_id
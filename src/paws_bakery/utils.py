@@ -64,11 +64,27 @@ class Registry:
 
 
 class TimerManager:
-    """Manager of Blender timers."""
+    """Manager of Blender timers.
+
+    Timer interval can be changed while the timer is in use, e.g. to poll faster
+    while bake jobs are short, or to wake up modal operators right away.
+    """
+
+    DEFAULT_INTERVAL = 1.0
+    MIN_INTERVAL = 0.01
 
     __timer = None
+    __window = None
+    __interval = DEFAULT_INTERVAL
     __ref_count = 0
 
+    @classmethod
+    def __add_timer(cls) -> blt.Timer:
+        wm = bpy.context.window_manager
+        timer = wm.event_timer_add(cls.__interval, window=cls.__window)
+        cls.__timer = timer
+        return timer
+
     @classmethod
     def __remove_timer(cls) -> None:
         if cls.__timer is None:
@@ -82,12 +98,13 @@ class TimerManager:
         """Create the timer if it doesn't exist."""
         cls.__ref_count += 1
 
-        if cls.__timer is None:
-            # log(f"{cls.__name__}: Creating timer")
-            wm = bpy.context.window_manager
-            cls.__timer = wm.event_timer_add(1.0, window=bpy.context.window)
+        if cls.__timer is not None:
+            return cls.__timer
 
-        return cls.__timer
+        # log(f"{cls.__name__}: Creating timer")
+        cls.__window = bpy.context.window
+        cls.__interval = cls.DEFAULT_INTERVAL
+        return cls.__add_timer()
 
     @classmethod
     def release(cls) -> None:
@@ -98,6 +115,22 @@ class TimerManager:
         if cls.__ref_count == 0:
             cls.__remove_timer()
 
+    @classmethod
+    def set_interval(cls, interval: float) -> None:
+        """Change interval of the running timer."""
+        interval = min(max(interval, cls.MIN_INTERVAL), cls.DEFAULT_INTERVAL)
+        if cls.__timer is None or interval == cls.__interval:
+            return
+
+        cls.__interval = interval
+        cls.__remove_timer()
+        cls.__add_timer()
+
+    @classmethod
+    def wake_up(cls) -> None:
+        """Make the timer fire as soon as possible, e.g. when a job is done."""
+        cls.set_interval(cls.MIN_INTERVAL)
+
 
 class AssetLibraryManager:
     """Manager of Blender timers."""
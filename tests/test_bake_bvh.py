@@ -0,0 +1,63 @@
+# pylint: disable=missing-module-docstring,protected-access
+import numpy as np
+import pytest
+
+from paws_bakery.operators import bake_bvh
+
+
+def _high_poly() -> bake_bvh._HighPoly:
+    positions = np.array([[(-1, -1, 0), (3, -1, 0), (-1, 3, 0)]], dtype=np.float64)
+    normals = np.array([[(1, 0, 1), (0, 0, 1), (0, 0, 1)]], dtype=np.float64)
+    return bake_bvh._HighPoly(
+        tree=bake_bvh.BVHTree.FromPolygons(positions[0].tolist(), [(0, 1, 2)]),
+        positions=positions,
+        normals=bake_bvh._normalize(normals),
+    )
+
+
+def _low_poly(sign: float = 1.0) -> bake_bvh._LowPoly:
+    return bake_bvh._LowPoly(
+        uvs=np.zeros((1, 3, 2)),
+        corners=np.array([(0, 1, 2)]),
+        positions=np.zeros((3, 3)),
+        normals=np.tile((0.0, 0.0, 1.0), (3, 1)),
+        tangents=np.tile((1.0, 0.0, 0.0), (3, 1)),
+        bitangent_signs=np.full(3, sign),
+        matrix=np.identity(4),
+    )
+
+
+def test_cast_rays_hits_and_misses() -> None:
+    high = _high_poly()
+    origins = np.array([(0, 0, 1), (0, 0, 1), (5, 5, 1), (0, 0, -1)], dtype=np.float64)
+    directions = np.array([(0, 0, -1), (0, 0, -1), (0, 0, -1), (0, 0, -1)])
+
+    tris, distances = bake_bvh._cast_rays(high, origins, directions, 2.0)
+    assert tris.tolist() == [0, 0, bake_bvh._NO_HIT, bake_bvh._NO_HIT]
+    assert distances[:2] == pytest.approx([1.0, 1.0])
+
+    tris, _ = bake_bvh._cast_rays(high, origins, directions, 0.5)
+    assert (tris == bake_bvh._NO_HIT).all()
+
+
+def test_hit_normals_are_interpolated() -> None:
+    high = _high_poly()
+    locations = np.array([(-1, -1, 0), (0, 0, 0)], dtype=np.float64)
+
+    normals = bake_bvh._get_hit_normals(high, np.array([0, 0]), locations)
+
+    assert normals[0] == pytest.approx(np.array((1, 0, 1)) / np.sqrt(2))
+    assert np.linalg.norm(normals[1]) == pytest.approx(1.0)
+    assert 0 < normals[1, 0] < normals[0, 0]
+
+
+@pytest.mark.parametrize(("sign", "expected"), [(1.0, (0, 1, 0)), (-1.0, (0, -1, 0))])
+def test_to_tangent_space(sign: float, expected: tuple[float, float, float]) -> None:
+    weights = np.array([(0.2, 0.3, 0.5)])
+    corners = np.array([(0, 1, 2)])
+
+    normals = bake_bvh._to_tangent_space(
+        _low_poly(sign), corners, weights, np.array([(0.0, 1.0, 0.0)])
+    )
+
+    assert normals[0] == pytest.approx(expected)
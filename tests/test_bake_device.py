@@ -0,0 +1,23 @@
+# pylint: disable=missing-module-docstring
+import pytest
+
+from paws_bakery.operators import bake_device
+from paws_bakery.props_enums import RenderDevice
+
+
+@pytest.mark.parametrize(
+    ("device", "has_gpu", "expected"),
+    [
+        (RenderDevice.AUTO, True, "GPU"),
+        (RenderDevice.AUTO, False, "CPU"),
+        (RenderDevice.CPU, True, "CPU"),
+        (RenderDevice.GPU, True, "GPU"),
+        (RenderDevice.GPU, False, "CPU"),
+    ],
+)
+def test_render_device(
+    monkeypatch: pytest.MonkeyPatch, device: RenderDevice, has_gpu: bool, expected: str
+) -> None:
+    monkeypatch.setattr(bake_device, "has_gpu", lambda: has_gpu)
+
+    assert bake_device.get_render_device(device) == expected
@@ -0,0 +1,95 @@
+# pylint: disable=missing-module-docstring
+from pathlib import Path
+from types import SimpleNamespace
+
+import bpy
+import pytest
+
+from paws_bakery.operators import bake_manifest
+from paws_bakery.operators.bake_common import BakeObjects
+from paws_bakery.operators.bake_manifest import (
+    filter_unchanged_tasks,
+    record_bake_hashes,
+)
+from paws_bakery.operators.bake_plan import BakeTask
+
+
+def _task(image_path: Path, input_hash: str) -> BakeTask:
+    return BakeTask(
+        texture=SimpleNamespace(prop_id="a"),
+        objects=None,
+        image_name=image_path.name,
+        image_path=str(image_path),
+        input_hash=input_hash,
+    )
+
+
+def test_filter_unchanged_tasks(tmp_path: Path) -> None:
+    baked = tmp_path / "baked.png"
+    missing = tmp_path / "missing.png"
+    baked.write_bytes(b"")
+
+    record_bake_hashes([_task(baked, "1"), _task(missing, "1")])
+
+    assert filter_unchanged_tasks([_task(baked, "1")]) == []
+    assert filter_unchanged_tasks([_task(baked, "2")]) == [_task(baked, "2")]
+    assert filter_unchanged_tasks([_task(missing, "1")]) == [_task(missing, "1")]
+
+
+def test_filter_changed_files(tmp_path: Path) -> None:
+    baked = tmp_path / "baked.png"
+    baked.write_bytes(b"baked")
+    record_bake_hashes([_task(baked, "1")])
+
+    baked.write_bytes(b"edited by hand")
+
+    assert filter_unchanged_tasks([_task(baked, "1")]) == [_task(baked, "1")]
+
+
+def _object(name: str, mat_name: str, node_names: tuple[str, str]) -> bpy.types.Object:
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+    mesh.uv_layers.new(name="UVMap")
+    mat = bpy.data.materials.new(mat_name)
+    mat.use_nodes = True
+    tree = mat.node_tree
+    tree.nodes.clear()
+    tex = tree.nodes.new("ShaderNodeTexImage")
+    tex.name = node_names[0]
+    tex.image = bpy.data.images.new(f"{mat_name}_image", 4, 4)
+    tex.image.generated_color = (0.1, 0.2, 0.3, 1.0)
+    out = tree.nodes.new("ShaderNodeOutputMaterial")
+    out.name = node_names[1]
+    tree.links.new(tex.outputs["Color"], out.inputs["Surface"])
+    mesh.materials.append(mat)
+
+    b_obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(b_obj)
+    return b_obj
+
+
+def test_hash_doesnt_depend_on_names(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(bake_manifest, "get_bake_settings", lambda *_: None)
+    monkeypatch.setattr(bake_manifest, "_hash_settings", lambda _: b"")
+    objects = [
+        _object("obj_a", "mat_a", ("Image", "Output")),
+        _object("obj_b", "mat_b", ("Renamed Image", "Renamed Output")),
+    ]
+    tasks = [
+        BakeTask(
+            texture=SimpleNamespace(prop_id="a"),
+            objects=BakeObjects(active=b_obj, selected=[b_obj]),
+            image_name=b_obj.name,
+            image_path=f"//{b_obj.name}.png",
+        )
+        for b_obj in objects
+    ]
+
+    bake_manifest.hash_bake_tasks(bpy.context, tasks)
+    input_hashes = [task.input_hash for task in tasks]
+    image = objects[1].material_slots[0].material.node_tree.nodes[0].image
+    image.generated_color = (1.0, 0.0, 0.0, 1.0)
+    bake_manifest.hash_bake_tasks(bpy.context, tasks)
+
+    assert input_hashes[0] == input_hashes[1]
+    assert tasks[0].input_hash != tasks[1].input_hash
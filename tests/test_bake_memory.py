@@ -0,0 +1,73 @@
+# pylint: disable=missing-module-docstring
+import pytest
+
+from paws_bakery.operators.bake_memory import estimate_bake_memory
+
+
+def test_estimate_grows_with_sampling() -> None:
+    single = estimate_bake_memory(size=2048, sampling=1, is_float=False, triangles=0)
+    supersampled = estimate_bake_memory(
+        size=2048, sampling=4, is_float=False, triangles=0
+    )
+
+    assert supersampled.images == single.images * 16
+    assert supersampled.pixels == single.pixels * 16
+
+
+def test_estimate_float_image_is_larger() -> None:
+    byte = estimate_bake_memory(size=1024, sampling=2, is_float=False, triangles=0)
+    float_ = estimate_bake_memory(size=1024, sampling=2, is_float=True, triangles=0)
+
+    assert float_.images == byte.images * 4
+    assert float_.pixels == byte.pixels
+
+
+def test_estimate_selected_to_active_is_larger() -> None:
+    low = estimate_bake_memory(size=1024, sampling=1, is_float=False, triangles=0)
+    high_to_low = estimate_bake_memory(
+        size=1024, sampling=1, is_float=False, triangles=0, selected_to_active=True
+    )
+
+    assert high_to_low.pixels > low.pixels
+
+
+def test_estimate_geometry() -> None:
+    small = estimate_bake_memory(size=64, sampling=1, is_float=False, triangles=10)
+    large = estimate_bake_memory(size=64, sampling=1, is_float=False, triangles=1000)
+
+    assert large.geometry == small.geometry * 100
+    assert large.total - small.total == large.geometry - small.geometry
+
+
+@pytest.mark.parametrize("is_float", [False, True])
+def test_estimate_tiles_reduce_memory(is_float: bool) -> None:
+    totals = [
+        estimate_bake_memory(
+            size=8192,
+            sampling=4,
+            is_float=is_float,
+            triangles=1_000_000,
+            tile_count=tile_count,
+            tile_padding=19,
+        ).total
+        for tile_count in (1, 2, 4, 8)
+    ]
+
+    assert totals == sorted(totals, reverse=True)
+    assert totals[-1] < totals[0] / 4
+
+
+def test_estimate_finishing_reuses_bake_memory() -> None:
+    estimate = estimate_bake_memory(
+        size=1024, sampling=2, is_float=False, triangles=0, dilation=True
+    )
+
+    assert 0 < estimate.finishing < estimate.pixels
+    assert estimate.total == estimate.images + estimate.pixels + estimate.overhead
+
+
+def test_estimate_streamed_downscale_has_no_float_copy() -> None:
+    small = estimate_bake_memory(size=2048, sampling=2, is_float=False, triangles=0)
+    large = estimate_bake_memory(size=4096, sampling=2, is_float=False, triangles=0)
+
+    assert large.finishing == small.finishing * 4 // 5
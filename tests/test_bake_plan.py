@@ -0,0 +1,111 @@
+# pylint: disable=missing-module-docstring
+from types import SimpleNamespace
+
+import pytest
+
+from paws_bakery.operators.bake_plan import (
+    BakeSource,
+    BakeTask,
+    mark_image_boundaries,
+    mark_shared_objects,
+    order_tasks_by_objects,
+    partition_tasks,
+)
+
+
+def _task(texture_id: str, image_name: str, objects: str = "obj") -> BakeTask:
+    b_obj = SimpleNamespace(name=objects)
+    return BakeTask(
+        texture=SimpleNamespace(prop_id=texture_id),
+        objects=SimpleNamespace(active=b_obj, selected=[b_obj]),
+        image_name=image_name,
+        image_path=f"//{image_name}",
+    )
+
+
+def test_mark_image_boundaries_single() -> None:
+    tasks = [_task("a", "set_a"), _task("a", "set_a"), _task("a", "set_a")]
+    mark_image_boundaries(tasks)
+
+    assert [t.clear_image for t in tasks] == [True, False, False]
+    assert [t.scale_image for t in tasks] == [False, False, True]
+
+
+def test_mark_image_boundaries_per_object() -> None:
+    tasks = [_task("a", "obj1_set_a"), _task("a", "obj2_set_a"), _task("b", "set_b")]
+    mark_image_boundaries(tasks)
+
+    assert all(t.clear_image for t in tasks)
+    assert all(t.scale_image for t in tasks)
+
+
+def test_partition_tasks_keeps_image_together() -> None:
+    tasks = [
+        _task("a", "set_a"),
+        _task("a", "set_a"),
+        _task("b", "set_b"),
+        _task("c", "set_c"),
+    ]
+    partitions = partition_tasks(tasks, 2)
+
+    assert sorted(i for p in partitions for i in p) == [0, 1, 2, 3]
+    assert [0, 1] in partitions
+
+
+def test_partition_tasks_balances_cost() -> None:
+    costs = {"a": 4.0, "b": 1.0, "c": 1.0, "d": 2.0}
+    tasks = [_task(name, f"set_{name}") for name in costs]
+    partitions = partition_tasks(tasks, 2, cost=lambda t: costs[t.settings_id])
+
+    assert partitions == [[0], [1, 2, 3]]
+
+
+def test_partition_tasks_more_partitions_than_images() -> None:
+    partitions = partition_tasks([_task("a", "set_a")], 3)
+
+    assert partitions == [[0], [], []]
+
+
+def test_partition_tasks_keeps_derived_with_sources() -> None:
+    tasks = [_task("a", "set_a"), _task("b", "set_b"), _task("c", "set_c")]
+    tasks.append(_task("d", "set_d"))
+    tasks[3].sources = {
+        "NORMAL": BakeSource(texture=tasks[0].texture, image_path="//set_a"),
+        "POSITION": BakeSource(texture=tasks[2].texture, image_path="//set_c"),
+    }
+    partitions = partition_tasks(tasks, 2)
+
+    assert [0, 2, 3] in partitions
+    assert [1] in partitions
+
+
+def test_partition_tasks_invalid_count() -> None:
+    with pytest.raises(ValueError, match="positive"):
+        partition_tasks([], 0)
+
+
+def test_order_tasks_by_objects() -> None:
+    tasks = [
+        _task("a", "set_a", "obj1"),
+        _task("a", "set_a", "obj2"),
+        _task("b", "set_b", "obj1"),
+        _task("b", "set_b", "obj2"),
+    ]
+    ordered = order_tasks_by_objects(tasks)
+    mark_image_boundaries(ordered)
+
+    assert ordered == [tasks[0], tasks[2], tasks[1], tasks[3]]
+    assert [t.clear_image for t in ordered] == [True, True, False, False]
+    assert [t.scale_image for t in ordered] == [False, False, True, True]
+
+
+def test_mark_shared_objects() -> None:
+    tasks = [
+        _task("a", "set_a", "obj1"),
+        _task("b", "set_b", "obj1"),
+        _task("a", "set_a", "obj2"),
+        _task("a", "set_a", "obj3"),
+    ]
+    mark_shared_objects(tasks)
+
+    assert [t.use_persistent_data for t in tasks] == [True, True, False, False]
@@ -0,0 +1,102 @@
+# pylint: disable=missing-module-docstring
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from paws_bakery.operators import bake_raster
+from paws_bakery.operators._utils import generate_color_set, get_material_id_colors
+from paws_bakery.operators.bake_raster import iter_triangle_pixels, linear_to_srgb
+
+
+def _covered(uvs: np.ndarray, width: int, height: int) -> np.ndarray:
+    counts = np.zeros(width * height, dtype=np.int64)
+    for indices, _, _ in iter_triangle_pixels(uvs, width, height):
+        np.add.at(counts, indices, 1)
+    return counts.reshape(height, width)
+
+
+def test_triangles_sharing_edge_cover_pixels_once() -> None:
+    corners = np.array([(0.1, 0.2), (0.9, 0.1), (0.8, 0.9), (0.2, 0.7)])
+    uvs = corners[[[0, 1, 2], [0, 2, 3]]]
+
+    counts = _covered(uvs, 37, 29)
+
+    assert counts.max() == 1
+    x, y = corners.T
+    area = 0.5 * abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+    assert counts.sum() == pytest.approx(area * 37 * 29, rel=0.05)
+
+
+def test_triangle_weights_interpolate_corners() -> None:
+    uvs = np.array([[(0.05, 0.1), (0.95, 0.3), (0.4, 0.95)]], dtype=np.float32)
+
+    for indices, tris, weights in iter_triangle_pixels(uvs, 64, 32):
+        assert (tris == 0).all()
+        np.testing.assert_allclose(weights.sum(axis=-1), 1.0, atol=1e-6)
+        assert (weights >= -1e-6).all()
+        rows, cols = np.divmod(indices, 64)
+        centers = np.stack(((cols + 0.5) / 64, (rows + 0.5) / 32), axis=-1)
+        np.testing.assert_allclose(weights @ uvs[0], centers, atol=1e-5)
+
+
+def test_triangle_pixels_in_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    uvs = np.array([[(0, 0), (1, 0), (1, 1)], [(0, 0), (1, 1), (0, 1)]])
+    monkeypatch.setattr(bake_raster, "_MAX_CHUNK_PIXELS", 100)
+
+    chunks = list(iter_triangle_pixels(uvs, 32, 32))
+
+    assert len(chunks) > 1
+    assert all(len(indices) <= 100 for indices, _, _ in chunks)
+    indices = np.concatenate([indices for indices, _, _ in chunks])
+    np.testing.assert_array_equal(np.sort(indices), np.arange(32 * 32))
+
+
+def test_triangles_outside_image_are_clipped() -> None:
+    uvs = np.array([[(-1, -1), (2, -1), (0.5, 2)], [(1.5, 0), (2, 0), (2, 1)]])
+
+    counts = _covered(uvs, 16, 16)
+
+    assert counts.max() == 1
+
+
+def test_linear_to_srgb() -> None:
+    np.testing.assert_allclose(
+        linear_to_srgb(np.array([-1.0, 0.0, 0.002, 0.214041, 1.0])),
+        [0.0, 0.0, 0.02584, 0.5, 1.0],
+        atol=1e-5,
+    )
+
+
+def _object(*materials: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        material_slots=[
+            SimpleNamespace(material=SimpleNamespace(name=name)) for name in materials
+        ]
+    )
+
+
+def test_material_id_colors_per_object() -> None:
+    objects = [_object("a"), _object("b")]
+
+    colors = get_material_id_colors(objects, per_object=True)
+
+    # NOTE: Same as baking the objects one by one
+    assert colors == {"a": generate_color_set(1)[0], "b": generate_color_set(1)[0]}
+    assert len(set(get_material_id_colors(objects, per_object=False).values())) == 2
+
+
+@pytest.mark.parametrize("use_rasterize", [True, False])
+def test_rasterize_is_opt_in(use_rasterize: bool) -> None:
+    settings = SimpleNamespace(
+        type="POSITION",
+        use_rasterize=use_rasterize,
+        use_selected_to_active=False,
+        use_dilation=True,
+        margin=4,
+        matid_use_object_color=False,
+    )
+
+    objects = SimpleNamespace(selected=[])
+
+    assert bake_raster.can_rasterize(objects, settings) is use_rasterize
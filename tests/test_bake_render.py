@@ -0,0 +1,46 @@
+# pylint: disable=missing-module-docstring
+from types import SimpleNamespace
+
+import pytest
+
+from paws_bakery.operators.bake_render import RenderOptions, get_render_options
+
+
+def _settings(**kwargs: object) -> SimpleNamespace:
+    values: dict[str, object] = {
+        "type": "EMIT_COLOR",
+        "render_profile": "AUTO",
+        "samples": 24,
+        "use_denoising": True,
+    }
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+@pytest.mark.parametrize(
+    ("texture_type", "expected"),
+    [
+        ("EMIT_COLOR", RenderOptions(samples=1, max_bounces=0, use_denoising=False)),
+        ("UV", RenderOptions(samples=1, max_bounces=0, use_denoising=False)),
+        ("AO", RenderOptions(samples=24, max_bounces=0, use_denoising=True)),
+        ("AORM", RenderOptions(samples=24, max_bounces=0, use_denoising=True)),
+        ("COMBINED", RenderOptions(samples=24, max_bounces=None, use_denoising=True)),
+    ],
+)
+def test_render_options_by_type(texture_type: str, expected: RenderOptions) -> None:
+    assert get_render_options(_settings(type=texture_type), 128) == expected
+
+
+@pytest.mark.parametrize("texture_type", ["EMIT_COLOR", "AO", "COMBINED"])
+def test_custom_render_options(texture_type: str) -> None:
+    settings = _settings(type=texture_type, render_profile="CUSTOM", samples=8)
+
+    assert get_render_options(settings, 128) == RenderOptions(
+        samples=8, max_bounces=None, use_denoising=True
+    )
+
+
+def test_render_options_scene_samples() -> None:
+    options = get_render_options(_settings(type="COMBINED", samples=0), 128)
+
+    assert options.samples == 128
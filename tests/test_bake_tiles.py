@@ -0,0 +1,45 @@
+# pylint: disable=missing-module-docstring
+import numpy as np
+import pytest
+
+from paws_bakery.operators.bake_tiles import paste_tile, plan_tiles
+
+
+@pytest.mark.parametrize(("size", "count"), [(64, 1), (64, 2), (100, 3), (5, 5)])
+def test_plan_tiles_covers_image(size: int, count: int) -> None:
+    coverage = np.zeros((size, size), dtype=np.int32)
+
+    for tile in plan_tiles(size, count, 4):
+        coverage[tile.y : tile.y + tile.height, tile.x : tile.x + tile.width] += 1
+
+    assert len(plan_tiles(size, count, 4)) == count * count
+    assert (coverage == 1).all()
+
+
+def test_plan_tiles_padding_clipped_to_image() -> None:
+    tiles = plan_tiles(64, 2, 4)
+
+    assert [
+        (tile.padded_x, tile.padded_y, tile.padded_width, tile.padded_height)
+        for tile in tiles
+    ] == [(0, 0, 36, 36), (28, 0, 36, 36), (0, 28, 36, 36), (28, 28, 36, 36)]
+
+
+def test_plan_tiles_invalid_count() -> None:
+    with pytest.raises(ValueError):
+        plan_tiles(64, 0, 4)
+
+
+def test_paste_tiles_assembles_image() -> None:
+    size = 10
+    image = np.arange(size * size * 4, dtype=np.float32).reshape(size, size, 4)
+    output = np.zeros_like(image)
+
+    for tile in plan_tiles(size, 3, 2):
+        tile_pixels = image[
+            tile.padded_y : tile.padded_y + tile.padded_height,
+            tile.padded_x : tile.padded_x + tile.padded_width,
+        ]
+        paste_tile(output, tile_pixels, tile)
+
+    np.testing.assert_array_equal(output, image)
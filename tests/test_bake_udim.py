@@ -0,0 +1,33 @@
+# pylint: disable=missing-module-docstring
+from types import SimpleNamespace
+
+import pytest
+
+from paws_bakery.operators.bake_udim import (
+    assign_udim_tiles,
+    get_udim_tile_offset,
+)
+from paws_bakery.utils import AddonException
+
+
+def _obj(name: str, mesh: str | None = None) -> SimpleNamespace:
+    return SimpleNamespace(name=name, data=SimpleNamespace(name=mesh or name))
+
+
+def test_assign_udim_tiles_in_order() -> None:
+    objects = [_obj("b"), _obj("a"), _obj("b"), _obj("c")]
+
+    assert assign_udim_tiles(objects) == {"b": 1001, "a": 1002, "c": 1003}
+
+
+def test_assign_udim_tiles_shared_mesh() -> None:
+    with pytest.raises(AddonException):
+        assign_udim_tiles([_obj("a", "mesh"), _obj("b", "mesh")])
+
+
+@pytest.mark.parametrize(
+    ("tile", "offset"),
+    [(1001, (0, 0)), (1002, (1, 0)), (1010, (9, 0)), (1011, (0, 1)), (1234, (3, 23))],
+)
+def test_udim_tile_offset(tile: int, offset: tuple[int, int]) -> None:
+    assert get_udim_tile_offset(tile) == offset
@@ -1,5 +1,8 @@
+import struct
+import zlib
 from pathlib import Path
 
+import numpy as np
 import pytest
 import syrupy
 from syrupy.extensions.image import PNGImageSnapshotExtension
@@ -33,10 +36,74 @@ img_names = [
 ]
 
 
+def _unfilter_png(raw: np.ndarray, stride: int, bpp: int) -> np.ndarray:
+    """Return scanlines without filter bytes, see PNG specification 9.2."""
+    height = raw.shape[0]
+    # NOTE: Zero row above and zero pixel left of the image
+    rows = np.zeros((height + 1, stride + bpp), dtype=np.uint8)
+    for y in range(height):
+        kind, line = raw[y, 0], raw[y, 1:]
+        cur, up = rows[y + 1], rows[y]
+        if kind in (0, 2):
+            cur[bpp:] = line + up[bpp:] if kind == 2 else line
+            continue
+        for x in range(bpp, stride + bpp):
+            left, above, corner = int(cur[x - bpp]), int(up[x]), int(up[x - bpp])
+            if kind == 1:
+                pred = left
+            elif kind == 3:
+                pred = (left + above) // 2
+            else:
+                base = left + above - corner
+                pa, pb, pc = abs(base - left), abs(base - above), abs(base - corner)
+                pred = left if pa <= pb and pa <= pc else above if pb <= pc else corner
+            cur[x] = (int(line[x - bpp]) + pred) & 0xFF
+    return rows[1:, bpp:]
+
+
+def _decode_png(data: bytes) -> tuple[list[bytes], np.ndarray]:
+    """Return chunks other than pixel data and pixels of non-interlaced PNG."""
+    chunks: list[bytes] = []
+    idat = b""
+    pos = 8
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos : pos + 8])
+        if chunk_type == b"IDAT":
+            idat += data[pos + 8 : pos + 8 + length]
+        else:
+            chunks.append(data[pos : pos + 12 + length])
+        pos += length + 12
+
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", chunks[0][8:18])
+    channels = {0: 1, 2: 3, 4: 2, 6: 4}[color_type]
+    bpp = channels * bit_depth // 8
+    raw = np.frombuffer(zlib.decompress(idat), dtype=np.uint8)
+    rows = _unfilter_png(raw.reshape(height, -1), width * bpp, bpp)
+    dtype = np.dtype(np.uint8) if bit_depth == 8 else np.dtype(">u2")
+    return chunks, rows.view(dtype).reshape(height, width, channels)
+
+
+class PNGPixelsSnapshotExtension(PNGImageSnapshotExtension):
+    """Compare decoded pixels and metadata, not compressed data of PNG images.
+
+    Compression of the same pixels differs between encoders, e.g. images saved on
+    worker threads and by Blender.
+    """
+
+    def matches(self, *, serialized_data, snapshot_data) -> bool:
+        if serialized_data == snapshot_data:
+            return True
+        if not snapshot_data:
+            return False
+        chunks, pixels = _decode_png(serialized_data)
+        snapshot_chunks, snapshot_pixels = _decode_png(snapshot_data)
+        return chunks == snapshot_chunks and np.array_equal(pixels, snapshot_pixels)
+
+
 @pytest.fixture
 def snapshot_png(snapshot: syrupy.assertion.SnapshotAssertion):
     # return snapshot.use_extension(PNGImageSnapshotExtension)
-    return snapshot(extension_class=PNGImageSnapshotExtension)
+    return snapshot(extension_class=PNGPixelsSnapshotExtension)
 
 
 def test_dirs():
@@ -0,0 +1,13 @@
+# pylint: disable=missing-module-docstring
+import pytest
+
+from paws_bakery.farm import get_worker_cores
+
+
+@pytest.mark.parametrize(
+    ("index", "threads", "expected"),
+    [(0, 2, [0, 1]), (1, 2, [4, 5]), (2, 2, [6, 8]), (3, 2, []), (0, 0, [])],
+)
+def test_worker_cores(index: int, threads: int, expected: list[int]) -> None:
+    # NOTE: Process may be allowed only some of the cores
+    assert get_worker_cores(index, threads, [8, 5, 6, 0, 4, 1]) == expected
@@ -0,0 +1,69 @@
+# pylint: disable=missing-module-docstring
+import numpy as np
+import pytest
+
+from paws_bakery.operators.image_derive import (
+    get_curvature,
+    get_derived_values,
+    get_pixel_distance,
+)
+from paws_bakery.props_enums import BakeTextureType
+
+
+def _dome(size: int, slope: float) -> tuple[np.ndarray, np.ndarray]:
+    """Return normals tilting outwards from the center, and flat positions."""
+    rows, cols = np.indices((size, size), dtype=np.float32)
+    center = (size - 1) / 2
+    normals = np.ones((size, size, 4), dtype=np.float32)
+    normals[..., 0] = 0.5 + 0.5 * slope * (cols - center) / size
+    normals[..., 1] = 0.5 + 0.5 * slope * (rows - center) / size
+    positions = np.zeros((size, size, 4), dtype=np.float32)
+    positions[..., 0] = cols * 0.1
+    positions[..., 1] = rows * 0.1
+    return normals, positions
+
+
+def test_pixel_distance() -> None:
+    _, positions = _dome(8, 1.0)
+
+    assert get_pixel_distance(positions) == pytest.approx(0.1)
+    assert get_pixel_distance(np.zeros((4, 4, 4))) == 0.0
+
+
+@pytest.mark.parametrize(("slope", "sign"), [(1.0, 1.0), (-1.0, -1.0)])
+def test_curvature_sign(slope: float, sign: float) -> None:
+    normals, positions = _dome(16, slope)
+
+    curvature = get_curvature(normals, positions, 2)
+
+    assert (curvature * sign > 0).all()
+    assert curvature[8, 8] == pytest.approx(curvature[0, 0])
+
+
+def test_curvature_ignores_seams() -> None:
+    normals = np.full((8, 8, 4), 0.5, dtype=np.float32)
+    normals[:, 4:, 0] = 1.0
+    _, positions = _dome(8, 0.0)
+    curvature = get_curvature(normals, positions, 1)
+    assert curvature[:, 3:5] == pytest.approx(0.25)
+
+    # NOTE: Right half is an island far away in the world
+    positions[:, 4:, 0] += 100.0
+    curvature = get_curvature(normals, positions, 1)
+    assert curvature == pytest.approx(0.0)
+
+
+def test_derived_values() -> None:
+    curvature = np.array([-2.0, -0.5, 0.0, 0.5])
+
+    assert get_derived_values(BakeTextureType.CURVATURE, curvature) == pytest.approx(
+        [0.0, 0.25, 0.5, 0.75]
+    )
+    assert get_derived_values(BakeTextureType.CAVITY, curvature) == pytest.approx(
+        [1.0, 0.5, 0.0, 0.0]
+    )
+    assert get_derived_values(BakeTextureType.EDGE, curvature) == pytest.approx(
+        [0.0, 0.0, 0.0, 0.5]
+    )
+    with pytest.raises(ValueError, match="derived"):
+        get_derived_values(BakeTextureType.NORMAL, curvature)
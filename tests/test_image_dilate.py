@@ -0,0 +1,71 @@
+# pylint: disable=missing-module-docstring
+import numpy as np
+import pytest
+
+from paws_bakery.operators.image_dilate import dilate
+
+
+def _island(size: int, rows: slice, cols: slice) -> np.ndarray:
+    pixels = np.zeros((size, size, 4), dtype=np.float32)
+    pixels[rows, cols] = (0.2, 0.4, 0.6, 1.0)
+    return pixels
+
+
+def test_dilate_fills_margin_only() -> None:
+    pixels = _island(32, slice(10, 20), slice(10, 20))
+
+    dilate(pixels, 3, background=(0.5, 0.5, 1.0))
+
+    filled = (pixels[..., :3] == pixels[15, 15, :3]).all(axis=-1)
+    rows, cols = np.indices((32, 32))
+    distance_y = np.maximum(np.maximum(10 - rows, rows - 19), 0)
+    distance_x = np.maximum(np.maximum(10 - cols, cols - 19), 0)
+    np.testing.assert_array_equal(filled, distance_y**2 + distance_x**2 <= 9)
+    np.testing.assert_allclose(pixels[~filled, :3], [[0.5, 0.5, 1.0]] * (~filled).sum())
+    assert (pixels[..., 3] == 1.0).all()
+
+
+def test_dilate_all_fills_whole_image() -> None:
+    pixels = _island(64, slice(0, 4), slice(60, 64))
+
+    dilate(pixels, None)
+
+    np.testing.assert_array_equal(pixels, _island(64, slice(0, 64), slice(0, 64)))
+
+
+@pytest.mark.parametrize("margin", [2, 5, None])
+def test_dilate_copies_nearest_pixel(margin: int | None) -> None:
+    rng = np.random.default_rng(0)
+    pixels = np.zeros((24, 24, 4), dtype=np.float32)
+    seeds = rng.choice(24 * 24, 6, replace=False)
+    # NOTE: Unique colors identify the seed the pixel was filled from
+    pixels.reshape(-1, 4)[seeds] = [(idx, 0.0, 0.0, 1.0) for idx in range(1, 7)]
+    seed_rows, seed_cols = np.divmod(seeds, 24)
+
+    dilate(pixels, margin)
+
+    rows, cols = np.indices((24, 24))
+    distances = (rows[..., None] - seed_rows) ** 2 + (cols[..., None] - seed_cols) ** 2
+    nearest = distances.min(axis=-1)
+    filled = pixels[..., 0] > 0
+    if margin is None:
+        assert filled.all()
+        return
+
+    np.testing.assert_array_equal(filled, nearest <= margin**2)
+    # NOTE: Equally near seeds may be picked either way
+    source = pixels[filled, 0].astype(np.int64) - 1
+    np.testing.assert_array_equal(
+        distances[filled][np.arange(len(source)), source], nearest[filled]
+    )
+
+
+def test_dilate_restores_partially_covered_color() -> None:
+    pixels = _island(8, slice(0, 8), slice(0, 4))
+    pixels[:, 4] = (0.15, 0.3, 0.45, 0.75)
+    pixels[:, 5] = (0.04, 0.08, 0.12, 0.2)
+
+    dilate(pixels, 8)
+
+    np.testing.assert_allclose(pixels[:, 4], [[0.2, 0.4, 0.6, 1.0]] * 8)
+    np.testing.assert_allclose(pixels[:, 5], [[0.2, 0.4, 0.6, 1.0]] * 8)
@@ -0,0 +1,93 @@
+# pylint: disable=missing-module-docstring
+import numpy as np
+import pytest
+
+from paws_bakery.operators.image_downscale import (
+    downscale,
+    downscale_rows,
+    downscale_to_size,
+    get_filter_taps,
+)
+from paws_bakery.props_enums import DownscaleFilter
+from paws_bakery.utils import AddonException
+
+_FILTERS = [DownscaleFilter.BOX, DownscaleFilter.MITCHELL, DownscaleFilter.LANCZOS]
+
+
+@pytest.mark.parametrize("downscale_filter", _FILTERS)
+@pytest.mark.parametrize("factor", [2, 4, 8])
+def test_filter_weights_sum_to_one(
+    downscale_filter: DownscaleFilter, factor: int
+) -> None:
+    _, weights = get_filter_taps(factor, downscale_filter)
+    assert weights.sum() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("downscale_filter", _FILTERS)
+def test_downscale_keeps_constant(downscale_filter: DownscaleFilter) -> None:
+    pixels = np.full((16, 16, 4), 0.25, dtype=np.float32)
+
+    result = downscale(pixels, 4, downscale_filter)
+
+    assert result.shape == (4, 4, 4)
+    np.testing.assert_allclose(result, 0.25, rtol=1e-5)
+
+
+def test_downscale_box_averages_blocks() -> None:
+    pixels = np.arange(16, dtype=np.float32).reshape(4, 4, 1)
+
+    result = downscale(pixels, 2, DownscaleFilter.BOX)
+
+    np.testing.assert_allclose(result[..., 0], [[2.5, 4.5], [10.5, 12.5]])
+
+
+def test_downscale_clip() -> None:
+    pixels = np.zeros((16, 16, 1), dtype=np.float32)
+    pixels[:, 8:] = 1.0
+
+    unclipped = downscale(pixels, 2, DownscaleFilter.LANCZOS)
+    clipped = downscale(pixels, 2, DownscaleFilter.LANCZOS, clip=True)
+
+    assert unclipped.min() < 0.0
+    assert unclipped.max() > 1.0
+    assert clipped.min() == 0.0
+    assert clipped.max() == 1.0
+
+
+def test_downscale_factor_one() -> None:
+    pixels = np.random.default_rng(0).random((8, 8, 3))
+
+    np.testing.assert_allclose(downscale(pixels, 1, DownscaleFilter.LANCZOS), pixels)
+
+
+@pytest.mark.parametrize("downscale_filter", _FILTERS)
+@pytest.mark.parametrize("block_rows", [1, 3, 16])
+def test_downscale_rows_matches_downscale(
+    downscale_filter: DownscaleFilter, block_rows: int
+) -> None:
+    pixels = np.random.default_rng(0).random((64, 48, 4), dtype=np.float32)
+    expected = downscale(pixels, 4, downscale_filter, clip=True)
+
+    blocks = [
+        downscale_rows(
+            pixels, 4, downscale_filter, start, start + block_rows, clip=True
+        )
+        for start in range(0, 16, block_rows)
+    ]
+
+    np.testing.assert_array_equal(np.concatenate(blocks), expected)
+
+
+@pytest.mark.parametrize("size", [32, 16, 8])
+def test_downscale_to_size_matches_downscale(size: int) -> None:
+    pixels = np.random.default_rng(0).random((64, 64, 4), dtype=np.float32)
+    expected = downscale(pixels, 64 // size, DownscaleFilter.LANCZOS)
+
+    result = downscale_to_size(pixels, size, DownscaleFilter.LANCZOS)
+
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_downscale_to_size_not_integer() -> None:
+    with pytest.raises(AddonException, match="integer factor"):
+        downscale_to_size(np.zeros((64, 64, 4)), 48, DownscaleFilter.BOX)
@@ -0,0 +1,157 @@
+# pylint: disable=missing-module-docstring
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from paws_bakery.operators.image_post_process import (
+    PostProcessQueue,
+    encode_png,
+    write_png,
+)
+
+
+def _read_chunks(data: bytes) -> list[tuple[bytes, bytes]]:
+    pos = 8
+    chunks = []
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos : pos + 8])
+        chunks.append((chunk_type, data[pos + 8 : pos + 8 + length]))
+        pos += length + 12
+    return chunks
+
+
+def _decode_png(data: bytes) -> tuple[tuple[int, ...], np.ndarray]:
+    header: tuple[int, ...] = ()
+    idat = b""
+    for chunk_type, body in _read_chunks(data):
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif chunk_type == b"IDAT":
+            idat += body
+
+    width, height, bit_depth, color_type = header[:4]
+    channels = {2: 3, 6: 4}[color_type]
+    pixel_size = channels * bit_depth // 8
+    rows = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, -1)
+    assert (rows[:, 0] == 1).all()
+    rows = rows[:, 1:].reshape(height, width, pixel_size)
+    rows = np.cumsum(rows, axis=1, dtype=np.uint8)
+
+    dtype = np.dtype(np.uint8) if bit_depth == 8 else np.dtype(">u2")
+    return header, rows.view(dtype).reshape(height, width, channels)
+
+
+@pytest.mark.parametrize(("bit_depth", "channels"), [(8, 3), (8, 4), (16, 3)])
+def test_encode_png(bit_depth: int, channels: int) -> None:
+    pixels = np.random.default_rng(0).random((5, 7, channels), dtype=np.float32)
+
+    header, decoded = _decode_png(encode_png(pixels, bit_depth=bit_depth))
+
+    max_value = (1 << bit_depth) - 1
+    assert header[:3] == (7, 5, bit_depth)
+    # NOTE: Blender stores rows bottom to top
+    np.testing.assert_array_equal(
+        decoded, np.round(pixels[::-1] * max_value).astype(decoded.dtype)
+    )
+
+
+def test_encode_png_clips() -> None:
+    pixels = np.array([[[-1.0, 0.5, 2.0]]], dtype=np.float32)
+
+    _, decoded = _decode_png(encode_png(pixels))
+
+    np.testing.assert_array_equal(decoded, [[[0, 128, 255]]])
+
+
+def test_encode_png_writes_blender_chunks() -> None:
+    chunks = _read_chunks(encode_png(np.zeros((1, 1, 3), dtype=np.float32)))
+
+    assert [chunk_type for chunk_type, _ in chunks] == [
+        b"IHDR",
+        b"eXIf",
+        b"oFFs",
+        b"pHYs",
+        b"IDAT",
+        b"IEND",
+    ]
+    # NOTE: 72 DPI, as Blender writes for new images
+    assert struct.unpack(">IIB", chunks[3][1]) == (2834, 2834, 1)
+
+
+def test_encode_png_unpremultiplies() -> None:
+    pixels = np.array([[[0.25, 0.5, 0.0, 0.5], [0.2, 0.4, 0.6, 0.0]]], np.float32)
+
+    _, decoded = _decode_png(encode_png(pixels, premultiplied=True))
+
+    # NOTE: Color of transparent pixels is kept
+    np.testing.assert_array_equal(decoded, [[[128, 255, 0, 128], [51, 102, 153, 0]]])
+
+
+@pytest.mark.parametrize("block_rows", [1, 4, 64])
+def test_write_png_matches_encode_png(tmp_path: Path, block_rows: int) -> None:
+    pixels = np.random.default_rng(0).random((37, 11, 4), dtype=np.float32)
+    requested: list[tuple[int, int]] = []
+
+    def get_rows(start: int, stop: int) -> np.ndarray:
+        requested.append((start, stop))
+        return pixels[start:stop]
+
+    path = tmp_path / "image.png"
+    write_png(path, get_rows, width=11, height=37, channels=4, block_rows=block_rows)
+
+    header, decoded = _decode_png(path.read_bytes())
+    assert header == _decode_png(encode_png(pixels))[0]
+    np.testing.assert_array_equal(decoded, _decode_png(encode_png(pixels))[1])
+    assert max(stop - start for start, stop in requested) <= block_rows
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_write_png_failure_keeps_no_file(tmp_path: Path) -> None:
+    def get_rows(start: int, stop: int) -> np.ndarray:
+        raise OSError("read failed")
+
+    path = tmp_path / "image.png"
+    with pytest.raises(OSError, match="read failed"):
+        write_png(path, get_rows, width=4, height=4, channels=3, block_rows=2)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_post_process_queue() -> None:
+    done: list[str] = []
+
+    def fail() -> None:
+        raise OSError("disk full")
+
+    queue = PostProcessQueue(max_workers=2, max_pending=1)
+    queue.submit("a.png", lambda: None, on_done=lambda: done.append("a"))
+    queue.submit("b.png", fail, on_done=lambda: done.append("b"))
+    queue.join()
+
+    assert done == ["a"]
+    assert queue.failed == {"b.png": "disk full"}
+
+
+def test_post_process_queue_backpressure() -> None:
+    release = threading.Event()
+    queue = PostProcessQueue(max_workers=2, max_pending=1)
+    queue.submit("a.png", release.wait)
+
+    submitted = threading.Event()
+
+    def submit_next() -> None:
+        queue.submit("b.png", lambda: None)
+        submitted.set()
+
+    thread = threading.Thread(target=submit_next)
+    thread.start()
+    assert not submitted.wait(0.1)
+
+    release.set()
+    thread.join()
+    assert submitted.is_set()
+    queue.join()
@@ -0,0 +1,69 @@
+# pylint: disable=missing-module-docstring
+from types import SimpleNamespace
+
+import pytest
+
+from paws_bakery.operators.image_save import get_image_colorspace, get_output_options
+from paws_bakery.props_enums import ExrCodec, ImageFileFormat
+
+
+def _settings(**kwargs: object) -> SimpleNamespace:
+    values: dict[str, object] = {
+        "type": "EMIT_COLOR",
+        "file_format": "PNG",
+        "precision": "AUTO",
+        "output_profile": "STANDARD",
+        "compression": 15,
+        "exr_codec": "ZIP",
+        "is_float": False,
+    }
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+@pytest.mark.parametrize(
+    ("file_format", "precision", "is_float", "color_depth"),
+    [
+        ("PNG", "AUTO", False, "8"),
+        ("PNG", "BIT_32", True, "16"),
+        ("TIFF", "BIT_16", True, "16"),
+        ("OPEN_EXR", "BIT_8", True, "16"),
+        ("OPEN_EXR", "BIT_32", True, "32"),
+    ],
+)
+def test_output_options_color_depth(
+    file_format: str, precision: str, is_float: bool, color_depth: str
+) -> None:
+    options = get_output_options(
+        _settings(file_format=file_format, precision=precision, is_float=is_float)
+    )
+
+    assert options.file_format is ImageFileFormat[file_format]
+    assert options.color_depth == color_depth
+
+
+def test_output_options_profiles() -> None:
+    fast = get_output_options(_settings(output_profile="FAST"))
+    small = get_output_options(_settings(output_profile="SMALL"))
+    custom = get_output_options(
+        _settings(output_profile="CUSTOM", compression=100, exr_codec="DWAA")
+    )
+
+    assert (fast.png_compress_level, fast.tiff_codec) == (0, "NONE")
+    assert fast.exr_codec is ExrCodec.NONE
+    assert small.png_compress_level > get_output_options(_settings()).png_compress_level
+    assert (custom.png_compress_level, custom.exr_codec) == (9, ExrCodec.DWAA)
+
+
+@pytest.mark.parametrize(
+    ("texture_type", "file_format", "colorspace"),
+    [
+        ("EMIT_COLOR", "PNG", "sRGB"),
+        ("EMIT_COLOR", "OPEN_EXR", "Linear Rec.709"),
+        ("NORMAL", "OPEN_EXR", "Non-Color"),
+    ],
+)
+def test_image_colorspace(texture_type: str, file_format: str, colorspace: str) -> None:
+    settings = _settings(type=texture_type, file_format=file_format)
+
+    assert get_image_colorspace(settings) == colorspace
@@ -0,0 +1,63 @@
+# pylint: disable=missing-module-docstring
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from paws_bakery.operators.texture_set_pack import pack_pixels
+from paws_bakery.props import ChannelPackProps
+from paws_bakery.props_enums import PackChannel
+from paws_bakery.utils import AddonException
+
+
+def _gray(value: float, size: int = 4) -> np.ndarray:
+    pixels = np.full((size, size, 4), value, dtype=np.float32)
+    pixels[..., 3] = 1.0
+    return pixels
+
+
+def test_pack_pixels_layout() -> None:
+    channels = [
+        PackChannel.METALNESS,
+        PackChannel.WHITE,
+        PackChannel.NONE,
+        PackChannel.SMOOTHNESS,
+    ]
+    sources = {
+        PackChannel.METALNESS: _gray(0.25),
+        PackChannel.SMOOTHNESS: _gray(0.75),
+    }
+
+    packed = pack_pixels(channels, sources)
+
+    assert packed.shape == (4, 4, 4)
+    assert packed[0, 0] == pytest.approx([0.25, 1.0, 0.0, 0.25])
+
+
+def test_pack_pixels_size_mismatch() -> None:
+    sources = {PackChannel.AO: _gray(0.5, 4), PackChannel.ROUGHNESS: _gray(0.5, 8)}
+
+    with pytest.raises(AddonException, match="different sizes"):
+        pack_pixels([PackChannel.AO, PackChannel.ROUGHNESS], sources)
+
+
+@pytest.mark.parametrize(
+    ("layout", "alpha", "expected"),
+    [
+        ("ORM", "WHITE", ["AO", "ROUGHNESS", "METALNESS"]),
+        ("CUSTOM", "NONE", ["EDGE", "WHITE", "AO"]),
+        ("CUSTOM", "OPACITY", ["EDGE", "WHITE", "AO", "OPACITY"]),
+    ],
+)
+def test_pack_channels(layout: str, alpha: str, expected: list[str]) -> None:
+    pack = SimpleNamespace(
+        layout=layout,
+        channel_r="EDGE",
+        channel_g="WHITE",
+        channel_b="AO",
+        channel_a=alpha,
+    )
+
+    channels = ChannelPackProps.get_channels(pack)  # type: ignore[arg-type]
+
+    assert [channel.name for channel in channels] == expected